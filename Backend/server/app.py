@@ -16,42 +16,82 @@ from routes.tutors import tutors_bp
 from routes.admin import admin_bp
 
 # Import database config
-from config.database import get_db_connection
+from config.database import get_db_connection, get_pool_stats, init_app as init_db
+from utils.password_utils import get_password_hasher
+from utils.jwt_utils import get_token_cache_stats
+from utils.cache import get_stats_cache, init_app as init_cache
+from utils.leaderboard import get_ranked_cache
+from utils.jobs import get_job_registry
+from utils.timetable import get_timetable_registry
+from utils.timetable_solver import get_timetable_solver
+from utils.schedule_cache import get_schedule_cache
+from utils.http_cache import get_etag_registry
 
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app)
-
 PORT = int(os.getenv('PORT', 3001))
 
-# Health check endpoint
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    return jsonify({'status': 'ok', 'message': 'LMS API Server is running'})
+def create_app():
+    """Create and configure the Flask application"""
+    app = Flask(__name__)
+    CORS(app, expose_headers=['X-Next-After-Id', 'X-Next-Cursor', 'Age', 'X-Cache', 'ETag', 'Last-Modified'])
+
+    # Request-scoped database connections are returned to the pool on teardown
+    init_db(app)
+
+    # Successful writes mark cached dashboard statistics stale
+    init_cache(app)
+
+    # Health check endpoint
+    @app.route('/api/health', methods=['GET'])
+    def health_check():
+        return jsonify({'status': 'ok', 'message': 'LMS API Server is running'})
+
+    # Runtime statistics endpoint
+    @app.route('/api/health/stats', methods=['GET'])
+    def health_stats():
+        return jsonify({
+            'success': True,
+            'data': {
+                'pid': os.getpid(),
+                'db_pool': get_pool_stats(),
+                'password_hasher': get_password_hasher().stats(),
+                'token_cache': get_token_cache_stats(),
+                'stats_cache': get_stats_cache().stats(),
+                'ranked_cache': get_ranked_cache().stats(),
+                'jobs': get_job_registry().stats(),
+                'timetable': get_timetable_registry().stats(),
+                'timetable_solver': get_timetable_solver().stats(),
+                'schedule_cache': get_schedule_cache().stats(),
+                'http_etags': get_etag_registry().stats(),
+            }
+        })
+
+    # Register blueprints
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(users_bp, url_prefix='/api/users')
+    app.register_blueprint(courses_bp, url_prefix='/api/courses')
+    app.register_blueprint(assignments_bp, url_prefix='/api/assignments')
+    app.register_blueprint(students_bp, url_prefix='/api/students')
+    app.register_blueprint(quizzes_bp, url_prefix='/api/quizzes')
+    app.register_blueprint(grades_bp, url_prefix='/api/grades')
+    app.register_blueprint(schedule_bp, url_prefix='/api/schedule')
+    app.register_blueprint(tutors_bp, url_prefix='/api/tutors')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
 
-# Register blueprints
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(users_bp, url_prefix='/api/users')
-app.register_blueprint(courses_bp, url_prefix='/api/courses')
-app.register_blueprint(assignments_bp, url_prefix='/api/assignments')
-app.register_blueprint(students_bp, url_prefix='/api/students')
-app.register_blueprint(quizzes_bp, url_prefix='/api/quizzes')
-app.register_blueprint(grades_bp, url_prefix='/api/grades')
-app.register_blueprint(schedule_bp, url_prefix='/api/schedule')
-app.register_blueprint(tutors_bp, url_prefix='/api/tutors')
-app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    # Error handling
+    @app.errorhandler(Exception)
+    def handle_error(error):
+        print(f'Error: {error}')
+        return jsonify({
+            'success': False,
+            'error': str(error) or 'Internal server error'
+        }), getattr(error, 'code', 500)
 
-# Error handling
-@app.errorhandler(Exception)
-def handle_error(error):
-    print(f'Error: {error}')
-    return jsonify({
-        'success': False,
-        'error': str(error) or 'Internal server error'
-    }), getattr(error, 'code', 500)
+    return app
 
 if __name__ == '__main__':
+    # Development server only; production runs gunicorn with wsgi:app (see gunicorn.conf.py)
     try:
         # Test database connection
         conn = get_db_connection()
@@ -59,8 +99,9 @@ if __name__ == '__main__':
         conn.close()
 
         # Start server
+        debug = os.getenv('FLASK_DEBUG', '1') == '1'
         print(f'🚀 Server running on http://localhost:{PORT}')
-        app.run(host='0.0.0.0', port=PORT, debug=True, use_reloader=True, use_debugger=True)
+        create_app().run(host='0.0.0.0', port=PORT, debug=debug, use_reloader=debug, use_debugger=debug)
     except Exception as e:
         print(f'Failed to start server: {e}')
         exit(1)
@@ -1,6 +1,10 @@
 import pymssql
 import os
+import threading
+import time
+from contextlib import contextmanager
 from dotenv import load_dotenv
+from flask import g
 
 load_dotenv()
 
@@ -11,7 +15,15 @@ class DatabaseConfig:
         self.database = os.getenv('DB_DATABASE', 'lms_system')
         self.username = os.getenv('DB_USER', 'sa')
         self.password = os.getenv('DB_PASSWORD', '')
-    
+
+        # Pool settings
+        self.pool_min_size = int(os.getenv('DB_POOL_MIN_SIZE', '0'))
+        self.pool_max_size = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+        self.pool_timeout = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+        self.pool_idle_timeout = float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300'))
+        self.pool_max_lifetime = float(os.getenv('DB_POOL_MAX_LIFETIME', '1800'))
+        self.pool_ping_interval = float(os.getenv('DB_POOL_PING_INTERVAL', '30'))
+
     def get_connection(self):
         try:
             conn = pymssql.connect(
@@ -26,7 +38,303 @@ class DatabaseConfig:
             print(f'Database connection error: {e}')
             raise e
 
+
+# Session options some requests change (bulk inserts, capped scans, dashboard
+# sections); put back to the server defaults before the next borrower sees them
+SESSION_RESET_SQL = 'SET LOCK_TIMEOUT -1; SET NOCOUNT OFF; SET XACT_ABORT OFF'
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time"""
+    pass
+
+
+class _PoolEntry:
+    __slots__ = ('conn', 'created_at', 'last_used')
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class PooledConnection:
+    """Proxy around a pooled pymssql connection; close() returns it to the pool"""
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    def __getattr__(self, name):
+        entry = self.__dict__.get('_entry')
+        if entry is None:
+            raise pymssql.InterfaceError('Connection already returned to pool')
+        return getattr(entry.conn, name)
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool.release(entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __del__(self):
+        # Safety net for handlers that never close their connection
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of pymssql connections"""
+
+    def __init__(self, config):
+        self.config = config
+        self._idle = []
+        self._size = 0
+        self._cond = threading.Condition(threading.Lock())
+        self._closed = False
+
+        # Statistics
+        self._checkouts = 0
+        self._checkout_failures = 0
+        self._waits = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._created = 0
+        self._discarded = 0
+
+        for _ in range(max(0, min(config.pool_min_size, config.pool_max_size))):
+            try:
+                self._idle.append(self._create_entry())
+                self._size += 1
+            except Exception as e:
+                print(f'Connection pool warm-up error: {e}')
+                break
+
+    def _create_entry(self):
+        entry = _PoolEntry(self.config.get_connection())
+        self._created += 1
+        return entry
+
+    def _is_expired(self, entry, now):
+        if self.config.pool_max_lifetime > 0 and now - entry.created_at > self.config.pool_max_lifetime:
+            return True
+        if self.config.pool_idle_timeout > 0 and now - entry.last_used > self.config.pool_idle_timeout:
+            return True
+        return False
+
+    def _is_healthy(self, entry, now):
+        """Ping connections that sat idle longer than the ping interval"""
+        if now - entry.last_used < self.config.pool_ping_interval:
+            return True
+        try:
+            cursor = entry.conn.cursor()
+            cursor.execute('SELECT 1')
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, entry):
+        self._discarded += 1
+        try:
+            entry.conn.close()
+        except Exception:
+            pass
+
+    def acquire(self, timeout=None):
+        """Borrow a connection, waiting up to timeout seconds for one to free up"""
+        timeout = self.config.pool_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+
+        while True:
+            entry = None
+            create = False
+            with self._cond:
+                if self._closed:
+                    self._checkout_failures += 1
+                    raise PoolTimeoutError('Connection pool is closed')
+                while not self._idle and self._size >= self.config.pool_max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._checkout_failures += 1
+                        raise PoolTimeoutError(
+                            f'Timed out after {timeout}s waiting for a database connection '
+                            f'(pool size {self.config.pool_max_size})'
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+                if self._idle:
+                    entry = self._idle.pop()
+                else:
+                    self._size += 1
+                    create = True
+
+            if create:
+                try:
+                    entry = self._create_entry()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._checkout_failures += 1
+                        self._cond.notify()
+                    raise
+            else:
+                now = time.monotonic()
+                if self._is_expired(entry, now) or not self._is_healthy(entry, now):
+                    self._discard(entry)
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    continue
+
+            wait_time = time.monotonic() - start
+            with self._cond:
+                self._checkouts += 1
+                if waited:
+                    self._waits += 1
+                self._total_wait_time += wait_time
+                self._max_wait_time = max(self._max_wait_time, wait_time)
+            return PooledConnection(self, entry)
+
+    def release(self, entry):
+        """Return a connection to the pool, rolling back any open transaction and resetting session options"""
+        healthy = True
+        try:
+            entry.conn.rollback()
+            cursor = entry.conn.cursor()
+            cursor.execute(SESSION_RESET_SQL)
+            cursor.close()
+        except Exception:
+            healthy = False
+
+        now = time.monotonic()
+        with self._cond:
+            if self._closed or not healthy or self._is_expired(entry, now):
+                self._size -= 1
+                discard = True
+            else:
+                entry.last_used = now
+                self._idle.append(entry)
+                discard = False
+            self._cond.notify()
+        if discard:
+            self._discard(entry)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close(self):
+        """Close idle connections and stop handing out new ones"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._discard(entry)
+
+    def stats(self):
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                'min_size': self.config.pool_min_size,
+                'max_size': self.config.pool_max_size,
+                'size': self._size,
+                'in_use': self._size - idle,
+                'idle': idle,
+                'checkouts': self._checkouts,
+                'checkout_failures': self._checkout_failures,
+                'waits': self._waits,
+                'avg_wait_ms': round(self._total_wait_time / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                'max_wait_ms': round(self._max_wait_time * 1000, 3),
+                'connections_created': self._created,
+                'connections_discarded': self._discarded,
+            }
+
+
 db_config = DatabaseConfig()
 
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Get or create the process-wide connection pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(db_config)
+    return _pool
+
+def reset_pool():
+    """Drop the pool inherited from a parent process; call in forked workers"""
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+def close_pool():
+    """Close idle pooled connections on shutdown"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
 def get_db_connection():
-    return db_config.get_connection()
+    """Borrow a pooled connection; calling close() returns it to the pool"""
+    return get_pool().acquire()
+
+@contextmanager
+def db_connection(timeout=None):
+    """Borrow a pooled connection for the duration of a with-block"""
+    with get_pool().connection(timeout) as conn:
+        yield conn
+
+def get_pool_stats():
+    return get_pool().stats()
+
+def get_db():
+    """Get the request-scoped connection, borrowing one from the pool on first use"""
+    if 'db_conn' not in g:
+        g.db_conn = get_db_connection()
+    return g.db_conn
+
+def release_db():
+    """Return the request-scoped connection to the pool before the request ends"""
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        conn.close()
+
+def close_db(exc=None):
+    """Teardown handler: roll back on error and hand the connection back to the pool"""
+    conn = g.pop('db_conn', None)
+    if conn is None:
+        return
+    try:
+        if exc is not None:
+            conn.rollback()
+    except Exception as e:
+        print(f'Database rollback error: {e}')
+    finally:
+        # Uncommitted work is rolled back when the pool takes the connection back
+        conn.close()
+
+def init_app(app):
+    app.teardown_appcontext(close_db)
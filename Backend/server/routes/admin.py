@@ -1,10 +1,25 @@
 from flask import Blueprint, request, jsonify
-from config.database import get_db_connection
-from utils.jwt_utils import require_auth, require_role
+from config.database import get_db
+from utils.jwt_utils import require_auth, require_role, revoke_user_tokens
 from utils.azure_storage import get_azure_storage
-import bcrypt
+from utils.password_utils import hash_password, PasswordHasherBusy, IMPORT_BCRYPT_ROUNDS
+from utils.request_flags import parse_flag
+from utils.row_mapper import RowMapper, Column, to_float, to_bool, to_iso
+from utils.streaming import stream_json_array
+from utils.pagination import InvalidCursorError, get_page_args, decode_cursor, keyset_predicate, paginate
+from utils.cache import cached_json, bump_generation
+from utils.leaderboard import get_ranked_cache, invalidate_rankings
+from utils.batch import BULK_INSERT_MAX_ROWS, BatchAborted, execute_batched, values_chunks
+from utils.semester_plan import DAYS_PER_WEEK, PERIODS_PER_DAY, PlanError, parse_plan, find_conflicts
+from utils.timetable import TimetableBusy, get_timetable_registry, load_section, load_semester, lock_semester
+from utils.schedule_cache import invalidate_schedules
+from utils.timetable_solver import (Problem, SolverRoom, SolverSection, get_timetable_solver,
+                                    SOLVER_DAYS, SOLVER_DEFAULT_PERIODS, SOLVER_DEFAULT_SESSIONS, SOLVER_SEEDS, SOLVER_TIME_LIMIT)
+from utils.bulk_import import ImportFormatError, ImportSpec, Field, parse_int, parse_email, iter_upload_rows, run_import
+from utils.jobs import get_job_registry
 import time
 import os
+import tempfile
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -18,12 +33,11 @@ def get_all_courses():
     start_time = time.time()
     try:
         print('[Backend] get_all_courses called')
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         # Use GetAllCoursesWithStats to get courses with section, student, and tutor counts
         cursor.execute('EXEC GetAllCoursesWithStats')
         courses = cursor.fetchall()
-        conn.close()
         
         elapsed = time.time() - start_time
         print(f'[Backend] get_all_courses completed in {elapsed:.2f}s, returned {len(courses)} courses')
@@ -56,7 +70,7 @@ def preview_section_ids():
         l_count = request.args.get('l_count', type=int, default=0)
         kstn_count = request.args.get('kstn_count', type=int, default=0)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC sp_GetSectionIDsByCount %s, %s, %s', (
@@ -66,7 +80,6 @@ def preview_section_ids():
         ))
         
         sections = cursor.fetchall()
-        conn.close()
         
         result = [section[0] for section in sections]  # Extract Section_ID from each row
         return jsonify(result)
@@ -81,7 +94,7 @@ def create_course_with_sections():
     """Create a new course with sections - Using stored procedure sp_CreateCourseWithSections"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Call sp_CreateCourseWithSections
@@ -112,7 +125,6 @@ def create_course_with_sections():
         cursor.execute('SELECT Course_ID, Name, Credit, CCategory FROM [Course] WHERE Course_ID = %s', (data['Course_ID'],))
         course_result = cursor.fetchone()
         
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -145,7 +157,7 @@ def create_course():
     """Create a new course - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC CreateCourse %s, %s, %s, %s', (
@@ -157,7 +169,6 @@ def create_course():
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -180,7 +191,7 @@ def update_course(course_id):
     """Update a course - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC UpdateCourse %s, %s, %s, %s', (
@@ -192,7 +203,8 @@ def update_course(course_id):
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
+        # Timetables show the course name
+        invalidate_schedules()
 
         return jsonify({
             'success': True,
@@ -214,12 +226,14 @@ def update_course(course_id):
 def delete_course(course_id):
     """Delete a course - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC DeleteCourse %s', (course_id,))
         conn.commit()
-        conn.close()
+        # Its sections may be in any semester
+        get_timetable_registry().invalidate()
+        invalidate_schedules()
 
         return jsonify({'success': True, 'message': 'Course deleted successfully'})
     except Exception as e:
@@ -232,11 +246,10 @@ def delete_course(course_id):
 def get_all_categories():
     """Get all distinct categories from courses - Using stored procedure GetAllCategories"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetAllCategories')
         categories = cursor.fetchall()
-        conn.close()
         
         result = [category[0] for category in categories if category[0]]
         return jsonify(result)
@@ -259,7 +272,7 @@ def search_courses():
         
         print(f'[Backend] search_courses called with filters: search={search_query}, min_credit={min_credit}, max_credit={max_credit}')
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC SearchCourses %s, %s, %s, %s, %s', (
@@ -271,7 +284,6 @@ def search_courses():
         ))
         
         courses = cursor.fetchall()
-        conn.close()
         
         elapsed = time.time() - start_time
         print(f'[Backend] search_courses completed in {elapsed:.2f}s, returned {len(courses)} courses')
@@ -298,12 +310,11 @@ def search_courses():
 def get_course_details(course_id):
     """Get course details with statistics - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC GetCourseDetails %s', (course_id,))
         result = cursor.fetchone()
-        conn.close()
         
         if not result:
             return jsonify({'success': False, 'error': 'Course not found'}), 404
@@ -331,7 +342,7 @@ def get_course_sections(course_id):
     start_time = time.time()
     try:
         print(f'[Backend] get_course_sections called for course_id={course_id}')
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC GetCourseSections %s', (course_id,))
@@ -348,7 +359,6 @@ def get_course_sections(course_id):
         status_counts = cursor.fetchall()
         print(f'[Backend] Assessment Status distribution for course {course_id}: {status_counts}')
         
-        conn.close()
         
         elapsed = time.time() - start_time
         print(f'[Backend] get_course_sections completed in {elapsed:.2f}s, returned {len(sections)} sections')
@@ -385,7 +395,7 @@ def get_course_students(course_id):
         semester = request.args.get('semester', None)
         status = request.args.get('status', None)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC GetCourseStudents %s, %s, %s, %s', (
@@ -396,7 +406,6 @@ def get_course_students(course_id):
         ))
         
         students = cursor.fetchall()
-        conn.close()
         
         result = []
         for student in students:
@@ -433,7 +442,7 @@ def get_course_tutors(course_id):
         section_id = request.args.get('section_id', None)
         semester = request.args.get('semester', None)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC GetCourseTutors %s, %s, %s', (
@@ -443,7 +452,6 @@ def get_course_tutors(course_id):
         ))
         
         tutors = cursor.fetchall()
-        conn.close()
         
         result = []
         for tutor in tutors:
@@ -473,12 +481,11 @@ def get_course_tutors(course_id):
 def get_course_statistics(course_id):
     """Get detailed statistics for a course - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC GetCourseStatistics %s', (course_id,))
         stats = cursor.fetchone()
-        conn.close()
         
         if not stats:
             return jsonify({'success': False, 'error': 'Course not found'}), 404
@@ -506,12 +513,11 @@ def get_course_statistics(course_id):
 def get_courses_by_semester(semester):
     """Get all courses for a specific semester - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC GetCoursesBySemester %s', (semester,))
         courses = cursor.fetchall()
-        conn.close()
         
         result = []
         for course in courses:
@@ -537,7 +543,7 @@ def get_course_enrollment_trend(course_id):
         start_semester = request.args.get('start_semester', None)
         end_semester = request.args.get('end_semester', None)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC GetCourseEnrollmentTrend %s, %s, %s', (
@@ -547,7 +553,6 @@ def get_course_enrollment_trend(course_id):
         ))
         
         trends = cursor.fetchall()
-        conn.close()
         
         result = []
         for trend in trends:
@@ -571,11 +576,10 @@ def get_course_enrollment_trend(course_id):
 def get_all_sections():
     """Get all sections - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetAllSections')
         sections = cursor.fetchall()
-        conn.close()
 
         result = []
         for section in sections:
@@ -598,7 +602,7 @@ def create_section():
     """Create a new section - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC CreateSection %s, %s, %s', (
@@ -609,7 +613,6 @@ def create_section():
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -631,7 +634,7 @@ def update_section(course_id, section_id, semester):
     """Update a section"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Note: Section primary key is composite, so we can only update non-key fields
@@ -648,13 +651,13 @@ def update_section(course_id, section_id, semester):
 def delete_section(course_id, section_id, semester):
     """Delete a section"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC DeleteSection %s, %s, %s', (section_id, course_id, semester))
 
         conn.commit()
-        conn.close()
+        _update_timetable(semester, lambda timetable: timetable.remove_section(section_id, course_id))
 
         return jsonify({'success': True, 'message': 'Section deleted successfully'})
     except Exception as e:
@@ -663,6 +666,21 @@ def delete_section(course_id, section_id, semester):
 
 # ==================== ASSIGNMENTS MANAGEMENT ====================
 
+# GetAllAssignments columns: AssignmentID, Course_ID, Semester, MaxScore, accepted_specification,
+# submission_deadline, instructions, TaskURL, Course_Name, StudentCount
+ASSIGNMENT_ROW = RowMapper(
+    'AssignmentID',
+    'Course_ID',
+    'Semester',
+    'MaxScore',
+    'accepted_specification',
+    ('submission_deadline', to_iso),
+    'instructions',
+    'TaskURL',
+    'Course_Name',
+    ('StudentCount', None, 0),
+)
+
 @admin_bp.route('/assignments', methods=['GET'])
 @require_auth
 @require_role(['admin'])
@@ -670,36 +688,11 @@ def get_all_assignments():
     """Get all assignments - Using stored procedure"""
     try:
         print('[Backend] get_all_assignments called')
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         print('[Backend] Executing GetAllAssignments procedure...')
         cursor.execute('EXEC GetAllAssignments')
-        assignments = cursor.fetchall()
-        print(f'[Backend] GetAllAssignments returned {len(assignments)} assignments')
-        conn.close()
-
-        result = []
-        for assignment in assignments:
-            try:
-                # Tuple access: AssignmentID, Course_ID, Semester, MaxScore, accepted_specification, submission_deadline, instructions, TaskURL, Course_Name, StudentCount
-                result.append({
-                    'AssignmentID': assignment[0],
-                    'Course_ID': assignment[1],
-                    'Semester': assignment[2],
-                    'MaxScore': assignment[3],
-                    'accepted_specification': assignment[4],
-                    'submission_deadline': str(assignment[5]) if assignment[5] else None,
-                    'instructions': assignment[6],
-                    'TaskURL': assignment[7] if len(assignment) > 7 else None,
-                    'Course_Name': assignment[8] if len(assignment) > 8 else None,
-                    'StudentCount': assignment[9] if len(assignment) > 9 else 0,
-                })
-            except Exception as parse_error:
-                print(f'[Backend] Error parsing assignment: {parse_error}, assignment data: {assignment}')
-                continue
-
-        print(f'[Backend] Returning {len(result)} assignments')
-        return jsonify(result)
+        return stream_json_array(ASSIGNMENT_ROW.iter_rows(cursor))
     except Exception as e:
         print(f'[Backend] Get all assignments error: {e}')
         import traceback
@@ -714,38 +707,16 @@ def get_assignments_by_course():
     try:
         course_id = request.args.get('course_id', None)
         print(f'[Backend] get_assignments_by_course called with course_id={course_id}')
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         print('[Backend] Executing GetAssignmentsByCourse procedure...')
         if course_id:
             cursor.execute('EXEC GetAssignmentsByCourse %s', (course_id,))
         else:
             cursor.execute('EXEC GetAssignmentsByCourse NULL')
-        assignments = cursor.fetchall()
-        print(f'[Backend] GetAssignmentsByCourse returned {len(assignments)} assignments')
-        conn.close()
-
-        result = []
-        for assignment in assignments:
-            try:
-                # Tuple access: AssignmentID, Course_ID, Semester, MaxScore, accepted_specification, submission_deadline, instructions, TaskURL, Course_Name, StudentCount
-                result.append({
-                    'AssignmentID': assignment[0],
-                    'Course_ID': assignment[1],
-                    'Semester': assignment[2],
-                    'MaxScore': assignment[3],
-                    'accepted_specification': assignment[4],
-                    'submission_deadline': str(assignment[5]) if assignment[5] else None,
-                    'instructions': assignment[6],
-                    'TaskURL': assignment[7] if len(assignment) > 7 else None,
-                    'Course_Name': assignment[8] if len(assignment) > 8 else None,
-                    'StudentCount': assignment[9] if len(assignment) > 9 else 0,
-                })
-            except Exception as parse_error:
-                print(f'[Backend] Error parsing assignment: {parse_error}, assignment data: {assignment}')
-                continue
+        result = ASSIGNMENT_ROW.map_all(cursor)
+        print(f'[Backend] GetAssignmentsByCourse returned {len(result)} assignments')
 
-        print(f'[Backend] Returning {len(result)} assignments')
         return jsonify(result)
     except Exception as e:
         print(f'[Backend] Get assignments by course error: {e}')
@@ -760,7 +731,7 @@ def create_assignment():
     """Create a new assignment - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Parse submission_deadline if provided
@@ -791,7 +762,6 @@ def create_assignment():
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -859,7 +829,7 @@ def update_assignment(assignment_id):
     """Update an assignment - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Parse submission_deadline if provided
@@ -890,7 +860,6 @@ def update_assignment(assignment_id):
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -920,12 +889,11 @@ def update_assignment(assignment_id):
 def delete_assignment(assignment_id):
     """Delete an assignment - Using stored procedure (deletes Assignment_Definition and cascades to Assignment_Submission)"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC DeleteAssignment %s', (assignment_id,))
         conn.commit()
-        conn.close()
 
         return jsonify({'success': True, 'message': 'Assignment deleted successfully'})
     except Exception as e:
@@ -940,11 +908,10 @@ def delete_assignment(assignment_id):
 def get_assignment_submissions(assignment_id):
     """Get all assignment submissions for a specific assignment"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetAssignmentSubmissionsByAssignmentID %s', (assignment_id,))
         submissions = cursor.fetchall()
-        conn.close()
 
         result = []
         for submission in submissions:
@@ -980,6 +947,27 @@ def get_assignment_submissions(assignment_id):
 
 # ==================== QUIZZES MANAGEMENT ====================
 
+# GetAllQuizzes columns: QuizID, Section_ID, Course_ID, Semester, Grading_method, pass_score, Time_limits,
+# Start_Date, End_Date, content, types, Weight, Correct_answer, Questions, Course_Name, StudentCount
+QUIZ_ROW = RowMapper(
+    'QuizID',
+    'Section_ID',
+    'Course_ID',
+    'Semester',
+    'Grading_method',
+    ('pass_score', to_float),
+    ('Time_limits', to_iso),
+    ('Start_Date', to_iso),
+    ('End_Date', to_iso),
+    'content',
+    'types',
+    ('Weight', to_float),
+    'Correct_answer',
+    'Questions',
+    'Course_Name',
+    ('StudentCount', None, 0),
+)
+
 @admin_bp.route('/quizzes', methods=['GET'])
 @require_auth
 @require_role(['admin'])
@@ -987,42 +975,11 @@ def get_all_quizzes():
     """Get all quizzes - Using stored procedure"""
     try:
         print('[Backend] get_all_quizzes called')
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         print('[Backend] Executing GetAllQuizzes procedure...')
         cursor.execute('EXEC GetAllQuizzes')
-        quizzes = cursor.fetchall()
-        print(f'[Backend] GetAllQuizzes returned {len(quizzes)} quizzes')
-        conn.close()
-
-        result = []
-        for quiz in quizzes:
-            try:
-                # Tuple access: QuizID, Section_ID, Course_ID, Semester, Grading_method, pass_score, Time_limits, Start_Date, End_Date, content, types, Weight, Correct_answer, Questions, Course_Name, StudentCount
-                result.append({
-                    'QuizID': quiz[0],
-                    'Section_ID': quiz[1],
-                    'Course_ID': quiz[2],
-                    'Semester': quiz[3],
-                    'Grading_method': quiz[4],
-                    'pass_score': float(quiz[5]) if quiz[5] else None,
-                    'Time_limits': str(quiz[6]) if quiz[6] else None,
-                    'Start_Date': str(quiz[7]) if quiz[7] else None,
-                    'End_Date': str(quiz[8]) if quiz[8] else None,
-                    'content': quiz[9],
-                    'types': quiz[10],
-                    'Weight': float(quiz[11]) if quiz[11] else None,
-                    'Correct_answer': quiz[12],
-                    'Questions': quiz[13] if len(quiz) > 13 else None,
-                    'Course_Name': quiz[14] if len(quiz) > 14 else None,
-                    'StudentCount': quiz[15] if len(quiz) > 15 else 0,
-                })
-            except Exception as parse_error:
-                print(f'[Backend] Error parsing quiz: {parse_error}, quiz data: {quiz}')
-                continue
-
-        print(f'[Backend] Returning {len(result)} quizzes')
-        return jsonify(result)
+        return stream_json_array(QUIZ_ROW.iter_rows(cursor))
     except Exception as e:
         print(f'[Backend] Get all quizzes error: {e}')
         import traceback
@@ -1037,44 +994,16 @@ def get_quizzes_by_course():
     try:
         course_id = request.args.get('course_id', None)
         print(f'[Backend] get_quizzes_by_course called with course_id={course_id}')
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         print('[Backend] Executing GetQuizzesByCourse procedure...')
         if course_id:
             cursor.execute('EXEC GetQuizzesByCourse %s', (course_id,))
         else:
             cursor.execute('EXEC GetQuizzesByCourse NULL')
-        quizzes = cursor.fetchall()
-        print(f'[Backend] GetQuizzesByCourse returned {len(quizzes)} quizzes')
-        conn.close()
+        result = QUIZ_ROW.map_all(cursor)
+        print(f'[Backend] GetQuizzesByCourse returned {len(result)} quizzes')
 
-        result = []
-        for quiz in quizzes:
-            try:
-                # Tuple access: QuizID, Section_ID, Course_ID, Semester, Grading_method, pass_score, Time_limits, Start_Date, End_Date, content, types, Weight, Correct_answer, Questions, Course_Name, StudentCount
-                result.append({
-                    'QuizID': quiz[0],
-                    'Section_ID': quiz[1],
-                    'Course_ID': quiz[2],
-                    'Semester': quiz[3],
-                    'Grading_method': quiz[4],
-                    'pass_score': float(quiz[5]) if quiz[5] else None,
-                    'Time_limits': str(quiz[6]) if quiz[6] else None,
-                    'Start_Date': str(quiz[7]) if quiz[7] else None,
-                    'End_Date': str(quiz[8]) if quiz[8] else None,
-                    'content': quiz[9],
-                    'types': quiz[10],
-                    'Weight': float(quiz[11]) if quiz[11] else None,
-                    'Correct_answer': quiz[12],
-                    'Questions': quiz[13] if len(quiz) > 13 else None,
-                    'Course_Name': quiz[14] if len(quiz) > 14 else None,
-                    'StudentCount': quiz[15] if len(quiz) > 15 else 0,
-                })
-            except Exception as parse_error:
-                print(f'[Backend] Error parsing quiz: {parse_error}, quiz data: {quiz}')
-                continue
-
-        print(f'[Backend] Returning {len(result)} quizzes')
         return jsonify(result)
     except Exception as e:
         print(f'[Backend] Get quizzes by course error: {e}')
@@ -1089,7 +1018,7 @@ def create_quiz():
     """Create a new quiz - Using stored procedure (creates Quiz_Questions)"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Convert Questions array to JSON string if provided
@@ -1150,7 +1079,6 @@ def create_quiz():
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -1185,7 +1113,7 @@ def update_quiz(quiz_id):
     """Update a quiz - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Convert Questions to JSON string if provided
@@ -1321,7 +1249,6 @@ def update_quiz(quiz_id):
             import traceback
             traceback.print_exc()
             conn.rollback()
-            conn.close()
             raise
 
         result = cursor.fetchone()
@@ -1360,7 +1287,6 @@ def update_quiz(quiz_id):
         else:
             print(f'[Backend] UpdateQuiz - No Questions saved (saved_questions is None)')
         
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -1394,12 +1320,11 @@ def update_quiz(quiz_id):
 def delete_quiz(quiz_id):
     """Delete a quiz - Using stored procedure (deletes Quiz_Questions and cascades to Quiz_Answer)"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC DeleteQuiz %s', (quiz_id,))
         conn.commit()
-        conn.close()
 
         return jsonify({'success': True, 'message': 'Quiz deleted successfully'})
     except Exception as e:
@@ -1412,13 +1337,12 @@ def delete_quiz(quiz_id):
 def get_quiz_answers(quiz_id):
     """Get all student answers for a quiz - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         print(f'[Backend] get_quiz_answers called with quiz_id={quiz_id}')
         cursor.execute('EXEC GetQuizAnswersByQuizID %s', (quiz_id,))
         answers = cursor.fetchall()
-        conn.close()
         
         result = []
         for answer in answers:
@@ -1448,13 +1372,26 @@ def get_quiz_answers(quiz_id):
 
 # ==================== STUDENTS MANAGEMENT ====================
 
+# s.* (University_ID, Major, Current_degree), u.First_Name, u.Last_Name, u.Email, u.Phone_Number, u.Address, u.National_ID
+STUDENT_ROW = RowMapper(
+    'University_ID',
+    'Major',
+    'Current_degree',
+    'First_Name',
+    'Last_Name',
+    'Email',
+    'Phone_Number',
+    'Address',
+    'National_ID',
+)
+
 @admin_bp.route('/students', methods=['GET'])
 @require_auth
 @require_role(['admin'])
 def get_all_students():
     """Get all students with user info"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute("""
             SELECT s.*, u.First_Name, u.Last_Name, u.Email, u.Phone_Number, u.Address, u.National_ID
@@ -1462,25 +1399,7 @@ def get_all_students():
             INNER JOIN [Users] u ON s.University_ID = u.University_ID
             ORDER BY s.University_ID
         """)
-        students = cursor.fetchall()
-        conn.close()
-
-        result = []
-        for student in students:
-            # Tuple access: s.* (University_ID, Major, Current_degree), u.First_Name, u.Last_Name, u.Email, u.Phone_Number, u.Address, u.National_ID
-            result.append({
-                'University_ID': student[0],
-                'Major': student[1],
-                'Current_degree': student[2],
-                'First_Name': student[3],
-                'Last_Name': student[4],
-                'Email': student[5],
-                'Phone_Number': student[6],
-                'Address': student[7],
-                'National_ID': student[8],
-            })
-
-        return jsonify(result)
+        return stream_json_array(STUDENT_ROW.iter_rows(cursor))
     except Exception as e:
         print(f'Get all students error: {e}')
         return jsonify({'success': False, 'error': 'Failed to fetch students'}), 500
@@ -1492,12 +1411,13 @@ def create_student():
     """Create a new student - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
-        cursor = conn.cursor()
 
         # Hash password if provided
         password = data.get('Password', '123456')
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = hash_password(password)
+
+        conn = get_db()
+        cursor = conn.cursor()
 
         cursor.execute('EXEC CreateStudent %s, %s, %s, %s, %s, %s, %s, %s, %s, %s', (
             data['University_ID'],
@@ -1514,7 +1434,6 @@ def create_student():
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -1531,6 +1450,9 @@ def create_student():
                 'National_ID': result[8],
             }
         }), 201
+    except PasswordHasherBusy as e:
+        print(f'Password hashing busy: {e}')
+        return jsonify({'success': False, 'error': 'Server is busy, please try again'}), 503
     except Exception as e:
         print(f'Create student error: {e}')
         return jsonify({'success': False, 'error': f'Failed to create student: {str(e)}'}), 500
@@ -1542,7 +1464,7 @@ def update_student(university_id):
     """Update a student - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC UpdateStudent %s, %s, %s, %s, %s, %s, %s, %s, %s', (
@@ -1559,7 +1481,6 @@ def update_student(university_id):
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -1586,12 +1507,14 @@ def update_student(university_id):
 def delete_student(university_id):
     """Delete a student - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC DeleteStudent %s', (university_id,))
         conn.commit()
-        conn.close()
+        # Their enrollments or teaching assignments go with them
+        get_timetable_registry().invalidate()
+        invalidate_schedules()
 
         return jsonify({'success': True, 'message': 'Student deleted successfully'})
     except Exception as e:
@@ -1606,11 +1529,10 @@ def delete_student(university_id):
 def get_all_tutors():
     """Get all tutors with user info - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetAllTutors')
         tutors = cursor.fetchall()
-        conn.close()
 
         result = []
         for tutor in tutors:
@@ -1642,12 +1564,13 @@ def create_tutor():
     """Create a new tutor - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
-        cursor = conn.cursor()
 
         # Hash password if provided
         password = data.get('Password', '123456')
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = hash_password(password)
+
+        conn = get_db()
+        cursor = conn.cursor()
 
         cursor.execute('EXEC CreateTutor %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s', (
             data['University_ID'],
@@ -1666,7 +1589,6 @@ def create_tutor():
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -1686,6 +1608,9 @@ def create_tutor():
                 'National_ID': result[11],
             }
         }), 201
+    except PasswordHasherBusy as e:
+        print(f'Password hashing busy: {e}')
+        return jsonify({'success': False, 'error': 'Server is busy, please try again'}), 503
     except Exception as e:
         print(f'Create tutor error: {e}')
         return jsonify({'success': False, 'error': f'Failed to create tutor: {str(e)}'}), 500
@@ -1697,7 +1622,7 @@ def update_tutor(university_id):
     """Update a tutor - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC UpdateTutor %s, %s, %s, %s, %s, %s, %s, %s, %s, %s', (
@@ -1716,7 +1641,6 @@ def update_tutor(university_id):
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -1746,66 +1670,274 @@ def update_tutor(university_id):
 def delete_tutor(university_id):
     """Delete a tutor - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC DeleteTutor %s', (university_id,))
         conn.commit()
-        conn.close()
+        # Their enrollments or teaching assignments go with them
+        get_timetable_registry().invalidate()
+        invalidate_schedules()
 
         return jsonify({'success': True, 'message': 'Tutor deleted successfully'})
     except Exception as e:
         print(f'Delete tutor error: {e}')
         return jsonify({'success': False, 'error': f'Failed to delete tutor: {str(e)}'}), 500
 
+# ==================== BULK IMPORT (Students & Tutors) ====================
+
+DEFAULT_IMPORT_PASSWORD = '123456'
+# Attempts per row while the password hasher is saturated, with a growing pause
+IMPORT_HASH_ATTEMPTS = 4
+
+def _hash_import_passwords():
+    """
+    prepare hook for ImportSpec: bcrypt each row's password with its own salt
+
+    One hash is made right away, before any row is written, so a saturated
+    hasher surfaces as PasswordHasherBusy (503) instead of a partial import.
+    Per-row hashes are retried, then reported as row errors. Imports use
+    IMPORT_BCRYPT_ROUNDS; the first login rehashes at the full cost.
+    """
+    hash_password(DEFAULT_IMPORT_PASSWORD, IMPORT_BCRYPT_ROUNDS)
+
+    def prepare(values):
+        password = values['Password'] or DEFAULT_IMPORT_PASSWORD
+        for attempt in range(IMPORT_HASH_ATTEMPTS):
+            try:
+                return {**values, 'Password': hash_password(password, IMPORT_BCRYPT_ROUNDS)}
+            except PasswordHasherBusy:
+                time.sleep(0.5 * (attempt + 1))
+        raise ValueError('Password could not be hashed, server is busy; import this row again')
+    return prepare
+
+def _student_import_spec():
+    return ImportSpec(
+        'students',
+        'EXEC CreateStudent %s, %s, %s, %s, %s, %s, %s, %s, %s, %s',
+        [
+            Field('University_ID', required=True, parser=parse_int),
+            Field('First_Name', required=True),
+            Field('Last_Name', required=True),
+            Field('Email', required=True, parser=parse_email),
+            Field('Phone_Number'),
+            Field('Address'),
+            Field('National_ID'),
+            Field('Major', required=True),
+            Field('Current_degree', default='Bachelor'),
+            Field('Password'),
+        ],
+        key='University_ID',
+        prepare=_hash_import_passwords(),
+    )
+
+def _tutor_import_spec():
+    return ImportSpec(
+        'tutors',
+        'EXEC CreateTutor %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s',
+        [
+            Field('University_ID', required=True, parser=parse_int),
+            Field('First_Name', required=True),
+            Field('Last_Name', required=True),
+            Field('Email', required=True, parser=parse_email),
+            Field('Phone_Number'),
+            Field('Address'),
+            Field('National_ID'),
+            Field('Name'),
+            Field('Academic_Rank'),
+            Field('Details'),
+            Field('Department_Name'),
+            Field('Password'),
+        ],
+        key='University_ID',
+        prepare=_hash_import_passwords(),
+    )
+
+def _run_upload_import(spec, kind):
+    """
+    Import the uploaded 'file' synchronously, or as a background job when
+    ?async=true; each batch of rows is committed on its own
+    """
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'success': False, 'error': 'file is required'}), 400
+    filename = upload.filename
+    try:
+        run_async = parse_flag(request.args.get('async') or request.form.get('async'), 'async')
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    if not run_async:
+        try:
+            summary = run_import(spec, iter_upload_rows(upload.stream, filename))
+        except ImportFormatError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        print(f'[Backend] import {kind}: {summary["inserted"]}/{summary["processed"]} rows inserted')
+        return jsonify({'success': True, **summary})
+
+    # The request stream is gone once we return, so spool it to disk for the job
+    suffix = os.path.splitext(filename)[1]
+    spool = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+    path = spool.name
+
+    def job_fn(job):
+        try:
+            with open(path, 'rb') as stream:
+                def progress(**counts):
+                    job.update(bytes_read=stream.tell(), bytes_total=bytes_total, **counts)
+                job.update(processed=0, inserted=0, failed=0, bytes_read=0, bytes_total=bytes_total)
+                summary = run_import(spec, iter_upload_rows(stream, filename), progress)
+                job.update(bytes_read=bytes_total)
+                # Rows landed after the request's own cache bump
+                bump_generation('stats')
+                return summary
+        finally:
+            os.remove(path)
+
+    try:
+        with spool:
+            upload.save(spool)
+        bytes_total = os.path.getsize(path)
+        job = get_job_registry().submit(f'import-{kind}', job_fn, owner_id=request.current_user_id)
+    except Exception:
+        # No job owns the file yet, so nothing else would remove it
+        os.remove(path)
+        raise
+    print(f'[Backend] import {kind}: queued job {job.id} ({bytes_total} bytes)')
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/admin/import/jobs/{job.id}',
+    }), 202
+
+@admin_bp.route('/students/import', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def import_students():
+    """Bulk create students from a CSV/Excel upload - Using stored procedure CreateStudent"""
+    try:
+        return _run_upload_import(_student_import_spec(), 'students')
+    except PasswordHasherBusy as e:
+        print(f'Password hashing busy: {e}')
+        return jsonify({'success': False, 'error': 'Server is busy, please try again'}), 503
+    except Exception as e:
+        print(f'Import students error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to import students: {str(e)}'}), 500
+
+@admin_bp.route('/tutors/import', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def import_tutors():
+    """Bulk create tutors from a CSV/Excel upload - Using stored procedure CreateTutor"""
+    try:
+        return _run_upload_import(_tutor_import_spec(), 'tutors')
+    except PasswordHasherBusy as e:
+        print(f'Password hashing busy: {e}')
+        return jsonify({'success': False, 'error': 'Server is busy, please try again'}), 503
+    except Exception as e:
+        print(f'Import tutors error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to import tutors: {str(e)}'}), 500
+
+@admin_bp.route('/import/jobs/<job_id>', methods=['GET'])
+@admin_bp.route('/jobs/<job_id>', methods=['GET'])
+@require_auth
+@require_role(['admin'])
+def get_import_job(job_id):
+    """Poll the progress of a background job (imports, timetable solving); only its starter sees it"""
+    state = get_job_registry().get(job_id)
+    # Someone else's job answers like a missing one, so ids cannot be probed
+    if state is None or state.get('owner_id') != request.current_user_id:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, **state})
+
 # ==================== ASSESSMENTS/GRADES MANAGEMENT ====================
 
+# a.* (University_ID, Section_ID, Course_ID, Semester, Assessment_ID, Registration_Date, Potential_Withdrawal_Date,
+# Status, Final_Grade, Midterm_Grade, Quiz_Grade, Assignment_Grade), u.First_Name, u.Last_Name, Course_Name
+ASSESSMENT_ROW = RowMapper(
+    'University_ID',
+    'Section_ID',
+    'Course_ID',
+    'Semester',
+    'Assessment_ID',
+    ('Registration_Date', to_iso),
+    ('Potential_Withdrawal_Date', to_iso),
+    'Status',
+    ('Final_Grade', to_float),
+    ('Midterm_Grade', to_float),
+    ('Quiz_Grade', to_float),
+    ('Assignment_Grade', to_float),
+    'First_Name',
+    'Last_Name',
+    'Course_Name',
+    computed={'Student_Name': lambda d: f"{d['First_Name']} {d['Last_Name']}"},
+)
+
+# Keyset for paging assessments: (Registration_Date, University_ID, Assessment_ID) DESC
+ASSESSMENT_KEYSET = (('a.Registration_Date', True), ('a.University_ID', False), ('a.Assessment_ID', False))
+ASSESSMENT_KEY_INDEXES = (5, 0, 4)
+
 @admin_bp.route('/assessments', methods=['GET'])
 @require_auth
 @require_role(['admin'])
 def get_all_assessments():
-    """Get all assessments with grades"""
+    """Get assessments with grades; pass limit (and cursor) for keyset pagination"""
     try:
-        conn = get_db_connection()
+        limit, page_cursor = get_page_args()
+
+        # Optional filters
+        where = []
+        params = []
+        for arg, column in (('course', 'a.Course_ID'), ('semester', 'a.Semester'), ('status', 'a.Status')):
+            value = request.args.get(arg)
+            if value:
+                where.append(f'{column} = %s')
+                params.append(value)
+
+        conn = get_db()
         cursor = conn.cursor()
-        
-        # Set query timeout to 25 seconds
-        cursor.execute("SET QUERY_GOVERNOR_COST_LIMIT 0")
-        cursor.execute("SET LOCK_TIMEOUT 25000")
-        
-        cursor.execute("""
-            SELECT a.*, u.First_Name, u.Last_Name, c.Name as Course_Name
+
+        if limit is None:
+            # Legacy full listing: the unbounded scan may wait on locks, so cap it at 25 seconds
+            cursor.execute("SET LOCK_TIMEOUT 25000")
+            where_sql = f"WHERE {' AND '.join(where)}" if where else ''
+            cursor.execute(f"""
+                SELECT a.*, u.First_Name, u.Last_Name, c.Name as Course_Name
+                FROM [Assessment] a
+                INNER JOIN [Users] u ON a.University_ID = u.University_ID
+                INNER JOIN [Course] c ON a.Course_ID = c.Course_ID
+                {where_sql}
+                ORDER BY a.Registration_Date DESC, a.University_ID DESC, a.Assessment_ID DESC
+            """, tuple(params))
+            return stream_json_array(ASSESSMENT_ROW.iter_rows(cursor))
+
+        if page_cursor:
+            keyset_sql, keyset_params = keyset_predicate(ASSESSMENT_KEYSET, decode_cursor(page_cursor, len(ASSESSMENT_KEYSET)))
+            where.append(keyset_sql)
+            params.extend(keyset_params)
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ''
+
+        cursor.execute(f"""
+            SELECT TOP (%s) a.*, u.First_Name, u.Last_Name, c.Name as Course_Name
             FROM [Assessment] a
             INNER JOIN [Users] u ON a.University_ID = u.University_ID
             INNER JOIN [Course] c ON a.Course_ID = c.Course_ID
-            ORDER BY a.Registration_Date DESC
-        """)
-        assessments = cursor.fetchall()
-        conn.close()
-
-        result = []
-        for assessment in assessments:
-            # Tuple access: a.* (University_ID, Section_ID, Course_ID, Semester, Assessment_ID, Registration_Date, Potential_Withdrawal_Date, Status, Final_Grade, Midterm_Grade, Quiz_Grade, Assignment_Grade), u.First_Name, u.Last_Name, Course_Name
-            result.append({
-                'University_ID': assessment[0],
-                'Section_ID': assessment[1],
-                'Course_ID': assessment[2],
-                'Semester': assessment[3],
-                'Assessment_ID': assessment[4],
-                'Registration_Date': str(assessment[5]) if assessment[5] else None,
-                'Potential_Withdrawal_Date': str(assessment[6]) if assessment[6] else None,
-                'Status': assessment[7],
-                'Final_Grade': float(assessment[8]) if assessment[8] else None,
-                'Midterm_Grade': float(assessment[9]) if assessment[9] else None,
-                'Quiz_Grade': float(assessment[10]) if assessment[10] else None,
-                'Assignment_Grade': float(assessment[11]) if assessment[11] else None,
-                'First_Name': assessment[12],
-                'Last_Name': assessment[13],
-                'Student_Name': f"{assessment[12]} {assessment[13]}",
-                'Course_Name': assessment[14],  # Course_Name from JOIN
-            })
-
-        return jsonify(result)
+            {where_sql}
+            ORDER BY a.Registration_Date DESC, a.University_ID DESC, a.Assessment_ID DESC
+        """, (limit + 1, *params))
+        rows, next_cursor = paginate(cursor.fetchall(), limit, ASSESSMENT_KEY_INDEXES)
+
+        response = jsonify(ASSESSMENT_ROW.map_all(cursor, rows))
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    except InvalidCursorError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f'Get all assessments error: {e}')
         import traceback
@@ -1819,7 +1951,7 @@ def update_assessment_grade(university_id, section_id, course_id, semester, asse
     """Update assessment grades - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC UpdateAssessmentGrade %s, %s, %s, %s, %s, %s, %s, %s, %s, %s', (
@@ -1837,7 +1969,7 @@ def update_assessment_grade(university_id, section_id, course_id, semester, asse
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
+        invalidate_rankings()
 
         return jsonify({
             'success': True,
@@ -1866,16 +1998,60 @@ def update_assessment_grade(university_id, section_id, course_id, semester, asse
 
 # ==================== SUBMISSIONS MANAGEMENT ====================
 
+# University_ID, AssignmentID, Assessment_ID, score, accepted_specification, late_flag_indicator, SubmitDate,
+# attached_files, status, Comments, First_Name, Last_Name, Course_ID, Semester, Course_Name
+SUBMISSION_ROW = RowMapper(
+    'University_ID',
+    'AssignmentID',
+    'Assessment_ID',
+    ('score', to_float),
+    'accepted_specification',
+    ('late_flag_indicator', to_bool),
+    ('SubmitDate', to_iso),
+    'attached_files',
+    'status',
+    'Comments',
+    'First_Name',
+    'Last_Name',
+    'Course_ID',
+    'Semester',
+    'Course_Name',
+    computed={'Student_Name': lambda d: f"{d['Last_Name']} {d['First_Name']}"},
+)
+
+# Keyset for paging submissions: (SubmitDate, University_ID, AssignmentID) DESC
+SUBMISSION_KEYSET = (('asub.SubmitDate', True), ('asub.University_ID', False), ('asub.AssignmentID', False))
+SUBMISSION_KEY_INDEXES = (6, 0, 1)
+
 @admin_bp.route('/submissions', methods=['GET'])
 @require_auth
 @require_role(['admin'])
 def get_all_submissions():
-    """Get all submissions - Updated to use Assignment_Submission"""
+    """Get submissions from Assignment_Submission; pass limit (and cursor) for keyset pagination"""
     try:
-        conn = get_db_connection()
+        limit, page_cursor = get_page_args()
+
+        # Optional filters
+        where = []
+        params = []
+        for arg, column in (('course', 'ad.Course_ID'), ('semester', 'ad.Semester'), ('status', 'asub.status')):
+            value = request.args.get(arg)
+            if value:
+                where.append(f'{column} = %s')
+                params.append(value)
+        if limit is not None and page_cursor:
+            keyset_sql, keyset_params = keyset_predicate(SUBMISSION_KEYSET, decode_cursor(page_cursor, len(SUBMISSION_KEYSET)))
+            where.append(keyset_sql)
+            params.extend(keyset_params)
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ''
+        top_sql = 'TOP (%s)' if limit is not None else ''
+        if limit is not None:
+            params.insert(0, limit + 1)
+
+        conn = get_db()
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT 
+        cursor.execute(f"""
+            SELECT {top_sql}
                 asub.University_ID,
                 asub.AssignmentID,
                 asub.Assessment_ID,
@@ -1895,34 +2071,20 @@ def get_all_submissions():
             INNER JOIN [Users] u ON asub.University_ID = u.University_ID
             INNER JOIN [Assignment_Definition] ad ON asub.AssignmentID = ad.AssignmentID
             INNER JOIN [Course] c ON ad.Course_ID = c.Course_ID
-            ORDER BY asub.SubmitDate DESC
-        """)
-        submissions = cursor.fetchall()
-        conn.close()
-
-        result = []
-        for submission in submissions:
-            # Tuple access: University_ID, AssignmentID, Assessment_ID, score, accepted_specification, late_flag_indicator, SubmitDate, attached_files, status, Comments, First_Name, Last_Name, Course_ID, Semester, Course_Name
-            result.append({
-                'University_ID': submission[0],
-                'AssignmentID': submission[1],
-                'Assessment_ID': submission[2],
-                'score': float(submission[3]) if submission[3] is not None else None,
-                'accepted_specification': submission[4],
-                'late_flag_indicator': bool(submission[5]) if submission[5] is not None else None,
-                'SubmitDate': str(submission[6]) if submission[6] else None,
-                'attached_files': submission[7],
-                'status': submission[8],
-                'Comments': submission[9],
-                'First_Name': submission[10],
-                'Last_Name': submission[11],
-                'Student_Name': f"{submission[11]} {submission[10]}",
-                'Course_ID': submission[12],
-                'Semester': submission[13],
-                'Course_Name': submission[14],
-            })
-
-        return jsonify(result)
+            {where_sql}
+            ORDER BY asub.SubmitDate DESC, asub.University_ID DESC, asub.AssignmentID DESC
+        """, tuple(params))
+
+        if limit is None:
+            return stream_json_array(SUBMISSION_ROW.iter_rows(cursor))
+
+        rows, next_cursor = paginate(cursor.fetchall(), limit, SUBMISSION_KEY_INDEXES)
+        response = jsonify(SUBMISSION_ROW.map_all(cursor, rows))
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    except InvalidCursorError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f'Get all submissions error: {e}')
         import traceback
@@ -1936,37 +2098,33 @@ def get_all_submissions():
 @require_role(['admin'])
 def get_statistics():
     """Get system statistics for admin dashboard - Using stored procedure"""
-    start_time = time.time()
-    conn = None
     try:
         print('[Backend] get_statistics called')
-        conn = get_db_connection()
-        cursor = conn.cursor()
 
-        # Call stored procedure
-        cursor.execute('EXEC GetStatistics')
-        result = cursor.fetchone()
-        
-        elapsed = time.time() - start_time
-        print(f'[Backend] get_statistics completed in {elapsed:.2f}s')
-        
-        if not result:
-            # If no result, return zeros
-            stats = {
-                'total_users': 0,
-                'total_students': 0,
-                'total_tutors': 0,
-                'total_admins': 0,
-                'total_courses': 0,
-                'total_sections': 0,
-                'total_assignments': 0,
-                'total_quizzes': 0,
-                'total_submissions': 0,
-                'completed_assignments': 0,
-                'pending_assessments': 0,
-            }
-        else:
-            stats = {
+        def load(cursor):
+            start_time = time.time()
+            cursor.execute('EXEC GetStatistics')
+            result = cursor.fetchone()
+            
+            elapsed = time.time() - start_time
+            print(f'[Backend] get_statistics completed in {elapsed:.2f}s')
+            
+            if not result:
+                # If no result, return zeros
+                return {
+                    'total_users': 0,
+                    'total_students': 0,
+                    'total_tutors': 0,
+                    'total_admins': 0,
+                    'total_courses': 0,
+                    'total_sections': 0,
+                    'total_assignments': 0,
+                    'total_quizzes': 0,
+                    'total_submissions': 0,
+                    'completed_assignments': 0,
+                    'pending_assessments': 0,
+                }
+            return {
                 'total_users': int(result[0]) if result[0] is not None else 0,
                 'total_students': int(result[1]) if result[1] is not None else 0,
                 'total_tutors': int(result[2]) if result[2] is not None else 0,
@@ -1980,16 +2138,11 @@ def get_statistics():
                 'pending_assessments': int(result[10]) if result[10] is not None else 0,
             }
 
-        if conn:
-            conn.close()
-
-        return jsonify(stats)
+        return cached_json(('statistics',), load)
     except Exception as e:
         print(f'Get statistics error: {e}')
         import traceback
         traceback.print_exc()
-        if conn:
-            conn.close()
         # Return zeros instead of error to prevent frontend issues
         return jsonify({
             'total_users': 0,
@@ -2012,7 +2165,7 @@ def get_statistics():
 def get_all_teaches():
     """Get all tutor-section assignments"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute("""
             SELECT t.*, u.First_Name, u.Last_Name, c.Name as Course_Name
@@ -2022,7 +2175,6 @@ def get_all_teaches():
             ORDER BY t.Timestamp DESC
         """)
         teaches = cursor.fetchall()
-        conn.close()
 
         result = []
         for teach in teaches:
@@ -2052,7 +2204,7 @@ def create_teaches():
     """Assign a tutor to a section"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -2067,7 +2219,8 @@ def create_teaches():
         )
 
         conn.commit()
-        conn.close()
+        _update_timetable(data['Semester'], lambda timetable: timetable.add_resource(
+            data['Section_ID'], data['Course_ID'], ('tutor', int(data['University_ID']))))
 
         return jsonify({
             'success': True,
@@ -2084,7 +2237,7 @@ def create_teaches():
 def delete_teaches(university_id, section_id, course_id, semester):
     """Remove tutor from section"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -2093,13 +2246,217 @@ def delete_teaches(university_id, section_id, course_id, semester):
         """, university_id, section_id, course_id, semester)
 
         conn.commit()
-        conn.close()
+        _update_timetable(semester, lambda timetable: timetable.remove_resource(
+            section_id, course_id, ('tutor', university_id)))
 
         return jsonify({'success': True, 'message': 'Tutor removed from section successfully'})
     except Exception as e:
         print(f'Delete teaches error: {e}')
         return jsonify({'success': False, 'error': f'Failed to remove tutor: {str(e)}'}), 500
 
+# ==================== BULK ENROLLMENT & TEACHING ASSIGNMENTS ====================
+
+# Each chunk is loaded into a table variable, rows pointing at an unknown section
+# or person are returned as the first result set, and the rest are inserted with
+# one INSERT ... SELECT that skips rows already present, so re-sending is harmless.
+BULK_TEACHES_SQL = """
+    SET NOCOUNT ON;
+    DECLARE @v TABLE (Row_No INT, University_ID INT, Section_ID NVARCHAR(100), Course_ID NVARCHAR(100),
+                      Semester NVARCHAR(100), Role_Specification NVARCHAR(255));
+    INSERT INTO @v VALUES {values};
+
+    SELECT v.Row_No FROM @v v
+    WHERE NOT EXISTS (SELECT 1 FROM [Tutor] t WHERE t.University_ID = v.University_ID)
+       OR NOT EXISTS (SELECT 1 FROM [Section] s
+                      WHERE s.Section_ID = v.Section_ID AND s.Course_ID = v.Course_ID AND s.Semester = v.Semester);
+
+    INSERT INTO [Teaches] (University_ID, Section_ID, Course_ID, Semester, Role_Specification, Timestamp)
+    SELECT v.University_ID, v.Section_ID, v.Course_ID, v.Semester, v.Role_Specification, GETDATE()
+    FROM @v v
+    WHERE EXISTS (SELECT 1 FROM [Tutor] t WHERE t.University_ID = v.University_ID)
+      AND EXISTS (SELECT 1 FROM [Section] s
+                  WHERE s.Section_ID = v.Section_ID AND s.Course_ID = v.Course_ID AND s.Semester = v.Semester)
+      AND NOT EXISTS (SELECT 1 FROM [Teaches] x WITH (UPDLOCK, HOLDLOCK)
+                      WHERE x.University_ID = v.University_ID AND x.Section_ID = v.Section_ID
+                        AND x.Course_ID = v.Course_ID AND x.Semester = v.Semester);
+    SELECT @@ROWCOUNT;
+"""
+
+# Assessment_ID continues from the current maximum, numbered in request order
+BULK_ENROLL_SQL = """
+    SET NOCOUNT ON;
+    DECLARE @v TABLE (Row_No INT, University_ID INT, Section_ID NVARCHAR(100), Course_ID NVARCHAR(100),
+                      Semester NVARCHAR(100), Status NVARCHAR(50));
+    INSERT INTO @v VALUES {values};
+
+    SELECT v.Row_No FROM @v v
+    WHERE NOT EXISTS (SELECT 1 FROM [Student] st WHERE st.University_ID = v.University_ID)
+       OR NOT EXISTS (SELECT 1 FROM [Section] s
+                      WHERE s.Section_ID = v.Section_ID AND s.Course_ID = v.Course_ID AND s.Semester = v.Semester);
+
+    INSERT INTO [Assessment] (University_ID, Section_ID, Course_ID, Semester, Assessment_ID, Registration_Date, Status)
+    SELECT v.University_ID, v.Section_ID, v.Course_ID, v.Semester,
+           base.Max_ID + ROW_NUMBER() OVER (ORDER BY v.Row_No), GETDATE(), v.Status
+    FROM @v v
+    CROSS JOIN (SELECT ISNULL(MAX(Assessment_ID), 0) AS Max_ID FROM [Assessment] WITH (UPDLOCK, HOLDLOCK)) base
+    WHERE EXISTS (SELECT 1 FROM [Student] st WHERE st.University_ID = v.University_ID)
+      AND EXISTS (SELECT 1 FROM [Section] s
+                  WHERE s.Section_ID = v.Section_ID AND s.Course_ID = v.Course_ID AND s.Semester = v.Semester)
+      AND NOT EXISTS (SELECT 1 FROM [Assessment] x WITH (UPDLOCK, HOLDLOCK)
+                      WHERE x.University_ID = v.University_ID AND x.Section_ID = v.Section_ID
+                        AND x.Course_ID = v.Course_ID AND x.Semester = v.Semester);
+    SELECT @@ROWCOUNT;
+"""
+
+SECTION_KEY_FIELDS = ('University_ID', 'Section_ID', 'Course_ID', 'Semester')
+ASSESSMENT_STATUSES = ('Pending', 'Approved', 'Rejected', 'Cancelled', 'Withdrawn')
+ROLE_SPECIFICATION_MAX_LENGTH = 255  # Teaches.Role_Specification NVARCHAR(255)
+
+def _check_status(value):
+    if value not in ASSESSMENT_STATUSES:
+        return f'Status must be one of: {", ".join(ASSESSMENT_STATUSES)}'
+    return None
+
+def _check_role_specification(value):
+    if value is not None and (not isinstance(value, str) or len(value) > ROLE_SPECIFICATION_MAX_LENGTH):
+        return f'Role_Specification must be text of at most {ROLE_SPECIFICATION_MAX_LENGTH} characters'
+    return None
+
+def _parse_bulk_rows(items, extra_field, extra_default, check_extra):
+    """
+    Validate bulk rows and drop repeats of the same (person, section)
+
+    check_extra(value) returns an error message for a bad extra_field value,
+    so the row is reported by index instead of failing the whole insert.
+
+    Returns:
+        (rows, errors, duplicates) where rows are (Row_No, *key, extra) tuples
+        and Row_No is the index in the request
+    """
+    rows, errors, seen, duplicates = [], [], set(), 0
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({'index': index, 'error': 'Entry must be an object'})
+            continue
+        university_id = item.get('University_ID')
+        if not isinstance(university_id, int) or isinstance(university_id, bool):
+            errors.append({'index': index, 'error': 'University_ID must be an integer'})
+            continue
+        missing = [field for field in SECTION_KEY_FIELDS[1:] if item.get(field) in (None, '')]
+        if missing:
+            errors.append({'index': index, 'error': f'Missing fields: {", ".join(missing)}'})
+            continue
+        extra = item.get(extra_field, extra_default)
+        problem = check_extra(extra)
+        if problem:
+            errors.append({'index': index, 'error': problem})
+            continue
+        key = (university_id,) + tuple(str(item[field]) for field in SECTION_KEY_FIELDS[1:])
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        rows.append((index,) + key + (extra,))
+    return rows, errors, duplicates
+
+def _insert_missing(conn, sql, rows):
+    """Run the chunked set-based insert in one transaction; returns (inserted, invalid Row_Nos)"""
+    cursor = conn.cursor()
+    inserted, invalid = 0, []
+    try:
+        for statement, params in values_chunks(sql, rows):
+            cursor.execute(statement, params)
+            invalid.extend(row[0] for row in cursor.fetchall())
+            cursor.nextset()
+            inserted += cursor.fetchone()[0]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return inserted, invalid
+
+def _bulk_insert_response(items, sql, extra_field, extra_default, check_extra, noun):
+    """Returns (response, inserted row count)"""
+    if not isinstance(items, list) or not items:
+        return (jsonify({'success': False, 'error': f'{noun} must be a non-empty array'}), 400), 0
+    if len(items) > BULK_INSERT_MAX_ROWS:
+        return (jsonify({'success': False, 'error': f'At most {BULK_INSERT_MAX_ROWS} {noun} per request'}), 400), 0
+
+    start_time = time.time()
+    rows, errors, duplicates = _parse_bulk_rows(items, extra_field, extra_default, check_extra)
+    inserted, invalid = _insert_missing(get_db(), sql, rows) if rows else (0, [])
+    errors.extend({'index': index, 'error': 'Unknown person or section'} for index in invalid)
+    errors.sort(key=lambda error: error['index'])
+
+    elapsed = time.time() - start_time
+    print(f'[Backend] bulk {noun}: {inserted}/{len(items)} inserted in {elapsed:.2f}s')
+    return jsonify({
+        'success': True,
+        'requested': len(items),
+        'inserted': inserted,
+        'skipped_existing': len(rows) - len(invalid) - inserted,
+        'skipped_duplicates': duplicates,
+        'failed': len(errors),
+        'errors': errors,
+    }), inserted
+
+def _invalidate_timetables(items):
+    """Bulk writes reload the semesters they touched instead of patching the index row by row"""
+    if isinstance(items, list):
+        semesters = {str(item['Semester']) for item in items if isinstance(item, dict) and item.get('Semester') is not None}
+        if semesters:
+            get_timetable_registry().invalidate(*semesters)
+            invalidate_schedules()
+
+@admin_bp.route('/teaches/bulk', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def bulk_create_teaches():
+    """
+    Assign many tutors to sections in one transaction
+
+    Body: {"teaches": [{"University_ID": 1, "Section_ID": "L01", "Course_ID": "CO2013",
+                        "Semester": "241", "Role_Specification": "Lecturer"}, ...]}
+    Assignments that already exist are skipped, so the request can be retried.
+    """
+    try:
+        data = request.get_json() or {}
+        response, inserted = _bulk_insert_response(data.get('teaches'), BULK_TEACHES_SQL, 'Role_Specification', None,
+                                                   _check_role_specification, 'teaches')
+        if inserted:
+            _invalidate_timetables(data.get('teaches'))
+        return response
+    except Exception as e:
+        print(f'Bulk create teaches error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to assign tutors: {str(e)}'}), 500
+
+@admin_bp.route('/assessments/bulk', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def bulk_enroll_students():
+    """
+    Enroll many students into sections in one transaction
+
+    Body: {"enrollments": [{"University_ID": 2, "Section_ID": "L01", "Course_ID": "CO2013",
+                            "Semester": "241", "Status": "Approved"}, ...]}
+    Creates one Assessment row per student and section; existing enrollments are skipped.
+    """
+    try:
+        data = request.get_json() or {}
+        response, inserted = _bulk_insert_response(data.get('enrollments'), BULK_ENROLL_SQL, 'Status', 'Pending',
+                                                   _check_status, 'enrollments')
+        if inserted:
+            invalidate_rankings()
+            _invalidate_timetables(data.get('enrollments'))
+        return response
+    except Exception as e:
+        print(f'Bulk enroll students error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to enroll students: {str(e)}'}), 500
+
 # ==================== BUILDINGS & ROOMS MANAGEMENT ====================
 
 @admin_bp.route('/buildings', methods=['GET'])
@@ -2108,11 +2465,10 @@ def delete_teaches(university_id, section_id, course_id, semester):
 def get_all_buildings():
     """Get all buildings"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('SELECT Building_Name FROM [Building] ORDER BY Building_Name')
         buildings = cursor.fetchall()
-        conn.close()
 
         result = []
         for building in buildings:
@@ -2132,7 +2488,7 @@ def create_building():
     """Create a new building"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -2141,7 +2497,6 @@ def create_building():
         """, (data['Building_Name'],))
 
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -2163,11 +2518,10 @@ def get_all_rooms():
         building_name = request.args.get('building_name', type=str)
         search = request.args.get('search', type=str)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetAllRooms %s, %s', (building_name, search))
         rooms = cursor.fetchall()
-        conn.close()
 
         result = []
         for room in rooms:
@@ -2194,7 +2548,7 @@ def create_room():
     """Create a new room - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC CreateRoom %s, %s, %s', (
@@ -2204,7 +2558,6 @@ def create_room():
         ))
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         if result:
             return jsonify({
@@ -2233,7 +2586,7 @@ def update_room(building_name, room_name):
     """Update a room - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC UpdateRoom %s, %s, %s, %s, %s', 
@@ -2242,7 +2595,9 @@ def update_room(building_name, room_name):
                        data.get('New_Room_Name'),
                        data.get('Capacity')))
         conn.commit()
-        conn.close()
+        # Rooms (name, capacity) are indexed in every loaded semester
+        get_timetable_registry().invalidate()
+        invalidate_schedules()
 
         return jsonify({
             'success': True,
@@ -2260,12 +2615,13 @@ def update_room(building_name, room_name):
 def delete_room(building_name, room_name):
     """Delete a room - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC DeleteRoom %s, %s', (building_name, room_name))
         conn.commit()
-        conn.close()
+        get_timetable_registry().invalidate()
+        invalidate_schedules()
 
         return jsonify({
             'success': True,
@@ -2283,11 +2639,10 @@ def delete_room(building_name, room_name):
 def get_equipment_types():
     """Get all equipment types - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetAllEquipmentTypes')
         equipment_types = cursor.fetchall()
-        conn.close()
 
         result = []
         for eq in equipment_types:
@@ -2306,11 +2661,10 @@ def get_equipment_types():
 def get_room_equipment(building_name, room_name):
     """Get equipment for a specific room - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetRoomEquipment %s, %s', (building_name, room_name))
         equipment = cursor.fetchall()
-        conn.close()
 
         result = []
         for eq in equipment:
@@ -2340,12 +2694,11 @@ def update_room_equipment(building_name, room_name):
         import json
         equipment_json = json.dumps(equipment_list)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC UpdateRoomEquipment %s, %s, %s', (building_name, room_name, equipment_json))
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -2363,11 +2716,10 @@ def update_room_equipment(building_name, room_name):
 def get_room_sections(building_name, room_name):
     """Get sections that use a specific room - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetRoomSections %s, %s', (building_name, room_name))
         sections = cursor.fetchall()
-        conn.close()
 
         result = []
         for section in sections:
@@ -2391,11 +2743,10 @@ def get_room_sections(building_name, room_name):
 def get_section_rooms(section_id, course_id, semester):
     """Get rooms assigned to a section - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetRoomsBySection %s, %s, %s', (section_id, course_id, semester))
         rooms = cursor.fetchall()
-        conn.close()
 
         result = []
         for room in rooms:
@@ -2420,19 +2771,30 @@ def assign_room_to_section(section_id, course_id, semester):
     """Assign a room to a section - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
+        room = ('room', (data['Building_Name'], data['Room_Name']))
+
+        if not _force_requested(data):
+            conflicts = _check_clashes(cursor, semester, section_id, course_id, extra_resources=[room])
+            if conflicts:
+                conn.rollback()
+                return _conflict_response(conflicts)
         
         cursor.execute('EXEC AssignRoomToSection %s, %s, %s, %s, %s',
                       (section_id, course_id, semester,
                        data['Building_Name'], data['Room_Name']))
         conn.commit()
-        conn.close()
+        _update_timetable(semester, lambda timetable: timetable.add_resource(section_id, course_id, room))
 
         return jsonify({
             'success': True,
             'message': 'Room assigned successfully'
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except TimetableBusy as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
     except Exception as e:
         print(f'Assign room to section error: {e}')
         import traceback
@@ -2445,13 +2807,14 @@ def assign_room_to_section(section_id, course_id, semester):
 def remove_room_from_section(section_id, course_id, semester, building_name, room_name):
     """Remove a room from a section - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC RemoveRoomFromSection %s, %s, %s, %s, %s',
                       (section_id, course_id, semester, building_name, room_name))
         conn.commit()
-        conn.close()
+        _update_timetable(semester, lambda timetable: timetable.remove_resource(
+            section_id, course_id, ('room', (building_name, room_name))))
 
         return jsonify({
             'success': True,
@@ -2465,17 +2828,116 @@ def remove_room_from_section(section_id, course_id, semester, building_name, roo
 
 # ==================== SCHEDULE MANAGEMENT ====================
 
+def _force_requested(data=None):
+    """
+    force=true in the body or query string skips the clash check
+
+    Raises:
+        ValueError: force is neither a boolean nor true/false text
+    """
+    if isinstance(data, dict) and parse_flag(data.get('force'), 'force'):
+        return True
+    return parse_flag(request.args.get('force'), 'force')
+
+def _check_clashes(cursor, semester, section_id, course_id, slots=None, extra_resources=()):
+    """
+    Clashes of a pending change, read from the database inside the write transaction
+
+    The semester stays locked against other checked writes until the caller
+    commits or rolls back, so two admins cannot both pass the check.
+    """
+    lock_semester(cursor, semester)
+    timetable = load_section(cursor, semester, section_id, course_id)
+    return timetable.conflicts(section_id, course_id, slots, extra_resources)
+
+def _conflict_response(conflicts):
+    return jsonify({
+        'success': False,
+        'error': 'Schedule conflicts with existing bookings; resend with force=true to save anyway',
+        'conflicts': conflicts,
+    }), 409
+
+def _update_timetable(semester, apply):
+    """Apply a committed schedule change to the semester's timetable index, if it is loaded"""
+    invalidate_schedules()
+    timetable = get_timetable_registry().peek(semester)
+    if timetable is not None:
+        apply(timetable)
+
+def _slot_args():
+    """(day, start, end) from the query string, or None when incomplete or out of range"""
+    day = request.args.get('day_of_week', type=int)
+    start = request.args.get('start_period', type=int)
+    end = request.args.get('end_period', type=int, default=start)
+    if day is None or start is None or end is None:
+        return None
+    if not 1 <= day <= DAYS_PER_WEEK or not 1 <= start <= end <= PERIODS_PER_DAY:
+        return None
+    return day, start, end
+
+@admin_bp.route('/timetable/conflicts', methods=['GET'])
+@require_auth
+@require_role(['admin'])
+def check_timetable_conflicts():
+    """
+    Clashes a section would have at a given slot (rooms, tutors and enrolled students)
+
+    Query: semester, section_id, course_id, day_of_week, start_period, end_period,
+    optional building_name/room_name for a room the section does not have yet
+    """
+    try:
+        semester = request.args.get('semester', type=str)
+        section_id = request.args.get('section_id', type=str)
+        course_id = request.args.get('course_id', type=str)
+        slot = _slot_args()
+        if not semester or not section_id or not course_id or slot is None:
+            return jsonify({'success': False, 'error': 'semester, section_id, course_id and a valid day_of_week/start_period/end_period are required'}), 400
+
+        extra = []
+        building_name = request.args.get('building_name', type=str)
+        room_name = request.args.get('room_name', type=str)
+        if building_name and room_name:
+            extra.append(('room', (building_name, room_name)))
+
+        timetable = get_timetable_registry().get(semester)
+        conflicts = timetable.conflicts(section_id, course_id, [slot], extra)
+        return jsonify({'success': True, 'conflicts': conflicts})
+    except Exception as e:
+        print(f'Check timetable conflicts error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to check conflicts: {str(e)}'}), 500
+
+@admin_bp.route('/rooms/free', methods=['GET'])
+@require_auth
+@require_role(['admin'])
+def get_free_rooms():
+    """Rooms free for a whole slot in a semester; min_capacity filters small rooms"""
+    try:
+        semester = request.args.get('semester', type=str)
+        slot = _slot_args()
+        if not semester or slot is None:
+            return jsonify({'success': False, 'error': 'semester and a valid day_of_week/start_period/end_period are required'}), 400
+        min_capacity = request.args.get('min_capacity', type=int)
+
+        rooms = get_timetable_registry().get(semester).free_rooms(*slot, min_capacity=min_capacity)
+        return jsonify(rooms)
+    except Exception as e:
+        print(f'Get free rooms error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to fetch free rooms: {str(e)}'}), 500
+
 @admin_bp.route('/sections/<string:section_id>/<string:course_id>/<string:semester>/schedule', methods=['GET'])
 @require_auth
 @require_role(['admin'])
 def get_section_schedule(section_id, course_id, semester):
     """Get schedule for a section - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetSectionSchedule %s, %s, %s', (section_id, course_id, semester))
         schedule = cursor.fetchall()
-        conn.close()
 
         result = []
         for entry in schedule:
@@ -2502,19 +2964,30 @@ def create_schedule_entry(section_id, course_id, semester):
     """Create a schedule entry for a section - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
+        slot = (int(data['Day_of_Week']), int(data['Start_Period']), int(data['End_Period']))
+
+        if not _force_requested(data):
+            conflicts = _check_clashes(cursor, semester, section_id, course_id, [slot])
+            if conflicts:
+                conn.rollback()
+                return _conflict_response(conflicts)
         
         cursor.execute('EXEC CreateScheduleEntry %s, %s, %s, %s, %s, %s',
                       (section_id, course_id, semester,
                        data['Day_of_Week'], data['Start_Period'], data['End_Period']))
         conn.commit()
-        conn.close()
+        _update_timetable(semester, lambda timetable: timetable.add_slot(section_id, course_id, *slot))
 
         return jsonify({
             'success': True,
             'message': 'Schedule entry created successfully'
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except TimetableBusy as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
     except Exception as e:
         print(f'Create schedule entry error: {e}')
         import traceback
@@ -2528,20 +3001,38 @@ def update_schedule_entry(section_id, course_id, semester):
     """Update a schedule entry for a section - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
+        old_slot = (int(data['Old_Day_of_Week']), int(data['Old_Start_Period']), int(data['Old_End_Period']))
+        # Fields left out keep their old value
+        new_slot = tuple(int(data[f'New_{field}']) if data.get(f'New_{field}') is not None else old
+                         for field, old in zip(('Day_of_Week', 'Start_Period', 'End_Period'), old_slot))
+
+        if not _force_requested(data):
+            conflicts = _check_clashes(cursor, semester, section_id, course_id, [new_slot])
+            if conflicts:
+                conn.rollback()
+                return _conflict_response(conflicts)
         
         cursor.execute('EXEC UpdateScheduleEntry %s, %s, %s, %s, %s, %s, %s, %s, %s',
                       (section_id, course_id, semester,
                        data['Old_Day_of_Week'], data['Old_Start_Period'], data['Old_End_Period'],
                        data.get('New_Day_of_Week'), data.get('New_Start_Period'), data.get('New_End_Period')))
         conn.commit()
-        conn.close()
+
+        def move_slot(timetable):
+            timetable.remove_slot(section_id, course_id, *old_slot)
+            timetable.add_slot(section_id, course_id, *new_slot)
+        _update_timetable(semester, move_slot)
 
         return jsonify({
             'success': True,
             'message': 'Schedule entry updated successfully'
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except TimetableBusy as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
     except Exception as e:
         print(f'Update schedule entry error: {e}')
         import traceback
@@ -2555,14 +3046,15 @@ def delete_schedule_entry(section_id, course_id, semester):
     """Delete a schedule entry for a section - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC DeleteScheduleEntry %s, %s, %s, %s, %s, %s',
                       (section_id, course_id, semester,
                        data['Day_of_Week'], data['Start_Period'], data['End_Period']))
         conn.commit()
-        conn.close()
+        _update_timetable(semester, lambda timetable: timetable.remove_slot(
+            section_id, course_id, data['Day_of_Week'], data['Start_Period'], data['End_Period']))
 
         return jsonify({
             'success': True,
@@ -2583,11 +3075,10 @@ def get_all_schedules():
         course_id = request.args.get('course_id', type=str)
         semester = request.args.get('semester', type=str)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetAllSchedules %s, %s', (course_id, semester))
         schedules = cursor.fetchall()
-        conn.close()
 
         result = []
         for schedule in schedules:
@@ -2619,11 +3110,10 @@ def get_schedules_by_room():
         room_name = request.args.get('room_name', type=str)
         semester = request.args.get('semester', type=str)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetSchedulesByRoom %s, %s, %s', (building_name, room_name, semester))
         schedules = cursor.fetchall()
-        conn.close()
 
         result = []
         for schedule in schedules:
@@ -2663,11 +3153,10 @@ def get_schedules_by_user():
         if user_type not in ['student', 'tutor']:
             return jsonify({'success': False, 'error': 'user_type must be "student" or "tutor"'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetSchedulesByUser %s, %s, %s', (university_id, user_type, semester))
         schedules = cursor.fetchall()
-        conn.close()
 
         result = []
         for schedule in schedules:
@@ -2710,6 +3199,317 @@ def get_schedules_by_user():
         traceback.print_exc()
         return jsonify({'success': False, 'error': f'Failed to fetch schedules by user: {str(e)}'}), 500
 
+# ==================== SEMESTER PLAN (Courses, Sections, Rooms & Schedule) ====================
+
+# (stage, stored procedure, plan attribute, returns a row)
+SEMESTER_PLAN_STAGES = (
+    ('courses', 'EXEC CreateCourse %s, %s, %s, %s', 'courses', True),
+    ('sections', 'EXEC CreateSection %s, %s, %s', 'sections', True),
+    ('rooms', 'EXEC AssignRoomToSection %s, %s, %s, %s, %s', 'rooms', False),
+    ('schedule', 'EXEC CreateScheduleEntry %s, %s, %s, %s, %s, %s', 'schedule', False),
+)
+
+def _load_plan_context(cursor, semester):
+    """Everything find_conflicts needs, in four queries"""
+    cursor.execute('EXEC GetAllRooms %s, %s', (None, None))
+    known_rooms = {(room[1], room[2]) for room in cursor.fetchall()}
+
+    cursor.execute('SELECT Course_ID FROM [Course]')
+    known_courses = {row[0] for row in cursor.fetchall()}
+
+    cursor.execute('SELECT Section_ID, Course_ID FROM [Section] WHERE Semester = %s', (semester,))
+    existing_sections = {(row[0], row[1]) for row in cursor.fetchall()}
+
+    # Building_Name, Room_Name, Section_ID, Course_ID, Semester, Day_of_Week, Day_Name, Start_Period, End_Period, Course_Name
+    cursor.execute('EXEC GetSchedulesByRoom %s, %s, %s', (None, None, semester))
+    room_slots = [
+        (row[0], row[1], (row[2], row[3], row[4]), int(row[5]), int(row[7]), int(row[8]))
+        for row in cursor.fetchall()
+        if row[5] is not None and row[7] is not None and row[8] is not None
+    ]
+    return known_rooms, known_courses, existing_sections, room_slots
+
+def _add_plan_to_timetable(timetable, plan):
+    for section_id, course_id, _, building, room in plan.rooms:
+        timetable.add_resource(section_id, course_id, ('room', (building, room)))
+    for section_id, course_id, _, day, start, end in plan.schedule:
+        timetable.add_slot(section_id, course_id, day, start, end)
+
+@admin_bp.route('/semester-plan', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def apply_semester_plan():
+    """
+    Create a semester's courses, sections, room assignments and schedule in one transaction
+
+    The whole plan is validated and checked for room clashes first (409 with
+    the list of conflicts); then every stage is sent in batches and either
+    everything is committed or nothing is. With dry_run=true only the checks run.
+    """
+    start_time = time.time()
+    try:
+        data = request.get_json() or {}
+        try:
+            dry_run = parse_flag(data.get('dry_run'), 'dry_run')
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        try:
+            plan = parse_plan(data)
+        except PlanError as e:
+            return jsonify({'success': False, 'error': str(e), 'errors': e.errors}), 400
+
+        conn = get_db()
+        cursor = conn.cursor()
+        known_rooms, known_courses, existing_sections, room_slots = _load_plan_context(cursor, plan.semester)
+        conflicts = find_conflicts(plan, known_rooms, known_courses, existing_sections, room_slots)
+        if conflicts:
+            return jsonify({'success': False, 'error': 'Semester plan has conflicts', 'conflicts': conflicts}), 409
+
+        # Courses that already exist are only referenced
+        plan = plan._replace(courses=[course for course in plan.courses if course[0] not in known_courses])
+        counts = {stage: len(getattr(plan, attr)) for stage, _, attr, _ in SEMESTER_PLAN_STAGES}
+        if dry_run:
+            return jsonify({'success': True, 'dry_run': True, 'semester': plan.semester, 'created': counts})
+
+        for stage, sql, attr, returns_rows in SEMESTER_PLAN_STAGES:
+            params_list = getattr(plan, attr)
+            if not params_list:
+                continue
+            try:
+                results = execute_batched(conn, sql, params_list, returns_rows=returns_rows)
+            except BatchAborted as e:
+                return jsonify({'success': False, 'error': 'Semester plan was rolled back',
+                                'errors': [{'stage': stage, 'index': e.index, 'error': e.error}]}), 409
+            failed = [{'stage': stage, 'index': index, 'error': result.error}
+                      for index, result in enumerate(results) if not result.ok]
+            if failed:
+                conn.rollback()
+                return jsonify({'success': False, 'error': 'Semester plan was rolled back', 'errors': failed}), 409
+
+        conn.commit()
+        _update_timetable(plan.semester, lambda timetable: _add_plan_to_timetable(timetable, plan))
+        elapsed = time.time() - start_time
+        print(f'[Backend] apply_semester_plan {plan.semester}: {counts} in {elapsed:.2f}s')
+        return jsonify({'success': True, 'semester': plan.semester, 'created': counts}), 201
+    except Exception as e:
+        print(f'Apply semester plan error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to apply semester plan: {str(e)}'}), 500
+
+# ==================== TIMETABLE SOLVER ====================
+
+def _build_solver_problem(cursor, timetable, semester, data):
+    """
+    Solver input for the requested sections (default: every section of the
+    semester without a schedule), using the timetable index for bookings,
+    tutors and enrolled students
+
+    Returns:
+        (Problem, skipped) where skipped lists requested sections that cannot be solved
+    """
+    requested = data.get('sections')
+    if requested is None:
+        cursor.execute('SELECT Section_ID, Course_ID FROM [Section] WHERE Semester = %s', (semester,))
+        requested = [{'Section_ID': row[0], 'Course_ID': row[1]} for row in cursor.fetchall()
+                     if not timetable.slots(row[0], row[1])]
+    if not isinstance(requested, list):
+        raise ValueError('sections must be an array')
+
+    sections, skipped = [], []
+    for index, item in enumerate(requested):
+        if not isinstance(item, dict) or not item.get('Section_ID') or not item.get('Course_ID'):
+            raise ValueError(f'sections[{index}] needs Section_ID and Course_ID')
+        section_id, course_id = str(item['Section_ID']), str(item['Course_ID'])
+        if timetable.slots(section_id, course_id):
+            skipped.append({'Section_ID': section_id, 'Course_ID': course_id, 'reason': 'already_scheduled'})
+            continue
+        periods = int(item.get('periods') or SOLVER_DEFAULT_PERIODS)
+        sessions = int(item.get('sessions') or SOLVER_DEFAULT_SESSIONS)
+        if not 1 <= periods <= PERIODS_PER_DAY or not 1 <= sessions <= DAYS_PER_WEEK:
+            raise ValueError(f'sections[{index}] has an invalid periods or sessions value')
+        people = tuple(sorted((resource for resource in timetable.resources(section_id, course_id)
+                               if resource[0] != 'room'), key=str))
+        size = item.get('size')
+        if size is None:
+            size = sum(1 for resource in people if resource[0] == 'student')
+        sections.append(SolverSection(section_id, course_id, periods, sessions, int(size),
+                                      frozenset(item.get('equipment') or ()), people))
+
+    # Equipment is only looked up when some section needs it (one call per room)
+    equipment = {}
+    if any(section.equipment for section in sections):
+        for building_name, room_name in timetable.rooms:
+            cursor.execute('EXEC GetRoomEquipment %s, %s', (building_name, room_name))
+            equipment[(building_name, room_name)] = frozenset(row[0] for row in cursor.fetchall())
+    rooms = tuple(SolverRoom(building_name, room_name, capacity or 0, equipment.get((building_name, room_name), frozenset()))
+                  for (building_name, room_name), capacity in timetable.rooms.items())
+
+    days = data.get('days', list(SOLVER_DAYS))
+    if not isinstance(days, list) or not days or any(
+            not isinstance(day, int) or not 1 <= day <= DAYS_PER_WEEK for day in days):
+        raise ValueError(f'days must be a list of integers from 1 to {DAYS_PER_WEEK}')
+    return Problem(tuple(sections), rooms, timetable.occupancy(), tuple(sorted(set(days)))), skipped
+
+def _solver_response(semester, result, skipped):
+    return {
+        'success': True,
+        'semester': semester,
+        # Same shape as the body of POST /timetable/apply
+        'proposal': {'Semester': semester, 'sections': result['placements']},
+        'unplaced': result['unplaced'],
+        'skipped': skipped,
+        'cost': result['cost'],
+        'seed': result['seed'],
+        'seeds_run': result['seeds_run'],
+        'elapsed': result['elapsed'],
+    }
+
+@admin_bp.route('/timetable/solve', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def solve_timetable():
+    """
+    Propose rooms and weekly slots for a semester's unscheduled sections
+
+    Body: {"semester": "242", "sections": [{"Section_ID": "CC01", "Course_ID": "CO2013",
+           "periods": 3, "sessions": 2, "size": 60, "equipment": ["Projector"]}],
+           "days": [1, 2, 3, 4, 5], "seeds": 8, "time_limit": 20, "async": false}
+    Nothing is written; review the proposal and send it to POST /timetable/apply.
+    """
+    try:
+        data = request.get_json() or {}
+        semester = str(data.get('semester') or '')
+        if not semester:
+            return jsonify({'success': False, 'error': 'semester is required'}), 400
+        seeds = min(int(data.get('seeds') or SOLVER_SEEDS), 64)
+        time_limit = min(float(data.get('time_limit') or SOLVER_TIME_LIMIT), SOLVER_TIME_LIMIT)
+
+        cursor = get_db().cursor()
+        timetable = get_timetable_registry().get(semester, cursor)
+        try:
+            run_async = parse_flag(data.get('async'), 'async')
+            problem, skipped = _build_solver_problem(cursor, timetable, semester, data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        print(f'[Backend] solve_timetable {semester}: {len(problem.sections)} sections, '
+              f'{len(problem.rooms)} rooms, {seeds} seeds')
+
+        if run_async:
+            def job_fn(job):
+                job.update(sections=len(problem.sections), seeds=seeds)
+                return _solver_response(semester, get_timetable_solver().solve(problem, seeds, time_limit), skipped)
+            job = get_job_registry().submit('timetable-solve', job_fn, owner_id=request.current_user_id)
+            return jsonify({
+                'success': True,
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': f'/api/admin/jobs/{job.id}',
+            }), 202
+
+        try:
+            result = get_timetable_solver().solve(problem, seeds, time_limit)
+        except TimeoutError as e:
+            return jsonify({'success': False, 'error': str(e)}), 503
+        return jsonify(_solver_response(semester, result, skipped))
+    except Exception as e:
+        print(f'Solve timetable error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to solve timetable: {str(e)}'}), 500
+
+@admin_bp.route('/timetable/apply', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def apply_timetable():
+    """
+    Assign rooms and schedule entries to existing sections in one transaction
+
+    Body: a solver proposal, {"Semester": "242", "sections": [{"Section_ID", "Course_ID",
+    "rooms": [...], "schedule": [...]}]}. The whole batch is checked for room,
+    tutor and student clashes first (409 unless force=true), against the
+    semester as the database holds it inside the write transaction.
+    """
+    start_time = time.time()
+    try:
+        data = request.get_json() or {}
+        try:
+            plan = parse_plan({**data, 'courses': []})
+        except PlanError as e:
+            return jsonify({'success': False, 'error': str(e), 'errors': e.errors}), 400
+
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute('SELECT Section_ID, Course_ID FROM [Section] WHERE Semester = %s', (plan.semester,))
+        existing_sections = {(str(row[0]), str(row[1])) for row in cursor.fetchall()}
+        # Read fresh under the semester lock: the cached index may miss other workers' writes
+        lock_semester(cursor, plan.semester)
+        scratch = load_semester(cursor, plan.semester)
+
+        conflicts = [{'type': 'unknown_section', 'Section_ID': section_id, 'Course_ID': course_id}
+                     for section_id, course_id, _ in plan.sections if (section_id, course_id) not in existing_sections]
+        conflicts += [{'type': 'unknown_room', 'Building_Name': building, 'Room_Name': room, 'Section_ID': section_id}
+                      for section_id, _, _, building, room in plan.rooms if (building, room) not in scratch.rooms]
+        if conflicts:
+            conn.rollback()
+            return jsonify({'success': False, 'error': 'Timetable references unknown sections or rooms', 'conflicts': conflicts}), 409
+
+        # Add the batch to the fresh copy as we go so clashes inside the batch are caught too
+        new_rooms, new_slots = [], []
+        for section_id, course_id, semester in plan.sections:
+            rooms = {('room', (building, room)) for sid, cid, _, building, room in plan.rooms
+                     if (sid, cid) == (section_id, course_id)} - scratch.resources(section_id, course_id)
+            slots = {entry[3:] for entry in plan.schedule
+                     if entry[:2] == (section_id, course_id)} - scratch.slots(section_id, course_id)
+            conflicts += scratch.conflicts(section_id, course_id, scratch.slots(section_id, course_id) | slots, rooms)
+            for room in rooms:
+                scratch.add_resource(section_id, course_id, room)
+                new_rooms.append((section_id, course_id, semester) + room[1])
+            for slot in sorted(slots):
+                scratch.add_slot(section_id, course_id, *slot)
+                new_slots.append((section_id, course_id, semester) + slot)
+        if conflicts and not _force_requested(data):
+            conn.rollback()
+            return _conflict_response(conflicts)
+
+        stages = (('rooms', 'EXEC AssignRoomToSection %s, %s, %s, %s, %s', new_rooms),
+                  ('schedule', 'EXEC CreateScheduleEntry %s, %s, %s, %s, %s, %s', new_slots))
+        for stage, sql, params_list in stages:
+            if not params_list:
+                continue
+            try:
+                results = execute_batched(conn, sql, params_list, returns_rows=False)
+            except BatchAborted as e:
+                return jsonify({'success': False, 'error': 'Timetable was rolled back',
+                                'errors': [{'stage': stage, 'index': e.index, 'error': e.error}]}), 409
+            failed = [{'stage': stage, 'index': index, 'error': result.error}
+                      for index, result in enumerate(results) if not result.ok]
+            if failed:
+                conn.rollback()
+                return jsonify({'success': False, 'error': 'Timetable was rolled back', 'errors': failed}), 409
+        conn.commit()
+
+        def add_batch(live):
+            for section_id, course_id, _, building, room in new_rooms:
+                live.add_resource(section_id, course_id, ('room', (building, room)))
+            for section_id, course_id, _, day, start, end in new_slots:
+                live.add_slot(section_id, course_id, day, start, end)
+        _update_timetable(plan.semester, add_batch)
+
+        elapsed = time.time() - start_time
+        print(f'[Backend] apply_timetable {plan.semester}: {len(new_rooms)} rooms, {len(new_slots)} slots in {elapsed:.2f}s')
+        return jsonify({'success': True, 'semester': plan.semester, 'rooms_assigned': len(new_rooms),
+                        'schedule_entries': len(new_slots), 'forced_conflicts': conflicts})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except TimetableBusy as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
+    except Exception as e:
+        print(f'Apply timetable error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to apply timetable: {str(e)}'}), 500
+
 # ==================== ADMIN ACCOUNTS MANAGEMENT ====================
 
 @admin_bp.route('/admins', methods=['GET'])
@@ -2718,11 +3518,10 @@ def get_schedules_by_user():
 def get_all_admins():
     """Get all admin accounts - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetAllAdmins')
         admins = cursor.fetchall()
-        conn.close()
 
         result = []
         for admin in admins:
@@ -2750,12 +3549,13 @@ def create_admin():
     """Create a new admin account - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
-        cursor = conn.cursor()
 
         # Hash password if provided
         password = data.get('Password', '123456')
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = hash_password(password)
+
+        conn = get_db()
+        cursor = conn.cursor()
 
         cursor.execute('EXEC CreateAdmin %s, %s, %s, %s, %s, %s, %s, %s, %s', (
             data['University_ID'],
@@ -2771,7 +3571,6 @@ def create_admin():
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -2787,6 +3586,9 @@ def create_admin():
                 'National_ID': result[7],
             }
         }), 201
+    except PasswordHasherBusy as e:
+        print(f'Password hashing busy: {e}')
+        return jsonify({'success': False, 'error': 'Server is busy, please try again'}), 503
     except Exception as e:
         print(f'Create admin error: {e}')
         return jsonify({'success': False, 'error': f'Failed to create admin: {str(e)}'}), 500
@@ -2798,7 +3600,7 @@ def update_admin(university_id):
     """Update an admin - Using stored procedure"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC UpdateAdmin %s, %s, %s, %s, %s, %s, %s, %s', (
@@ -2814,7 +3616,6 @@ def update_admin(university_id):
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -2840,12 +3641,11 @@ def update_admin(university_id):
 def delete_admin(university_id):
     """Delete an admin - Using stored procedure"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('EXEC DeleteAdmin %s', (university_id,))
         conn.commit()
-        conn.close()
 
         return jsonify({'success': True, 'message': 'Admin deleted successfully'})
     except Exception as e:
@@ -2854,13 +3654,31 @@ def delete_admin(university_id):
 
 # ==================== REVIEW MANAGEMENT (Grade Submissions) ====================
 
+# r.* has no fixed layout here, so columns are matched by name
+REVIEW_ROW = RowMapper(
+    Column('Submission_No', source='Submission_No'),
+    Column('Student_ID', source='Student_ID'),
+    Column('Tutor_ID', source='University_ID'),
+    Column('Tutor_Name', source='Tutor_Name'),
+    Column('Score', source='Score'),
+    Column('Comments', source='Comments'),
+    Column('Student_First_Name', source='Student_First_Name'),
+    Column('Student_Last_Name', source='Student_Last_Name'),
+    Column('Tutor_First_Name', source='Tutor_First_Name'),
+    Column('Tutor_Last_Name', source='Tutor_Last_Name'),
+    computed={
+        'Student_Name': lambda d: f"{d['Student_First_Name']} {d['Student_Last_Name']}",
+        'Tutor_Full_Name': lambda d: f"{d['Tutor_First_Name']} {d['Tutor_Last_Name']}",
+    },
+)
+
 @admin_bp.route('/reviews', methods=['GET'])
 @require_auth
 @require_role(['admin'])
 def get_all_reviews():
     """Get all reviews (graded submissions)"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute("""
             SELECT r.*, 
@@ -2877,23 +3695,7 @@ def get_all_reviews():
             INNER JOIN [Users] tu ON r.University_ID = tu.University_ID
             ORDER BY r.Submission_No DESC
         """)
-        reviews = cursor.fetchall()
-        conn.close()
-
-        result = []
-        for review in reviews:
-            result.append({
-                'Submission_No': review.Submission_No,
-                'Student_ID': review.Student_ID,
-                'Student_Name': f"{review.Student_First_Name} {review.Student_Last_Name}",
-                'Tutor_ID': review.University_ID,
-                'Tutor_Name': review.Tutor_Name,
-                'Tutor_Full_Name': f"{review.Tutor_First_Name} {review.Tutor_Last_Name}",
-                'Score': review.Score,
-                'Comments': review.Comments,
-            })
-
-        return jsonify(result)
+        return stream_json_array(REVIEW_ROW.iter_rows(cursor))
     except Exception as e:
         print(f'Get all reviews error: {e}')
         return jsonify({'success': False, 'error': 'Failed to fetch reviews'}), 500
@@ -2905,7 +3707,7 @@ def create_review():
     """Create a review (grade a submission)"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -2919,7 +3721,6 @@ def create_review():
         )
 
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -2937,7 +3738,7 @@ def update_review(submission_no):
     """Update a review"""
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -2952,7 +3753,6 @@ def update_review(submission_no):
         )
 
         conn.commit()
-        conn.close()
 
         return jsonify({'success': True, 'message': 'Review updated successfully'})
     except Exception as e:
@@ -2973,7 +3773,7 @@ def filter_users():
         admin_type = request.args.get('type', None)
         search_query = request.args.get('search', None)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC FilterUsers %s, %s, %s, %s, %s', (
@@ -2985,7 +3785,6 @@ def filter_users():
         ))
         
         results = cursor.fetchall()
-        conn.close()
         
         users = []
         for row in results:
@@ -3028,7 +3827,7 @@ def filter_users():
 def get_filter_options():
     """Get filter options (majors, departments, admin types)"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         # Get distinct majors
@@ -3043,7 +3842,6 @@ def get_filter_options():
         cursor.execute('EXEC GetDistinctAdminTypes')
         admin_types = [row[0] for row in cursor.fetchall()]
         
-        conn.close()
         
         return jsonify({
             'majors': majors,
@@ -3070,13 +3868,12 @@ def update_user_role(university_id):
         if not new_role or new_role not in ['student', 'tutor', 'admin']:
             return jsonify({'success': False, 'error': 'Invalid role. Must be student, tutor, or admin'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         # Prepare parameters based on new role
         if new_role == 'student':
             if not data.get('Major'):
-                conn.close()
                 return jsonify({'success': False, 'error': 'Major is required when changing role to student'}), 400
             
             cursor.execute('EXEC UpdateUserRole %s, %s, %s, %s, %s, %s, %s, %s, %s', (
@@ -3117,7 +3914,6 @@ def update_user_role(university_id):
         
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
         
         # Format result based on role
         if new_role == 'student':
@@ -3186,9 +3982,9 @@ def reset_user_password(university_id):
     try:
         # Default password
         default_password = '123456'
-        hashed_password = bcrypt.hashpw(default_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = hash_password(default_password)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         # Check if account exists
@@ -3210,13 +4006,18 @@ def reset_user_password(university_id):
             """, (university_id, hashed_password))
         
         conn.commit()
-        conn.close()
+
+        # Existing sessions of this user must sign in again
+        revoke_user_tokens(university_id)
         
         return jsonify({
             'success': True,
             'message': 'Password reset successfully',
             'default_password': default_password
         })
+    except PasswordHasherBusy as e:
+        print(f'Password hashing busy: {e}')
+        return jsonify({'success': False, 'error': 'Server is busy, please try again'}), 503
     except Exception as e:
         print(f'Reset password error: {e}')
         import traceback
@@ -3231,7 +4032,7 @@ def reset_user_password(university_id):
 def get_user_details(university_id):
     """Get detailed information about a user - Using stored procedures"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         # Get user basic info and role
@@ -3239,7 +4040,6 @@ def get_user_details(university_id):
         user_info = cursor.fetchone()
         
         if not user_info:
-            conn.close()
             return jsonify({'success': False, 'error': 'User not found'}), 404
         
         # Parse user info (tuple access)
@@ -3302,7 +4102,6 @@ def get_user_details(university_id):
                     'Timestamp': str(section[6]) if len(section) > 6 and section[6] else None,
                 })
         
-        conn.close()
         
         return jsonify({
             'success': True,
@@ -3340,7 +4139,7 @@ def get_audit_logs():
         page = request.args.get('page', 1, type=int)
         page_size = request.args.get('page_size', 50, type=int)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC GetAllAuditLogs %s, %s, %s, %s, %s', (
@@ -3358,7 +4157,6 @@ def get_audit_logs():
         total_result = cursor.fetchone()
         total_count = total_result[0] if total_result else 0
         
-        conn.close()
         
         result = []
         for log in logs:
@@ -3401,7 +4199,7 @@ def get_audit_logs_by_user(university_id):
         page = request.args.get('page', 1, type=int)
         page_size = request.args.get('page_size', 50, type=int)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC GetAuditLogsByUser %s, %s, %s, %s, %s', (
@@ -3419,7 +4217,6 @@ def get_audit_logs_by_user(university_id):
         total_result = cursor.fetchone()
         total_count = total_result[0] if total_result else 0
         
-        conn.close()
         
         result = []
         for log in logs:
@@ -3460,7 +4257,7 @@ def get_audit_log_statistics():
         start_date = request.args.get('start_date', None)
         end_date = request.args.get('end_date', None)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('EXEC GetAuditLogStatistics %s, %s', (
@@ -3469,7 +4266,6 @@ def get_audit_log_statistics():
         ))
         
         stats = cursor.fetchone()
-        conn.close()
         
         # Tuple: total_logs, unique_users, section_creations, deadline_extensions, grade_updates, entity_changes
         result = {
@@ -3496,25 +4292,23 @@ def get_audit_log_statistics():
 def get_gpa_statistics_by_major():
     """Get GPA statistics grouped by major - Using stored procedure"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('EXEC GetGPAStatisticsByMajor')
-        results = cursor.fetchall()
-        conn.close()
-        
-        stats = []
-        for row in results:
-            stats.append({
-                'Major': row[0],
-                'StudentCount': int(row[1]) if row[1] else 0,
-                'AverageGPA': float(row[2]) if row[2] else 0,
-                'MinGPA': float(row[3]) if row[3] else 0,
-                'MaxGPA': float(row[4]) if row[4] else 0,
-                'StdDevGPA': float(row[5]) if row[5] else 0,
-            })
+        def load(cursor):
+            cursor.execute('EXEC GetGPAStatisticsByMajor')
+            results = cursor.fetchall()
+        
+            stats = []
+            for row in results:
+                stats.append({
+                    'Major': row[0],
+                    'StudentCount': int(row[1]) if row[1] else 0,
+                    'AverageGPA': float(row[2]) if row[2] else 0,
+                    'MinGPA': float(row[3]) if row[3] else 0,
+                    'MaxGPA': float(row[4]) if row[4] else 0,
+                    'StdDevGPA': float(row[5]) if row[5] else 0,
+                })
+            return stats
         
-        return jsonify(stats)
+        return cached_json(('gpa-by-major',), load)
     except Exception as e:
         print(f'Get GPA statistics by major error: {e}')
         import traceback
@@ -3527,25 +4321,23 @@ def get_gpa_statistics_by_major():
 def get_gpa_statistics_by_department():
     """Get GPA statistics grouped by department - Using stored procedure"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('EXEC GetGPAStatisticsByDepartment')
-        results = cursor.fetchall()
-        conn.close()
-        
-        stats = []
-        for row in results:
-            stats.append({
-                'Department_Name': row[0],
-                'StudentCount': int(row[1]) if row[1] else 0,
-                'AverageGPA': float(row[2]) if row[2] else 0,
-                'MinGPA': float(row[3]) if row[3] else 0,
-                'MaxGPA': float(row[4]) if row[4] else 0,
-                'StdDevGPA': float(row[5]) if row[5] else 0,
-            })
+        def load(cursor):
+            cursor.execute('EXEC GetGPAStatisticsByDepartment')
+            results = cursor.fetchall()
+        
+            stats = []
+            for row in results:
+                stats.append({
+                    'Department_Name': row[0],
+                    'StudentCount': int(row[1]) if row[1] else 0,
+                    'AverageGPA': float(row[2]) if row[2] else 0,
+                    'MinGPA': float(row[3]) if row[3] else 0,
+                    'MaxGPA': float(row[4]) if row[4] else 0,
+                    'StdDevGPA': float(row[5]) if row[5] else 0,
+                })
+            return stats
         
-        return jsonify(stats)
+        return cached_json(('gpa-by-department',), load)
     except Exception as e:
         print(f'Get GPA statistics by department error: {e}')
         import traceback
@@ -3558,24 +4350,22 @@ def get_gpa_statistics_by_department():
 def get_course_enrollment_statistics():
     """Get course enrollment statistics - Using stored procedure"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('EXEC GetCourseEnrollmentStatistics')
-        results = cursor.fetchall()
-        conn.close()
-        
-        stats = []
-        for row in results:
-            stats.append({
-                'Major': row[0],
-                'TotalStudents': int(row[1]) if row[1] else 0,
-                'TotalCourses': int(row[2]) if row[2] else 0,
-                'TotalEnrollments': int(row[3]) if row[3] else 0,
-                'AvgCoursesPerStudent': float(row[4]) if row[4] else 0,
-            })
+        def load(cursor):
+            cursor.execute('EXEC GetCourseEnrollmentStatistics')
+            results = cursor.fetchall()
+        
+            stats = []
+            for row in results:
+                stats.append({
+                    'Major': row[0],
+                    'TotalStudents': int(row[1]) if row[1] else 0,
+                    'TotalCourses': int(row[2]) if row[2] else 0,
+                    'TotalEnrollments': int(row[3]) if row[3] else 0,
+                    'AvgCoursesPerStudent': float(row[4]) if row[4] else 0,
+                })
+            return stats
         
-        return jsonify(stats)
+        return cached_json(('course-enrollment',), load)
     except Exception as e:
         print(f'Get course enrollment statistics error: {e}')
         import traceback
@@ -3588,25 +4378,23 @@ def get_course_enrollment_statistics():
 def get_completion_rate_statistics():
     """Get completion rate statistics for quizzes and assignments - Using stored procedure"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('EXEC GetCompletionRateStatistics')
-        results = cursor.fetchall()
-        conn.close()
-        
-        stats = []
-        for row in results:
-            stats.append({
-                'Type': row[0],
-                'Total': int(row[1]) if row[1] else 0,
-                'Completed': int(row[2]) if row[2] else 0,
-                'Passed': int(row[3]) if row[3] else 0,
-                'CompletionRate': float(row[4]) if row[4] else 0,
-                'PassRate': float(row[5]) if row[5] else 0,
-            })
+        def load(cursor):
+            cursor.execute('EXEC GetCompletionRateStatistics')
+            results = cursor.fetchall()
+        
+            stats = []
+            for row in results:
+                stats.append({
+                    'Type': row[0],
+                    'Total': int(row[1]) if row[1] else 0,
+                    'Completed': int(row[2]) if row[2] else 0,
+                    'Passed': int(row[3]) if row[3] else 0,
+                    'CompletionRate': float(row[4]) if row[4] else 0,
+                    'PassRate': float(row[5]) if row[5] else 0,
+                })
+            return stats
         
-        return jsonify(stats)
+        return cached_json(('completion-rates',), load)
     except Exception as e:
         print(f'Get completion rate statistics error: {e}')
         import traceback
@@ -3621,25 +4409,23 @@ def get_performance_over_time():
     try:
         group_by = request.args.get('group_by', 'Semester')  # 'Semester' or 'Month'
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('EXEC GetPerformanceOverTime %s', (group_by,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        stats = []
-        for row in results:
-            stats.append({
-                'Period': row[0],
-                'StudentCount': int(row[1]) if row[1] else 0,
-                'CourseCount': int(row[2]) if row[2] else 0,
-                'AverageGPA': float(row[3]) if row[3] else 0,
-                'MinGPA': float(row[4]) if row[4] else 0,
-                'MaxGPA': float(row[5]) if row[5] else 0,
-            })
+        def load(cursor):
+            cursor.execute('EXEC GetPerformanceOverTime %s', (group_by,))
+            results = cursor.fetchall()
+        
+            stats = []
+            for row in results:
+                stats.append({
+                    'Period': row[0],
+                    'StudentCount': int(row[1]) if row[1] else 0,
+                    'CourseCount': int(row[2]) if row[2] else 0,
+                    'AverageGPA': float(row[3]) if row[3] else 0,
+                    'MinGPA': float(row[4]) if row[4] else 0,
+                    'MaxGPA': float(row[5]) if row[5] else 0,
+                })
+            return stats
         
-        return jsonify(stats)
+        return cached_json(('performance-over-time', group_by), load)
     except Exception as e:
         print(f'Get performance over time error: {e}')
         import traceback
@@ -3654,26 +4440,24 @@ def get_top_students():
     try:
         top_n = request.args.get('top_n', 10, type=int)
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('EXEC GetTopStudents %s', (top_n,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        students = []
-        for row in results:
-            students.append({
-                'University_ID': int(row[0]),
-                'First_Name': row[1],
-                'Last_Name': row[2],
-                'Major': row[3],
-                'CumulativeGPA': float(row[4]) if row[4] else 0,
-                'CourseCount': int(row[5]) if row[5] else 0,
-                'TotalCredits': float(row[6]) if row[6] else 0,
-            })
+        def load(cursor, n):
+            cursor.execute('EXEC GetTopStudents %s', (n,))
+            results = cursor.fetchall()
+        
+            students = []
+            for row in results:
+                students.append({
+                    'University_ID': int(row[0]),
+                    'First_Name': row[1],
+                    'Last_Name': row[2],
+                    'Major': row[3],
+                    'CumulativeGPA': float(row[4]) if row[4] else 0,
+                    'CourseCount': int(row[5]) if row[5] else 0,
+                    'TotalCredits': float(row[6]) if row[6] else 0,
+                })
+            return students
         
-        return jsonify(students)
+        return jsonify(get_ranked_cache().top('top-students', top_n, load))
     except Exception as e:
         print(f'Get top students error: {e}')
         import traceback
@@ -3688,27 +4472,25 @@ def get_top_tutors():
     try:
         top_n = request.args.get('top_n', 10, type=int)
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('EXEC GetTopTutors %s', (top_n,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        tutors = []
-        for row in results:
-            tutors.append({
-                'University_ID': int(row[0]),
-                'First_Name': row[1],
-                'Last_Name': row[2],
-                'Department_Name': row[3],
-                'Academic_Rank': row[4],
-                'SectionCount': int(row[5]) if row[5] else 0,
-                'StudentCount': int(row[6]) if row[6] else 0,
-                'AverageStudentGPA': float(row[7]) if row[7] else 0,
-            })
+        def load(cursor, n):
+            cursor.execute('EXEC GetTopTutors %s', (n,))
+            results = cursor.fetchall()
+        
+            tutors = []
+            for row in results:
+                tutors.append({
+                    'University_ID': int(row[0]),
+                    'First_Name': row[1],
+                    'Last_Name': row[2],
+                    'Department_Name': row[3],
+                    'Academic_Rank': row[4],
+                    'SectionCount': int(row[5]) if row[5] else 0,
+                    'StudentCount': int(row[6]) if row[6] else 0,
+                    'AverageStudentGPA': float(row[7]) if row[7] else 0,
+                })
+            return tutors
         
-        return jsonify(tutors)
+        return jsonify(get_ranked_cache().top('top-tutors', top_n, load))
     except Exception as e:
         print(f'Get top tutors error: {e}')
         import traceback
@@ -3722,39 +4504,37 @@ def get_top_tutors():
 @require_role(['admin'])
 def get_course_enrollment_by_course():
     """Get enrollment statistics by course - Using stored procedure"""
-    start_time = time.time()
     try:
         top_n = request.args.get('top_n', type=int)
         print(f'[Backend] get_course_enrollment_by_course called with top_n={top_n}')
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        if top_n:
-            cursor.execute('EXEC GetCourseEnrollmentByCourse %s', (top_n,))
-        else:
-            cursor.execute('EXEC GetCourseEnrollmentByCourse %s', (None,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        elapsed = time.time() - start_time
-        print(f'[Backend] get_course_enrollment_by_course completed in {elapsed:.2f}s, returned {len(results)} results')
-        
-        stats = []
-        for row in results:
-            stats.append({
-                'Course_ID': row[0],
-                'Course_Name': row[1],
-                'Credit': int(row[2]) if row[2] is not None else None,
-                'SectionCount': int(row[3]) if row[3] else 0,
-                'StudentCount': int(row[4]) if row[4] else 0,
-                'TutorCount': int(row[5]) if row[5] else 0,
-                'AverageGrade': float(row[6]) if row[6] else None,
-                'ApprovedStudents': int(row[7]) if row[7] else 0,
-                'PendingStudents': int(row[8]) if row[8] else 0,
-            })
+        def load(cursor):
+            start_time = time.time()
+            if top_n:
+                cursor.execute('EXEC GetCourseEnrollmentByCourse %s', (top_n,))
+            else:
+                cursor.execute('EXEC GetCourseEnrollmentByCourse %s', (None,))
+            results = cursor.fetchall()
+        
+            elapsed = time.time() - start_time
+            print(f'[Backend] get_course_enrollment_by_course completed in {elapsed:.2f}s, returned {len(results)} results')
+        
+            stats = []
+            for row in results:
+                stats.append({
+                    'Course_ID': row[0],
+                    'Course_Name': row[1],
+                    'Credit': int(row[2]) if row[2] is not None else None,
+                    'SectionCount': int(row[3]) if row[3] else 0,
+                    'StudentCount': int(row[4]) if row[4] else 0,
+                    'TutorCount': int(row[5]) if row[5] else 0,
+                    'AverageGrade': float(row[6]) if row[6] else None,
+                    'ApprovedStudents': int(row[7]) if row[7] else 0,
+                    'PendingStudents': int(row[8]) if row[8] else 0,
+                })
+            return stats
         
-        return jsonify(stats)
+        return cached_json(('courses/enrollment-by-course', top_n), load)
     except Exception as e:
         print(f'Get course enrollment by course error: {e}')
         import traceback
@@ -3766,28 +4546,27 @@ def get_course_enrollment_by_course():
 @require_role(['admin'])
 def get_course_distribution_by_credit():
     """Get course distribution by credit value - Using stored procedure"""
-    start_time = time.time()
     try:
         print('[Backend] get_course_distribution_by_credit called')
-        conn = get_db_connection()
-        cursor = conn.cursor()
         
-        cursor.execute('EXEC GetCourseDistributionByCredit')
-        results = cursor.fetchall()
-        conn.close()
+        def load(cursor):
+            start_time = time.time()
+            cursor.execute('EXEC GetCourseDistributionByCredit')
+            results = cursor.fetchall()
         
-        elapsed = time.time() - start_time
-        print(f'[Backend] get_course_distribution_by_credit completed in {elapsed:.2f}s, returned {len(results)} results')
+            elapsed = time.time() - start_time
+            print(f'[Backend] get_course_distribution_by_credit completed in {elapsed:.2f}s, returned {len(results)} results')
         
-        stats = []
-        for row in results:
-            stats.append({
-                'Credit': int(row[0]) if row[0] is not None else 0,
-                'CourseCount': int(row[1]) if row[1] else 0,
-                'TotalStudents': int(row[2]) if row[2] else 0,
-            })
+            stats = []
+            for row in results:
+                stats.append({
+                    'Credit': int(row[0]) if row[0] is not None else 0,
+                    'CourseCount': int(row[1]) if row[1] else 0,
+                    'TotalStudents': int(row[2]) if row[2] else 0,
+                })
+            return stats
         
-        return jsonify(stats)
+        return cached_json(('courses/distribution-by-credit',), load)
     except Exception as e:
         print(f'Get course distribution by credit error: {e}')
         import traceback
@@ -3799,36 +4578,34 @@ def get_course_distribution_by_credit():
 @require_role(['admin'])
 def get_top_courses_by_enrollment():
     """Get top courses by enrollment - Using stored procedure"""
-    start_time = time.time()
     try:
         top_n = request.args.get('top_n', 10, type=int)
         print(f'[Backend] get_top_courses_by_enrollment called with top_n={top_n}')
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('EXEC GetTopCoursesByEnrollment %s', (top_n,))
-        results = cursor.fetchall()
-        conn.close()
+        def load(cursor):
+            start_time = time.time()
+            cursor.execute('EXEC GetTopCoursesByEnrollment %s', (top_n,))
+            results = cursor.fetchall()
         
-        elapsed = time.time() - start_time
-        print(f'[Backend] get_top_courses_by_enrollment completed in {elapsed:.2f}s, returned {len(results)} results')
+            elapsed = time.time() - start_time
+            print(f'[Backend] get_top_courses_by_enrollment completed in {elapsed:.2f}s, returned {len(results)} results')
         
-        courses = []
-        for row in results:
-            courses.append({
-                'Course_ID': row[0],
-                'Course_Name': row[1],
-                'Credit': int(row[2]) if row[2] is not None else None,
-                'StudentCount': int(row[3]) if row[3] else 0,
-                'SectionCount': int(row[4]) if row[4] else 0,
-                'TutorCount': int(row[5]) if row[5] else 0,
-                'AverageGrade': float(row[6]) if row[6] else None,
-                'MinGrade': float(row[7]) if row[7] else None,
-                'MaxGrade': float(row[8]) if row[8] else None,
-            })
+            courses = []
+            for row in results:
+                courses.append({
+                    'Course_ID': row[0],
+                    'Course_Name': row[1],
+                    'Credit': int(row[2]) if row[2] is not None else None,
+                    'StudentCount': int(row[3]) if row[3] else 0,
+                    'SectionCount': int(row[4]) if row[4] else 0,
+                    'TutorCount': int(row[5]) if row[5] else 0,
+                    'AverageGrade': float(row[6]) if row[6] else None,
+                    'MinGrade': float(row[7]) if row[7] else None,
+                    'MaxGrade': float(row[8]) if row[8] else None,
+                })
+            return courses
         
-        return jsonify(courses)
+        return cached_json(('courses/top-by-enrollment', top_n), load)
     except Exception as e:
         print(f'Get top courses by enrollment error: {e}')
         import traceback
@@ -3840,36 +4617,34 @@ def get_top_courses_by_enrollment():
 @require_role(['admin'])
 def get_course_average_grade():
     """Get average grade statistics by course - Using stored procedure"""
-    start_time = time.time()
     try:
         min_enrollment = request.args.get('min_enrollment', 1, type=int)
         print(f'[Backend] get_course_average_grade called with min_enrollment={min_enrollment}')
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('EXEC GetCourseAverageGradeByCourse %s', (min_enrollment,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        elapsed = time.time() - start_time
-        print(f'[Backend] get_course_average_grade completed in {elapsed:.2f}s, returned {len(results)} results')
-        
-        stats = []
-        for row in results:
-            stats.append({
-                'Course_ID': row[0],
-                'Course_Name': row[1],
-                'Credit': int(row[2]) if row[2] is not None else None,
-                'StudentCount': int(row[3]) if row[3] else 0,
-                'AverageGPA': float(row[4]) if row[4] else None,
-                'AverageFinalGrade': float(row[5]) if row[5] else None,
-                'MinFinalGrade': float(row[6]) if row[6] else None,
-                'MaxFinalGrade': float(row[7]) if row[7] else None,
-                'StdDevFinalGrade': float(row[8]) if row[8] else None,
-            })
+        def load(cursor):
+            start_time = time.time()
+            cursor.execute('EXEC GetCourseAverageGradeByCourse %s', (min_enrollment,))
+            results = cursor.fetchall()
+        
+            elapsed = time.time() - start_time
+            print(f'[Backend] get_course_average_grade completed in {elapsed:.2f}s, returned {len(results)} results')
+        
+            stats = []
+            for row in results:
+                stats.append({
+                    'Course_ID': row[0],
+                    'Course_Name': row[1],
+                    'Credit': int(row[2]) if row[2] is not None else None,
+                    'StudentCount': int(row[3]) if row[3] else 0,
+                    'AverageGPA': float(row[4]) if row[4] else None,
+                    'AverageFinalGrade': float(row[5]) if row[5] else None,
+                    'MinFinalGrade': float(row[6]) if row[6] else None,
+                    'MaxFinalGrade': float(row[7]) if row[7] else None,
+                    'StdDevFinalGrade': float(row[8]) if row[8] else None,
+                })
+            return stats
         
-        return jsonify(stats)
+        return cached_json(('courses/average-grade', min_enrollment), load)
     except Exception as e:
         print(f'Get course average grade error: {e}')
         import traceback
@@ -3881,33 +4656,31 @@ def get_course_average_grade():
 @require_role(['admin'])
 def get_course_enrollment_trend_over_time():
     """Get course enrollment trend over time - Using stored procedure"""
-    start_time = time.time()
     try:
         group_by = request.args.get('group_by', 'Semester')  # 'Semester' or 'Month'
         print(f'[Backend] get_course_enrollment_trend_over_time called with group_by={group_by}')
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('EXEC GetCourseEnrollmentTrendOverTime %s', (group_by,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        elapsed = time.time() - start_time
-        print(f'[Backend] get_course_enrollment_trend_over_time completed in {elapsed:.2f}s, returned {len(results)} results')
-        
-        stats = []
-        for row in results:
-            stats.append({
-                'Period': row[0],
-                'CourseCount': int(row[1]) if row[1] else 0,
-                'SectionCount': int(row[2]) if row[2] else 0,
-                'StudentCount': int(row[3]) if row[3] else 0,
-                'TutorCount': int(row[4]) if row[4] else 0,
-                'AverageGrade': float(row[5]) if row[5] else None,
-            })
+        def load(cursor):
+            start_time = time.time()
+            cursor.execute('EXEC GetCourseEnrollmentTrendOverTime %s', (group_by,))
+            results = cursor.fetchall()
+        
+            elapsed = time.time() - start_time
+            print(f'[Backend] get_course_enrollment_trend_over_time completed in {elapsed:.2f}s, returned {len(results)} results')
+        
+            stats = []
+            for row in results:
+                stats.append({
+                    'Period': row[0],
+                    'CourseCount': int(row[1]) if row[1] else 0,
+                    'SectionCount': int(row[2]) if row[2] else 0,
+                    'StudentCount': int(row[3]) if row[3] else 0,
+                    'TutorCount': int(row[4]) if row[4] else 0,
+                    'AverageGrade': float(row[5]) if row[5] else None,
+                })
+            return stats
         
-        return jsonify(stats)
+        return cached_json(('courses/enrollment-trend', group_by), load)
     except Exception as e:
         print(f'Get course enrollment trend error: {e}')
         import traceback
@@ -3919,29 +4692,28 @@ def get_course_enrollment_trend_over_time():
 @require_role(['admin'])
 def get_course_status_distribution():
     """Get course enrollment status distribution - Using stored procedure"""
-    start_time = time.time()
     try:
         print('[Backend] get_course_status_distribution called')
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('EXEC GetCourseStatusDistribution')
-        results = cursor.fetchall()
-        conn.close()
-        
-        elapsed = time.time() - start_time
-        print(f'[Backend] get_course_status_distribution completed in {elapsed:.2f}s, returned {len(results)} results')
         
-        stats = []
-        for row in results:
-            stats.append({
-                'Status': row[0],
-                'StudentCount': int(row[1]) if row[1] else 0,
-                'CourseCount': int(row[2]) if row[2] else 0,
-                'SectionCount': int(row[3]) if row[3] else 0,
-            })
+        def load(cursor):
+            start_time = time.time()
+            cursor.execute('EXEC GetCourseStatusDistribution')
+            results = cursor.fetchall()
+        
+            elapsed = time.time() - start_time
+            print(f'[Backend] get_course_status_distribution completed in {elapsed:.2f}s, returned {len(results)} results')
+        
+            stats = []
+            for row in results:
+                stats.append({
+                    'Status': row[0],
+                    'StudentCount': int(row[1]) if row[1] else 0,
+                    'CourseCount': int(row[2]) if row[2] else 0,
+                    'SectionCount': int(row[3]) if row[3] else 0,
+                })
+            return stats
         
-        return jsonify(stats)
+        return cached_json(('courses/status-distribution',), load)
     except Exception as e:
         print(f'Get course status distribution error: {e}')
         import traceback
@@ -3953,40 +4725,38 @@ def get_course_status_distribution():
 @require_role(['admin'])
 def get_course_activity_statistics():
     """Get course activity statistics (assignments, quizzes, submissions) - Using stored procedure"""
-    start_time = time.time()
     try:
         top_n = request.args.get('top_n', type=int)
         print(f'[Backend] get_course_activity_statistics called with top_n={top_n}')
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        if top_n:
-            cursor.execute('EXEC GetCourseActivityStatistics %s', (top_n,))
-        else:
-            cursor.execute('EXEC GetCourseActivityStatistics %s', (None,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        elapsed = time.time() - start_time
-        print(f'[Backend] get_course_activity_statistics completed in {elapsed:.2f}s, returned {len(results)} results')
-        
-        stats = []
-        for row in results:
-            stats.append({
-                'Course_ID': row[0],
-                'Course_Name': row[1],
-                'Credit': int(row[2]) if row[2] is not None else None,
-                'SectionCount': int(row[3]) if row[3] else 0,
-                'StudentCount': int(row[4]) if row[4] else 0,
-                'TotalAssignments': int(row[5]) if row[5] else 0,
-                'TotalQuizzes': int(row[6]) if row[6] else 0,
-                'TotalSubmissions': int(row[7]) if row[7] else 0,
-                'SubmittedCount': int(row[8]) if row[8] else 0,
-                'AverageGrade': float(row[9]) if row[9] else None,
-            })
+        def load(cursor):
+            start_time = time.time()
+            if top_n:
+                cursor.execute('EXEC GetCourseActivityStatistics %s', (top_n,))
+            else:
+                cursor.execute('EXEC GetCourseActivityStatistics %s', (None,))
+            results = cursor.fetchall()
+        
+            elapsed = time.time() - start_time
+            print(f'[Backend] get_course_activity_statistics completed in {elapsed:.2f}s, returned {len(results)} results')
+        
+            stats = []
+            for row in results:
+                stats.append({
+                    'Course_ID': row[0],
+                    'Course_Name': row[1],
+                    'Credit': int(row[2]) if row[2] is not None else None,
+                    'SectionCount': int(row[3]) if row[3] else 0,
+                    'StudentCount': int(row[4]) if row[4] else 0,
+                    'TotalAssignments': int(row[5]) if row[5] else 0,
+                    'TotalQuizzes': int(row[6]) if row[6] else 0,
+                    'TotalSubmissions': int(row[7]) if row[7] else 0,
+                    'SubmittedCount': int(row[8]) if row[8] else 0,
+                    'AverageGrade': float(row[9]) if row[9] else None,
+                })
+            return stats
         
-        return jsonify(stats)
+        return cached_json(('courses/activity', top_n), load)
     except Exception as e:
         print(f'Get course activity statistics error: {e}')
         import traceback
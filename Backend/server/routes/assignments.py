@@ -1,42 +1,41 @@
 from flask import Blueprint, jsonify, request
-from config.database import get_db_connection
+from config.database import get_db
 from utils.jwt_utils import require_auth
+from utils.row_mapper import RowMapper, to_int, to_float, to_bool, to_iso
 
 assignments_bp = Blueprint('assignments', __name__)
 
+# GetStudentAllAssignments result columns
+STUDENT_ASSIGNMENT_ROW = RowMapper(
+    ('AssignmentID', to_int),
+    'Course_ID',
+    'Semester',
+    'instructions',
+    'accepted_specification',
+    ('submission_deadline', to_iso),
+    'TaskURL',
+    ('MaxScore', to_float),
+    'Assessment_ID',
+    ('score', to_float),
+    'status',
+    ('SubmitDate', to_iso),
+    ('late_flag_indicator', to_bool),
+    'attached_files',
+    'Comments',
+    'Section_ID',
+    'Course_Name',
+    'status_display',
+)
+
 @assignments_bp.route('/user/<int:user_id>', methods=['GET'])
 @require_auth
 def get_user_assignments(user_id):
     """Get all assignments for a student from all sections"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetStudentAllAssignments %s', (user_id,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        assignments = []
-        for row in results:
-            assignments.append({
-                'AssignmentID': int(row[0]) if row[0] else None,
-                'Course_ID': row[1],
-                'Semester': row[2],
-                'instructions': row[3],
-                'accepted_specification': row[4],
-                'submission_deadline': str(row[5]) if row[5] else None,
-                'TaskURL': row[6],
-                'MaxScore': float(row[7]) if row[7] else None,
-                'Assessment_ID': row[8],
-                'score': float(row[9]) if row[9] is not None else None,
-                'status': row[10],
-                'SubmitDate': str(row[11]) if row[11] else None,
-                'late_flag_indicator': bool(row[12]) if row[12] is not None else None,
-                'attached_files': row[13],
-                'Comments': row[14],
-                'Section_ID': row[15],
-                'Course_Name': row[16],
-                'status_display': row[17]
-            })
+        assignments = STUDENT_ASSIGNMENT_ROW.map_all(cursor)
         
         return jsonify(assignments)
     except Exception as e:
@@ -54,7 +53,7 @@ def get_assignment(id):
         section_id = request.args.get('section_id', type=str)
         course_id = request.args.get('course_id', type=str)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         # If university_id is provided, use GetAssignmentWithSubmission to get submission data
@@ -89,7 +88,6 @@ def get_assignment(id):
                     'late_flag_indicator': bool(result[14]) if len(result) > 14 and result[14] is not None else None,
                     'submission_status_display': result[15] if len(result) > 15 else None,
                 }
-                conn.close()
                 return jsonify(assignment)
             
             # If not found by AssignmentID, try with Assessment_ID
@@ -101,7 +99,6 @@ def get_assignment(id):
                 course_id
             ))
             result = cursor.fetchone()
-            conn.close()
             
             if result:
                 assignment = {
@@ -144,7 +141,6 @@ def get_assignment(id):
                 'Course_Name': result[8] if len(result) > 8 else None,
                 'StudentCount': result[9] if len(result) > 9 else 0,
             }
-            conn.close()
             return jsonify(assignment)
         
         # If not found, try to get by Assessment_ID
@@ -155,7 +151,6 @@ def get_assignment(id):
             course_id
         ))
         result = cursor.fetchone()
-        conn.close()
         
         if result:
             assignment = {
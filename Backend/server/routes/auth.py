@@ -1,10 +1,19 @@
 from flask import Blueprint, request, jsonify
-from config.database import get_db_connection
-import bcrypt
-from utils.jwt_utils import generate_token, verify_token, require_auth, get_token_from_request
+from config.database import get_db, release_db
+from utils.password_utils import verify_password, hash_password, PasswordHasherBusy
+from utils.jwt_utils import generate_token, verify_token, require_auth, get_token_from_request, revoke_token, revoke_user_tokens
 
 auth_bp = Blueprint('auth', __name__)
 
+# Resolve the role in the same round trip as the user row (admin > tutor > student)
+USER_ROLE_SQL = """
+    CASE
+        WHEN EXISTS (SELECT 1 FROM [Admin] ad WHERE ad.University_ID = u.University_ID) THEN 'admin'
+        WHEN EXISTS (SELECT 1 FROM [Tutor] t WHERE t.University_ID = u.University_ID) THEN 'tutor'
+        ELSE 'student'
+    END
+"""
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     try:
@@ -19,7 +28,7 @@ def login():
                 'error': 'University ID and password are required'
             }), 400
 
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         try:
@@ -30,10 +39,11 @@ def login():
                 'error': 'Mã số không hợp lệ'
             }), 400
 
-        # Get user and account info
-        cursor.execute("""
+        # Get user, account info and role in a single round trip
+        cursor.execute(f"""
             SELECT u.University_ID, u.First_Name, u.Last_Name, u.Email, 
-                   u.Phone_Number, u.[Address], u.National_ID, a.[Password] as PasswordHash
+                   u.Phone_Number, u.[Address], u.National_ID, a.[Password] as PasswordHash,
+                   {USER_ROLE_SQL} as Role
             FROM [Users] u
             LEFT JOIN [Account] a ON u.University_ID = a.University_ID
             WHERE u.University_ID = %s
@@ -42,7 +52,6 @@ def login():
         user = cursor.fetchone()
 
         if not user:
-            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'Người dùng không tồn tại'
@@ -51,52 +60,30 @@ def login():
         # Check password
         password_hash = user.PasswordHash if hasattr(user, 'PasswordHash') else (user[7] if len(user) > 7 else None)
         if password_hash:
-            stored_password = password_hash.strip() if password_hash else None
-            
-            # Check if password is bcrypt hash (starts with $2a$, $2b$, or $2y$)
-            is_bcrypt_hash = stored_password and (
-                stored_password.startswith('$2a$') or 
-                stored_password.startswith('$2b$') or 
-                stored_password.startswith('$2y$')
-            )
-            
-            password_valid = False
-            
-            if is_bcrypt_hash:
-                # Try bcrypt verification
-                try:
-                    password_valid = bcrypt.checkpw(
-                        password.encode('utf-8'), 
-                        stored_password.encode('utf-8')
-                    )
-                except Exception as e:
-                    print(f'Bcrypt check error: {e}')
-                    password_valid = False
-            else:
-                # Plain text comparison (for backward compatibility)
-                password_valid = (stored_password == password)
-            
+            # Hand the connection back before the CPU-bound bcrypt check
+            release_db()
+
+            password_valid, needs_rehash = verify_password(password, password_hash)
+
             if not password_valid:
-                conn.close()
                 return jsonify({
                     'success': False,
                     'error': 'Mật khẩu không đúng'
                 }), 401
 
-        # Determine user role
-        role = 'student'
+            if needs_rehash:
+                # Upgrade legacy plaintext (or weak) passwords to bcrypt transparently
+                try:
+                    new_password_hash = hash_password(password)
+                    cursor = get_db().cursor()
+                    cursor.execute('EXEC UpdatePassword %s, %s', (user_id, new_password_hash))
+                    get_db().commit()
+                except Exception as e:
+                    print(f'Password rehash error: {e}')
 
-        # Check if admin
-        cursor.execute('SELECT * FROM [Admin] WHERE University_ID = %s', (user_id,))
-        if cursor.fetchone():
-            role = 'admin'
-        else:
-            # Check if tutor
-            cursor.execute('SELECT * FROM [Tutor] WHERE University_ID = %s', (user_id,))
-            if cursor.fetchone():
-                role = 'tutor'
+        # Role was resolved by the query above
+        role = user.Role if hasattr(user, 'Role') else user[8]
 
-        conn.close()
 
         # Extract user data (handle both tuple and object)
         if hasattr(user, 'University_ID'):
@@ -110,7 +97,7 @@ def login():
                 'National_ID': user.National_ID,
             }
         else:
-            # Tuple access: University_ID, First_Name, Last_Name, Email, Phone_Number, Address, National_ID, PasswordHash
+            # Tuple access: University_ID, First_Name, Last_Name, Email, Phone_Number, Address, National_ID, PasswordHash, Role
             user_data = {
                 'University_ID': user[0],
                 'First_Name': user[1],
@@ -135,6 +122,12 @@ def login():
             'rememberMe': remember_me,
         })
 
+    except PasswordHasherBusy as e:
+        print(f'Login rejected: {e}')
+        return jsonify({
+            'success': False,
+            'error': 'Server is busy, please try again'
+        }), 503
     except Exception as e:
         print(f'Login error: {e}')
         return jsonify({
@@ -146,7 +139,8 @@ def login():
 @require_auth
 def logout():
     # Token is already verified by require_auth
-    # Frontend will clear the token from storage
+    # Frontend will clear the token from storage; make sure it stops working here too
+    revoke_token(get_token_from_request())
     return jsonify({'success': True, 'message': 'Logged out successfully'})
 
 @auth_bp.route('/verify', methods=['GET'])
@@ -214,30 +208,27 @@ def get_me():
         # Get user_id from JWT token
         user_id = request.current_user_id
 
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
-        cursor.execute('SELECT * FROM [Users] WHERE University_ID = %s', (user_id,))
+        cursor.execute(f"""
+            SELECT u.University_ID, u.First_Name, u.Last_Name, u.Email,
+                   u.Phone_Number, u.[Address], u.National_ID,
+                   {USER_ROLE_SQL} as Role
+            FROM [Users] u
+            WHERE u.University_ID = %s
+        """, (user_id,))
         user = cursor.fetchone()
 
         if not user:
-            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'User not found'
             }), 404
 
-        # Determine role
-        role = 'student'
-        cursor.execute('SELECT * FROM [Admin] WHERE University_ID = %s', (user_id,))
-        if cursor.fetchone():
-            role = 'admin'
-        else:
-            cursor.execute('SELECT * FROM [Tutor] WHERE University_ID = %s', (user_id,))
-            if cursor.fetchone():
-                role = 'tutor'
+        # Role was resolved by the query above
+        role = user.Role if hasattr(user, 'Role') else user[7]
 
-        conn.close()
 
         # Extract user data (handle both tuple and object)
         if hasattr(user, 'University_ID'):
@@ -291,7 +282,7 @@ def forgot_password():
                 'error': 'University ID is required'
             }), 400
 
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         try:
@@ -313,7 +304,6 @@ def forgot_password():
         user = cursor.fetchone()
 
         if not user:
-            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'Người dùng không tồn tại'
@@ -322,7 +312,6 @@ def forgot_password():
         # Verify email if provided
         user_email = user.Email if hasattr(user, 'Email') else (user[1] if len(user) > 1 else None)
         if email and user_email and email.lower() != user_email.lower():
-            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'Email không khớp với tài khoản'
@@ -339,7 +328,6 @@ def forgot_password():
         # Store reset token in database
         cursor.execute("{CALL RequestPasswordReset}", (user_id, reset_token, expires_at))
         conn.commit()
-        conn.close()
 
         # In production, send email with reset link
         # For now, return token (in production, don't return token, send via email)
@@ -374,14 +362,13 @@ def reset_password():
             }), 400
 
         # Verify token
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
-        cursor.execute("{CALL VerifyResetToken}", (reset_token,))
+        cursor.execute('EXEC VerifyResetToken %s', (reset_token,))
         result = cursor.fetchone()
         
         if not result or (hasattr(result, 'IsValid') and result.IsValid == 0):
-            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'Token không hợp lệ hoặc đã hết hạn'
@@ -389,20 +376,30 @@ def reset_password():
 
         university_id = result.University_ID if hasattr(result, 'University_ID') else result[0]
 
-        # Hash new password
-        import bcrypt
-        password_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        # Hash new password without holding the connection
+        release_db()
+        password_hash = hash_password(new_password)
 
         # Update password using stored procedure
-        cursor.execute("{CALL ResetPasswordWithToken}", (reset_token, password_hash))
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute('EXEC ResetPasswordWithToken %s, %s', (reset_token, password_hash))
         conn.commit()
-        conn.close()
+
+        # Sign out every existing session of this user
+        revoke_user_tokens(university_id)
 
         return jsonify({
             'success': True,
             'message': 'Mật khẩu đã được đặt lại thành công'
         })
 
+    except PasswordHasherBusy as e:
+        print(f'Reset password rejected: {e}')
+        return jsonify({
+            'success': False,
+            'error': 'Server is busy, please try again'
+        }), 503
     except Exception as e:
         print(f'Reset password error: {e}')
         import traceback
@@ -429,7 +426,7 @@ def change_password():
 
         user_id = request.current_user_id
 
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Get current password hash
@@ -442,59 +439,49 @@ def change_password():
         account = cursor.fetchone()
 
         if not account:
-            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'Tài khoản không tồn tại'
             }), 404
 
         password_hash = account.PasswordHash if hasattr(account, 'PasswordHash') else (account[0] if len(account) > 0 else None)
-        
+
+        # Hand the connection back before the CPU-bound bcrypt work
+        release_db()
+
         if password_hash:
-            stored_password = password_hash.strip() if password_hash else None
-            
-            # Check if password is bcrypt hash
-            is_bcrypt_hash = stored_password and (
-                stored_password.startswith('$2a$') or 
-                stored_password.startswith('$2b$') or 
-                stored_password.startswith('$2y$')
-            )
-            
-            password_valid = False
-            
-            if is_bcrypt_hash:
-                try:
-                    password_valid = bcrypt.checkpw(
-                        current_password.encode('utf-8'), 
-                        stored_password.encode('utf-8')
-                    )
-                except Exception as e:
-                    print(f'Bcrypt check error: {e}')
-                    password_valid = False
-            else:
-                password_valid = (stored_password == current_password)
-            
+            password_valid, _ = verify_password(current_password, password_hash)
+
             if not password_valid:
-                conn.close()
                 return jsonify({
                     'success': False,
                     'error': 'Mật khẩu hiện tại không đúng'
                 }), 401
 
         # Hash new password
-        import bcrypt
-        new_password_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        new_password_hash = hash_password(new_password)
+
+        conn = get_db()
+        cursor = conn.cursor()
 
         # Update password
-        cursor.execute("{CALL UpdatePassword}", (user_id, new_password_hash))
+        cursor.execute('EXEC UpdatePassword %s, %s', (user_id, new_password_hash))
         conn.commit()
-        conn.close()
+
+        # Sign out other sessions, keep the one that changed the password
+        revoke_user_tokens(user_id, keep_token=get_token_from_request())
 
         return jsonify({
             'success': True,
             'message': 'Mật khẩu đã được thay đổi thành công'
         })
 
+    except PasswordHasherBusy as e:
+        print(f'Change password rejected: {e}')
+        return jsonify({
+            'success': False,
+            'error': 'Server is busy, please try again'
+        }), 503
     except Exception as e:
         print(f'Change password error: {e}')
         import traceback
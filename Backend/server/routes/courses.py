@@ -1,16 +1,17 @@
 from flask import Blueprint, jsonify
-from config.database import get_db_connection
+from config.database import get_db
+from utils.http_cache import conditional_get
 
 courses_bp = Blueprint('courses', __name__)
 
 @courses_bp.route('/', methods=['GET'])
+@conditional_get(topics=('courses',))
 def get_courses():
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM [Course]')
         courses = cursor.fetchall()
-        conn.close()
 
         result = []
         for course in courses:
@@ -27,16 +28,16 @@ def get_courses():
         return jsonify({'success': False, 'error': 'Failed to fetch courses'}), 500
 
 @courses_bp.route('/<string:id>', methods=['GET'])
+@conditional_get(topics=('courses',))
 def get_course(id):
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         # Convert id to string to ensure proper matching
         course_id = str(id)
         cursor.execute('SELECT * FROM [Course] WHERE Course_ID = %s', (course_id,))
         course = cursor.fetchone()
-        conn.close()
 
         if not course:
             return jsonify({'success': False, 'error': f'Course not found: {course_id}'}), 404
@@ -54,13 +55,13 @@ def get_course(id):
         return jsonify({'success': False, 'error': f'Failed to fetch course: {str(e)}'}), 500
 
 @courses_bp.route('/<string:id>/sections', methods=['GET'])
+@conditional_get(topics=('sections',))
 def get_course_sections(id):
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM [Section] WHERE Course_ID = %s', (id,))
         sections = cursor.fetchall()
-        conn.close()
 
         result = []
         for section in sections:
@@ -77,13 +78,13 @@ def get_course_sections(id):
         return jsonify({'success': False, 'error': 'Failed to fetch sections'}), 500
 
 @courses_bp.route('/<string:course_id>/sections/<int:section_id>', methods=['GET'])
+@conditional_get(topics=('sections',))
 def get_section(course_id, section_id):
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM [Section] WHERE Course_ID = %s AND Section_ID = %s', (course_id, section_id))
         section = cursor.fetchone()
-        conn.close()
 
         if not section:
             return jsonify({'success': False, 'error': 'Section not found'}), 404
@@ -1,38 +1,39 @@
 from flask import Blueprint, jsonify
-from config.database import get_db_connection
+from config.database import get_db
 from utils.jwt_utils import require_auth
+from utils.row_mapper import RowMapper, to_int, to_float, to_iso
+from utils.http_cache import conditional_get
 
 grades_bp = Blueprint('grades', __name__)
 
+# GetStudentAllGrades result columns
+GRADE_ROW = RowMapper(
+    ('Assessment_ID', to_int),
+    'Section_ID',
+    'Course_ID',
+    'Semester',
+    ('Quiz_Grade', to_float),
+    ('Assignment_Grade', to_float),
+    ('Midterm_Grade', to_float),
+    ('Final_Grade', to_float),
+    'Status',
+    ('Registration_Date', to_iso),
+    ('Potential_Withdrawal_Date', to_iso),
+    'Course_Name',
+    ('Credits', to_int),
+    ('GPA', to_float),
+)
+
 @grades_bp.route('/user/<int:user_id>', methods=['GET'])
 @require_auth
+@conditional_get(topics=('courses', 'grades'))
 def get_user_grades(user_id):
     """Get all grades for a student from all sections"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetStudentAllGrades %s', (user_id,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        grades = []
-        for row in results:
-            grades.append({
-                'Assessment_ID': int(row[0]) if row[0] else None,
-                'Section_ID': row[1],
-                'Course_ID': row[2],
-                'Semester': row[3],
-                'Quiz_Grade': float(row[4]) if row[4] is not None else None,
-                'Assignment_Grade': float(row[5]) if row[5] is not None else None,
-                'Midterm_Grade': float(row[6]) if row[6] is not None else None,
-                'Final_Grade': float(row[7]) if row[7] is not None else None,
-                'Status': row[8],
-                'Registration_Date': str(row[9]) if row[9] else None,
-                'Potential_Withdrawal_Date': str(row[10]) if row[10] else None,
-                'Course_Name': row[11],
-                'Credits': int(row[12]) if row[12] else None,
-                'GPA': float(row[13]) if row[13] is not None else None,
-            })
+        grades = GRADE_ROW.map_all(cursor)
         
         return jsonify(grades)
     except Exception as e:
@@ -1,44 +1,43 @@
 from flask import Blueprint, jsonify, request
-from config.database import get_db_connection
+from config.database import get_db
 from utils.jwt_utils import require_auth
+from utils.row_mapper import RowMapper, to_int, to_float, to_iso
 
 quizzes_bp = Blueprint('quizzes', __name__)
 
+# GetStudentAllQuizzes result columns
+STUDENT_QUIZ_ROW = RowMapper(
+    ('QuizID', to_int),
+    'Section_ID',
+    'Course_ID',
+    'Semester',
+    ('Assessment_ID', to_int),
+    'Grading_method',
+    ('pass_score', to_float),
+    ('Time_limits', to_iso),
+    ('Start_Date', to_iso),
+    ('End_Date', to_iso),
+    'content',
+    'types',
+    ('Weight', to_float),
+    'Correct_answer',
+    'Questions',
+    'Responses',
+    'completion_status',
+    ('score', to_float),
+    'Course_Name',
+    'status_display',
+)
+
 @quizzes_bp.route('/user/<int:user_id>', methods=['GET'])
 @require_auth
 def get_user_quizzes(user_id):
     """Get all quizzes for a student from all sections"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetStudentAllQuizzes %s', (user_id,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        quizzes = []
-        for row in results:
-            quizzes.append({
-                'QuizID': int(row[0]) if row[0] else None,
-                'Section_ID': row[1],
-                'Course_ID': row[2],
-                'Semester': row[3],
-                'Assessment_ID': int(row[4]) if row[4] else None,
-                'Grading_method': row[5],
-                'pass_score': float(row[6]) if row[6] else None,
-                'Time_limits': str(row[7]) if row[7] else None,
-                'Start_Date': str(row[8]) if row[8] else None,
-                'End_Date': str(row[9]) if row[9] else None,
-                'content': row[10],
-                'types': row[11],
-                'Weight': float(row[12]) if row[12] else None,
-                'Correct_answer': row[13],
-                'Questions': row[14],
-                'Responses': row[15],
-                'completion_status': row[16],
-                'score': float(row[17]) if row[17] is not None else None,
-                'Course_Name': row[18],
-                'status_display': row[19]
-            })
+        quizzes = STUDENT_QUIZ_ROW.map_all(cursor)
         
         return jsonify(quizzes)
     except Exception as e:
@@ -54,11 +53,10 @@ def get_quiz(id):
     try:
         university_id = request.args.get('university_id', type=int)
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetQuizById %s, %s', (id, university_id))
         result = cursor.fetchone()
-        conn.close()
         
         if not result:
             return jsonify({'success': False, 'error': 'Quiz not found'}), 404
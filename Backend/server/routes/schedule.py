@@ -1,6 +1,9 @@
-from flask import Blueprint, jsonify
-from config.database import get_db_connection
+from flask import Blueprint, jsonify, request, current_app, url_for
+from config.database import get_db, release_db
 from utils.jwt_utils import require_auth
+from utils.password_utils import verify_password, hash_password, PasswordHasherBusy
+from utils.schedule_cache import get_schedule_cache
+from utils.ics import ICS_FEED_SECRET, feed_token, verify_feed_token, render_calendar
 
 schedule_bp = Blueprint('schedule', __name__)
 
@@ -30,57 +33,204 @@ def period_to_time(period):
         hour = period + 5  # period 8 -> 13, period 9 -> 14, etc.
         return f"{hour:02d}:00"
 
+def _fetch_schedule_rows(cursor, role, user_id):
+    """Run the role's schedule procedure"""
+    # Use different procedure based on role
+    if role == 'tutor':
+        cursor.execute('EXEC GetTutorSchedule %s', (user_id,))
+    else:
+        cursor.execute('EXEC GetStudentSchedule %s', (user_id,))
+    return cursor.fetchall()
+
+def _load_user_schedule(cursor, role, user_id):
+    """Shape the schedule rows for the timetable view"""
+    results = _fetch_schedule_rows(cursor, role, user_id)
+    
+    schedule_items = []
+    for row in results:
+        day_of_week = int(row[4]) if row[4] else None
+        start_period = int(row[5]) if row[5] else None
+        end_period = int(row[6]) if row[6] else None
+        
+        # Convert day of week to day name
+        day_name = DAY_NAMES.get(day_of_week, 'Unknown') if day_of_week else 'Unknown'
+        
+        # Convert periods to time string
+        time_str = 'N/A'
+        if start_period and end_period:
+            start_time = period_to_time(start_period)
+            end_time = period_to_time(end_period)
+            time_str = f"{start_time} - {end_time}"
+        
+        schedule_items.append({
+            'Section_ID': row[0],
+            'Course_ID': row[1],
+            'Semester': row[2],
+            'Course_Name': row[3],
+            'Day': day_name,
+            'Time': time_str,
+            'Building': row[7] if row[7] else 'N/A',
+            'Room': row[8] if row[8] else 'N/A',
+        })
+    return schedule_items
+
 @schedule_bp.route('/user/<int:user_id>', methods=['GET'])
 @require_auth
 def get_user_schedule(user_id):
-    """Get schedule for a student or tutor from all sections they are enrolled in or teach"""
+    """
+    Get schedule for a student or tutor from all sections they are enrolled in or teach
+
+    Served from the per-user timetable cache; clients that send the ETag back
+    in If-None-Match get 304 Not Modified.
+    """
     try:
-        from flask import request
         # Get role from JWT token (set by require_auth decorator)
         role = getattr(request, 'current_user_role', 'student')
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        entry, status = get_schedule_cache().get(
+            ('json', role, user_id),
+            lambda: current_app.json.dumps(_load_user_schedule(get_db().cursor(), role, user_id)).encode('utf-8'))
+        
+        return _conditional_response(entry, status, 'application/json')
+    except Exception as e:
+        print(f'Get user schedule error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to fetch schedule: {str(e)}'}), 500
+
+def _conditional_response(entry, status, mimetype):
+    """Send a cached timetable, or 304 when the client's copy is current"""
+    response = current_app.response_class(entry.body, mimetype=mimetype)
+    response.set_etag(entry.etag)
+    response.last_modified = entry.last_modified
+    # Cached by the client, but revalidated on every view
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.headers['X-Cache'] = status
+    return response.make_conditional(request)
+
+def _feed_version(cursor, user_id):
+    """Stored password hash of the account, which versions its feed tokens"""
+    cursor.execute("""
+        SELECT a.[Password] as PasswordHash
+        FROM [Account] a
+        WHERE a.University_ID = %s
+    """, (user_id,))
+    account = cursor.fetchone()
+    if not account:
+        return None
+    return account.PasswordHash if hasattr(account, 'PasswordHash') else account[0]
+
+def _feed_role(user_id):
+    """Role whose feed the caller may subscribe to, or an error response"""
+    current_id = getattr(request, 'current_user_id', None)
+    current_role = getattr(request, 'current_user_role', 'student')
+    if current_role == 'admin':
+        role = request.args.get('role', 'student')
+    elif current_id == user_id:
+        role = current_role
+    else:
+        return None, (jsonify({'success': False, 'error': 'You can only subscribe to your own schedule'}), 403)
+    if role not in ('student', 'tutor'):
+        return None, (jsonify({'success': False, 'error': 'role must be student or tutor'}), 400)
+    if not ICS_FEED_SECRET:
+        return None, (jsonify({'success': False, 'error': 'Calendar feeds are not configured'}), 503)
+    return role, None
+
+def _feed_url_response(user_id, role, version):
+    url = url_for('schedule.get_schedule_feed', user_id=user_id, role=role,
+                  token=feed_token(user_id, role, version), _external=True)
+    return jsonify({'success': True, 'url': url, 'webcal_url': 'webcal://' + url.split('://', 1)[-1]})
+
+@schedule_bp.route('/user/<int:user_id>/feed-url', methods=['GET'])
+@require_auth
+def get_feed_url(user_id):
+    """
+    Get the calendar subscription URL for a user's timetable
+
+    Users get their own feed; admins may pass ?role=student|tutor for anyone.
+    The URL stops working when the user's password changes.
+    """
+    try:
+        role, error = _feed_role(user_id)
+        if error:
+            return error
+        
+        return _feed_url_response(user_id, role, _feed_version(get_db().cursor(), user_id))
+    except Exception as e:
+        print(f'Get feed URL error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to create feed URL: {str(e)}'}), 500
+
+@schedule_bp.route('/user/<int:user_id>/feed-url/reset', methods=['POST'])
+@require_auth
+def reset_feed_url(user_id):
+    """
+    Replace a leaked calendar subscription URL with a new one
+
+    Confirmed with the current password, which is rehashed with a fresh salt;
+    that changes the feed version, so every earlier URL stops working.
+    """
+    try:
+        if getattr(request, 'current_user_id', None) != user_id:
+            return jsonify({'success': False, 'error': 'You can only reset your own feed URL'}), 403
+        role, error = _feed_role(user_id)
+        if error:
+            return error
+        current_password = (request.get_json(silent=True) or {}).get('currentPassword')
+        if not current_password:
+            return jsonify({'success': False, 'error': 'currentPassword is required'}), 400
         
-        # Use different procedure based on role
-        if role == 'tutor':
-            cursor.execute('EXEC GetTutorSchedule %s', (user_id,))
-        else:
-            cursor.execute('EXEC GetStudentSchedule %s', (user_id,))
+        password_hash = _feed_version(get_db().cursor(), user_id)
+        # Hand the connection back before the CPU-bound bcrypt work
+        release_db()
+        if not password_hash:
+            return jsonify({'success': False, 'error': 'Set a password before resetting the feed URL'}), 409
+        password_valid, _ = verify_password(current_password, password_hash)
+        if not password_valid:
+            return jsonify({'success': False, 'error': 'Current password is incorrect'}), 401
+        new_password_hash = hash_password(current_password)
         
-        results = cursor.fetchall()
-        conn.close()
+        conn = get_db()
+        conn.cursor().execute('EXEC UpdatePassword %s, %s', (user_id, new_password_hash))
+        conn.commit()
+        return _feed_url_response(user_id, role, new_password_hash)
+    except PasswordHasherBusy as e:
+        print(f'Reset feed URL rejected: {e}')
+        return jsonify({'success': False, 'error': 'Server is busy, please try again'}), 503
+    except Exception as e:
+        print(f'Reset feed URL error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to reset feed URL: {str(e)}'}), 500
+
+@schedule_bp.route('/feed/<int:user_id>.ics', methods=['GET'])
+def get_schedule_feed(user_id):
+    """
+    iCalendar feed of a user's timetable, authorized by the token in the URL
+
+    Calendar clients poll this; after one account lookup to check the token,
+    If-None-Match / If-Modified-Since get 304 from the per-user timetable cache.
+    """
+    try:
+        role = request.args.get('role', 'student')
+        token = request.args.get('token')
+        if role not in ('student', 'tutor') or not token or not ICS_FEED_SECRET:
+            return jsonify({'success': False, 'error': 'Invalid feed token'}), 403
+        if not verify_feed_token(user_id, role, _feed_version(get_db().cursor(), user_id), token):
+            return jsonify({'success': False, 'error': 'Invalid feed token'}), 403
         
-        schedule_items = []
-        for row in results:
-            day_of_week = int(row[4]) if row[4] else None
-            start_period = int(row[5]) if row[5] else None
-            end_period = int(row[6]) if row[6] else None
-            
-            # Convert day of week to day name
-            day_name = DAY_NAMES.get(day_of_week, 'Unknown') if day_of_week else 'Unknown'
-            
-            # Convert periods to time string
-            time_str = 'N/A'
-            if start_period and end_period:
-                start_time = period_to_time(start_period)
-                end_time = period_to_time(end_period)
-                time_str = f"{start_time} - {end_time}"
-            
-            schedule_items.append({
-                'Section_ID': row[0],
-                'Course_ID': row[1],
-                'Semester': row[2],
-                'Course_Name': row[3],
-                'Day': day_name,
-                'Time': time_str,
-                'Building': row[7] if row[7] else 'N/A',
-                'Room': row[8] if row[8] else 'N/A',
-            })
+        entry, status = get_schedule_cache().get(
+            ('ics', role, user_id),
+            lambda: render_calendar(_fetch_schedule_rows(get_db().cursor(), role, user_id),
+                                    name=f'{role.capitalize()} {user_id} timetable'))
         
-        return jsonify(schedule_items)
+        response = _conditional_response(entry, status, 'text/calendar')
+        response.headers['Content-Disposition'] = f'inline; filename="schedule-{user_id}.ics"'
+        return response
     except Exception as e:
-        print(f'Get user schedule error: {e}')
+        print(f'Get schedule feed error: {e}')
         import traceback
         traceback.print_exc()
-        return jsonify({'success': False, 'error': f'Failed to fetch schedule: {str(e)}'}), 500
+        return jsonify({'success': False, 'error': f'Failed to fetch schedule feed: {str(e)}'}), 500
@@ -1,13 +1,60 @@
 from flask import Blueprint, jsonify, request
-from config.database import get_db_connection
+from config.database import get_db
 from utils.jwt_utils import require_auth, require_role
+from utils.row_mapper import RowMapper, to_int, to_float, to_bool, to_iso
+from utils.dashboard import gather_sections, select_sections
+from utils.leaderboard import get_ranked_cache
+from utils.http_cache import conditional_get
 
 students_bp = Blueprint('students', __name__)
 
+# GetStudentSectionQuizzes result columns
+SECTION_QUIZ_ROW = RowMapper(
+    ('QuizID', to_int),
+    'Section_ID',
+    'Course_ID',
+    'Semester',
+    'Assessment_ID',
+    'Grading_method',
+    ('pass_score', to_float),
+    ('Time_limits', to_iso),
+    ('Start_Date', to_iso),
+    ('End_Date', to_iso),
+    'content',
+    'types',
+    ('Weight', to_float),
+    'Correct_answer',
+    'Questions',
+    'Responses',
+    ('completion_status', None, 'Not Taken'),
+    ('score', to_float),
+    'status_display',
+)
+
+# GetStudentSectionAssignments result columns
+SECTION_ASSIGNMENT_ROW = RowMapper(
+    ('AssignmentID', to_int),
+    'Course_ID',
+    'Semester',
+    'instructions',
+    'accepted_specification',
+    ('submission_deadline', to_iso),
+    'TaskURL',
+    ('MaxScore', to_int),
+    'Assessment_ID',
+    ('score', to_float),
+    'status',
+    ('SubmitDate', to_iso),
+    ('late_flag_indicator', to_bool),
+    'attached_files',
+    'Comments',
+    'status_display',
+)
+
 @students_bp.route('/course/<string:course_id>', methods=['GET'])
 def get_students_by_course(course_id):
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -20,7 +67,6 @@ def get_students_by_course(course_id):
         """, course_id)
 
         students = cursor.fetchall()
-        conn.close()
 
         result = []
         for student in students:
@@ -40,6 +86,156 @@ def get_students_by_course(course_id):
 
 # ==================== STUDENT DASHBOARD ====================
 
+def _load_dashboard_statistics(cursor, university_id):
+    cursor.execute('EXEC GetStudentDashboardStatistics %s', (university_id,))
+    result = cursor.fetchone()
+    
+    if not result:
+        return {
+            'total_courses': 0,
+            'total_assignments': 0,
+            'total_quizzes': 0,
+            'completed_assignments': 0,
+            'completed_quizzes': 0,
+            'average_grade': 0.0,
+            'total_study_hours': 0,
+            'progress_percentage': 0.0,
+            'leaderboard_rank': 0
+        }
+    
+    return {
+        'total_courses': int(result[0]) if result[0] else 0,
+        'total_assignments': int(result[1]) if result[1] else 0,
+        'total_quizzes': int(result[2]) if result[2] else 0,
+        'completed_assignments': int(result[3]) if result[3] else 0,
+        'completed_quizzes': int(result[4]) if result[4] else 0,
+        'average_grade': float(result[5]) if result[5] else 0.0,
+        'total_study_hours': int(result[6]) if result[6] else 0,
+        'progress_percentage': float(result[7]) if result[7] else 0.0,
+        'leaderboard_rank': int(result[8]) if result[8] else 0
+    }
+
+def _load_upcoming_tasks(cursor, university_id, days_ahead):
+    cursor.execute('EXEC GetStudentUpcomingTasks %s, %s', (university_id, days_ahead))
+    results = cursor.fetchall()
+    
+    tasks = []
+    for row in results:
+        tasks.append({
+            'task_type': row[0],
+            'task_id': row[1],
+            'task_title': row[2],
+            'deadline': str(row[3]) if row[3] else None,
+            'course_name': row[4],
+            'course_id': row[5],
+            'semester': row[6],
+            'is_completed': bool(row[7]),
+            'current_status': row[8]
+        })
+    return tasks
+
+def _load_leaderboard(cursor, top_n):
+    cursor.execute('EXEC GetStudentLeaderboard %s', (top_n,))
+    results = cursor.fetchall()
+    
+    leaderboard = []
+    for row in results:
+        leaderboard.append({
+            'rank': int(row[0]),
+            'first_name': row[1],
+            'last_name': row[2],
+            'course': int(row[3]) if row[3] else 0,
+            'hour': int(row[4]) if row[4] else 0,
+            'point': float(row[5]) if row[5] else 0.0,
+            'trend': row[6]
+        })
+    return leaderboard
+
+def _load_activity_chart(cursor, university_id, months_back):
+    cursor.execute('EXEC GetStudentActivityChart %s, %s', (university_id, months_back))
+    results = cursor.fetchall()
+    
+    chart_data = []
+    for row in results:
+        chart_data.append({
+            'month': row[0],
+            'Study': int(row[1]) if row[1] else 0,
+            'Exams': int(row[2]) if row[2] else 0
+        })
+    return chart_data
+
+def _load_grade_components(cursor, university_id):
+    cursor.execute('EXEC GetStudentGradeComponents %s', (university_id,))
+    results = cursor.fetchall()
+    
+    grade_components = []
+    for row in results:
+        grade_components.append({
+            'course_name': row[0],
+            'course_id': row[1],
+            'semester': row[2],
+            'final_grade': float(row[3]) if row[3] else 0.0,
+            'midterm_grade': float(row[4]) if row[4] else 0.0,
+            'quiz_grade': float(row[5]) if row[5] else 0.0,
+            'assignment_grade': float(row[6]) if row[6] else 0.0
+        })
+    return grade_components
+
+def _load_courses(cursor, university_id):
+    cursor.execute('EXEC GetStudentCourses %s', (university_id,))
+    results = cursor.fetchall()
+    
+    courses = []
+    for row in results:
+        courses.append({
+            'Course_ID': row[0],
+            'Name': row[1],
+            'Credit': int(row[2]) if row[2] else None,
+        })
+    return courses
+
+@students_bp.route('/dashboard', methods=['GET'])
+@require_auth
+@require_role(['student'])
+def get_student_dashboard():
+    """
+    Get every student dashboard widget in one request
+    
+    Query params: university_id, days_ahead, top_n, months_back (as for the
+    individual endpoints) and optional sections=statistics,courses,... to
+    load only some widgets. A failing widget is returned as null and listed
+    in errors; the rest of the page still loads.
+    """
+    try:
+        university_id = request.args.get('university_id', type=int)
+        if not university_id:
+            return jsonify({'success': False, 'error': 'university_id is required'}), 400
+        days_ahead = request.args.get('days_ahead', default=7, type=int)
+        top_n = request.args.get('top_n', default=10, type=int)
+        months_back = request.args.get('months_back', default=5, type=int)
+        
+        loaders = {
+            'statistics': lambda cursor: _load_dashboard_statistics(cursor, university_id),
+            'upcoming_tasks': lambda cursor: _load_upcoming_tasks(cursor, university_id, days_ahead),
+            'leaderboard': lambda cursor: get_ranked_cache().top('student-leaderboard', top_n, _load_leaderboard, cursor),
+            'activity_chart': lambda cursor: _load_activity_chart(cursor, university_id, months_back),
+            'grade_components': lambda cursor: _load_grade_components(cursor, university_id),
+            'courses': lambda cursor: _load_courses(cursor, university_id),
+        }
+        
+        try:
+            loaders = select_sections(loaders, request.args.get('sections'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        sections, errors = gather_sections(loaders)
+        return jsonify({'sections': sections, 'errors': errors})
+    except Exception as e:
+        print(f'Get student dashboard error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to get dashboard: {str(e)}'}), 500
+
 @students_bp.route('/dashboard/statistics', methods=['GET'])
 @require_auth
 @require_role(['student'])
@@ -50,36 +246,8 @@ def get_student_dashboard_statistics():
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('EXEC GetStudentDashboardStatistics %s', (university_id,))
-        result = cursor.fetchone()
-        conn.close()
-        
-        if not result:
-            return jsonify({
-                'total_courses': 0,
-                'total_assignments': 0,
-                'total_quizzes': 0,
-                'completed_assignments': 0,
-                'completed_quizzes': 0,
-                'average_grade': 0.0,
-                'total_study_hours': 0,
-                'progress_percentage': 0.0,
-                'leaderboard_rank': 0
-            })
-        
-        return jsonify({
-            'total_courses': int(result[0]) if result[0] else 0,
-            'total_assignments': int(result[1]) if result[1] else 0,
-            'total_quizzes': int(result[2]) if result[2] else 0,
-            'completed_assignments': int(result[3]) if result[3] else 0,
-            'completed_quizzes': int(result[4]) if result[4] else 0,
-            'average_grade': float(result[5]) if result[5] else 0.0,
-            'total_study_hours': int(result[6]) if result[6] else 0,
-            'progress_percentage': float(result[7]) if result[7] else 0.0,
-            'leaderboard_rank': int(result[8]) if result[8] else 0
-        })
+        conn = get_db()
+        return jsonify(_load_dashboard_statistics(conn.cursor(), university_id))
     except Exception as e:
         print(f'Get student dashboard statistics error: {e}')
         import traceback
@@ -98,27 +266,8 @@ def get_student_upcoming_tasks():
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('EXEC GetStudentUpcomingTasks %s, %s', (university_id, days_ahead))
-        results = cursor.fetchall()
-        conn.close()
-        
-        tasks = []
-        for row in results:
-            tasks.append({
-                'task_type': row[0],
-                'task_id': row[1],
-                'task_title': row[2],
-                'deadline': str(row[3]) if row[3] else None,
-                'course_name': row[4],
-                'course_id': row[5],
-                'semester': row[6],
-                'is_completed': bool(row[7]),
-                'current_status': row[8]
-            })
-        
-        return jsonify(tasks)
+        conn = get_db()
+        return jsonify(_load_upcoming_tasks(conn.cursor(), university_id, days_ahead))
     except Exception as e:
         print(f'Get student upcoming tasks error: {e}')
         import traceback
@@ -133,25 +282,7 @@ def get_student_leaderboard():
     try:
         top_n = request.args.get('top_n', default=10, type=int)
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('EXEC GetStudentLeaderboard %s', (top_n,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        leaderboard = []
-        for row in results:
-            leaderboard.append({
-                'rank': int(row[0]),
-                'first_name': row[1],
-                'last_name': row[2],
-                'course': int(row[3]) if row[3] else 0,
-                'hour': int(row[4]) if row[4] else 0,
-                'point': float(row[5]) if row[5] else 0.0,
-                'trend': row[6]
-            })
-        
-        return jsonify(leaderboard)
+        return jsonify(get_ranked_cache().top('student-leaderboard', top_n, _load_leaderboard))
     except Exception as e:
         print(f'Get student leaderboard error: {e}')
         import traceback
@@ -170,21 +301,8 @@ def get_student_activity_chart():
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('EXEC GetStudentActivityChart %s, %s', (university_id, months_back))
-        results = cursor.fetchall()
-        conn.close()
-        
-        chart_data = []
-        for row in results:
-            chart_data.append({
-                'month': row[0],
-                'Study': int(row[1]) if row[1] else 0,
-                'Exams': int(row[2]) if row[2] else 0
-            })
-        
-        return jsonify(chart_data)
+        conn = get_db()
+        return jsonify(_load_activity_chart(conn.cursor(), university_id, months_back))
     except Exception as e:
         print(f'Get student activity chart error: {e}')
         import traceback
@@ -202,25 +320,8 @@ def get_student_grade_components():
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('EXEC GetStudentGradeComponents %s', (university_id,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        grade_components = []
-        for row in results:
-            grade_components.append({
-                'course_name': row[0],
-                'course_id': row[1],
-                'semester': row[2],
-                'final_grade': float(row[3]) if row[3] else 0.0,
-                'midterm_grade': float(row[4]) if row[4] else 0.0,
-                'quiz_grade': float(row[5]) if row[5] else 0.0,
-                'assignment_grade': float(row[6]) if row[6] else 0.0
-            })
-        
-        return jsonify(grade_components)
+        conn = get_db()
+        return jsonify(_load_grade_components(conn.cursor(), university_id))
     except Exception as e:
         print(f'Get student grade components error: {e}')
         import traceback
@@ -237,22 +338,8 @@ def get_student_courses():
         if not university_id:
             return jsonify({'success': False, 'error': 'University ID is required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('EXEC GetStudentCourses %s', (university_id,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        courses = []
-        for row in results:
-            courses.append({
-                'Course_ID': row[0],
-                'Name': row[1],
-                'Credit': int(row[2]) if row[2] else None,
-            })
-        
-        return jsonify(courses)
+        conn = get_db()
+        return jsonify(_load_courses(conn.cursor(), university_id))
     except Exception as e:
         print(f'Get student courses error: {e}')
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -260,6 +347,7 @@ def get_student_courses():
 @students_bp.route('/courses/with-sections', methods=['GET'])
 @require_auth
 @require_role(['student'])
+@conditional_get(topics=('courses', 'sections'))
 def get_student_courses_with_sections():
     """Get courses with sections that the student is enrolled in"""
     try:
@@ -267,11 +355,10 @@ def get_student_courses_with_sections():
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetStudentCoursesWithSections %s', (university_id,))
         results = cursor.fetchall()
-        conn.close()
         
         # Group by course
         courses_dict = {}
@@ -308,11 +395,10 @@ def get_student_section_detail(section_id, course_id):
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetStudentSectionDetail %s, %s, %s', (university_id, section_id, course_id))
         result = cursor.fetchone()
-        conn.close()
         
         if not result:
             return jsonify({'success': False, 'error': 'Section not found or student not enrolled'}), 404
@@ -343,11 +429,10 @@ def get_student_course_detail(course_id):
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetStudentCourseDetail %s, %s', (university_id, course_id))
         result = cursor.fetchone()
-        conn.close()
         
         if not result:
             return jsonify({'success': False, 'error': 'Course not found or student not enrolled'}), 404
@@ -367,6 +452,7 @@ def get_student_course_detail(course_id):
 @students_bp.route('/course/<string:course_id>/sections', methods=['GET'])
 @require_auth
 @require_role(['student'])
+@conditional_get(topics=('sections',))
 def get_student_course_sections(course_id):
     """Get sections of a course that the student is enrolled in"""
     try:
@@ -374,11 +460,10 @@ def get_student_course_sections(course_id):
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetStudentCourseSections %s, %s', (university_id, course_id))
         results = cursor.fetchall()
-        conn.close()
         
         sections = []
         for row in results:
@@ -405,11 +490,10 @@ def get_student_course_quizzes(course_id):
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetStudentCourseQuizzes %s, %s', (university_id, course_id))
         results = cursor.fetchall()
-        conn.close()
         
         quizzes = []
         for row in results:
@@ -445,6 +529,7 @@ def get_student_course_quizzes(course_id):
 @students_bp.route('/course/<string:course_id>/grades', methods=['GET'])
 @require_auth
 @require_role(['student'])
+@conditional_get(topics=('courses', 'grades'))
 def get_student_course_grades(course_id):
     """Get assessment grades for a student in a specific course"""
     try:
@@ -452,11 +537,10 @@ def get_student_course_grades(course_id):
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetStudentCourseGrades %s, %s', (university_id, course_id))
         results = cursor.fetchall()
-        conn.close()
         
         grades = []
         for row in results:
@@ -485,11 +569,10 @@ def get_student_course_grades(course_id):
 def get_student_course_students(course_id):
     """Get list of students enrolled in the same course"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetStudentCourseStudents %s', (course_id,))
         results = cursor.fetchall()
-        conn.close()
         
         students = []
         for row in results:
@@ -521,35 +604,10 @@ def get_student_section_quizzes(section_id, course_id, semester):
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetStudentSectionQuizzes %s, %s, %s, %s', (university_id, section_id, course_id, semester))
-        results = cursor.fetchall()
-        conn.close()
-        
-        quizzes = []
-        for row in results:
-            quizzes.append({
-                'QuizID': int(row[0]) if row[0] else None,
-                'Section_ID': row[1],
-                'Course_ID': row[2],
-                'Semester': row[3],
-                'Assessment_ID': row[4],
-                'Grading_method': row[5],
-                'pass_score': float(row[6]) if row[6] else None,
-                'Time_limits': str(row[7]) if row[7] else None,
-                'Start_Date': str(row[8]) if row[8] else None,
-                'End_Date': str(row[9]) if row[9] else None,
-                'content': row[10],
-                'types': row[11],
-                'Weight': float(row[12]) if row[12] else None,
-                'Correct_answer': row[13],
-                'Questions': row[14],
-                'Responses': row[15],
-                'completion_status': row[16] if row[16] else 'Not Taken',
-                'score': float(row[17]) if row[17] else None,
-                'status_display': row[18]
-            })
+        quizzes = SECTION_QUIZ_ROW.map_all(cursor)
         
         return jsonify(quizzes)
     except Exception as e:
@@ -568,35 +626,10 @@ def get_student_section_assignments(section_id, course_id, semester):
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetStudentSectionAssignments %s, %s, %s, %s', (university_id, section_id, course_id, semester))
-        results = cursor.fetchall()
-        conn.close()
-        
-        assignments = []
-        for row in results:
-            # Procedure returns: AssignmentID, Course_ID, Semester, instructions, accepted_specification, 
-            # submission_deadline, TaskURL, MaxScore, Assessment_ID, score, status, SubmitDate, 
-            # late_flag_indicator, attached_files, Comments, status_display
-            assignments.append({
-                'AssignmentID': int(row[0]) if row[0] else None,
-                'Course_ID': row[1],
-                'Semester': row[2],
-                'instructions': row[3],
-                'accepted_specification': row[4],
-                'submission_deadline': str(row[5]) if row[5] else None,
-                'TaskURL': row[6] if len(row) > 6 else None,  # TaskURL
-                'MaxScore': int(row[7]) if len(row) > 7 and row[7] else None,  # MaxScore
-                'Assessment_ID': row[8] if len(row) > 8 else None,
-                'score': float(row[9]) if len(row) > 9 and row[9] else None,
-                'status': row[10] if len(row) > 10 else None,
-                'SubmitDate': str(row[11]) if len(row) > 11 and row[11] else None,
-                'late_flag_indicator': bool(row[12]) if len(row) > 12 and row[12] is not None else None,
-                'attached_files': row[13] if len(row) > 13 else None,
-                'Comments': row[14] if len(row) > 14 else None,
-                'status_display': row[15] if len(row) > 15 else None
-            })
+        assignments = SECTION_ASSIGNMENT_ROW.map_all(cursor)
         
         return jsonify(assignments)
     except Exception as e:
@@ -608,6 +641,7 @@ def get_student_section_assignments(section_id, course_id, semester):
 @students_bp.route('/section/<string:section_id>/<string:course_id>/<string:semester>/grades', methods=['GET'])
 @require_auth
 @require_role(['student'])
+@conditional_get(topics=('grades',))
 def get_student_section_grades(section_id, course_id, semester):
     """Get assessment grades for a student in a specific section"""
     try:
@@ -615,11 +649,10 @@ def get_student_section_grades(section_id, course_id, semester):
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetStudentSectionGrades %s, %s, %s, %s', (university_id, section_id, course_id, semester))
         result = cursor.fetchone()
-        conn.close()
         
         if not result:
             return jsonify({
@@ -657,11 +690,10 @@ def get_student_section_grades(section_id, course_id, semester):
 def get_student_section_students(section_id, course_id, semester):
     """Get list of students enrolled in the same section"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetStudentSectionStudents %s, %s, %s', (section_id, course_id, semester))
         results = cursor.fetchall()
-        conn.close()
         
         students = []
         for row in results:
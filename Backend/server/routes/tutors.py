@@ -1,11 +1,144 @@
 from flask import Blueprint, jsonify, request
-from config.database import get_db_connection
+from config.database import get_db
 from utils.jwt_utils import require_auth, require_role
+from utils.leaderboard import get_ranked_cache, invalidate_rankings
+from utils.batch import BATCH_MAX_ROWS, BatchAborted, execute_batched
+from utils.quiz_grading import AnswerKeyError, parse_answer_key, grade_all
+from utils.request_flags import parse_flag
+from utils.dashboard import gather_sections, select_sections
+from utils.http_cache import conditional_get
+import time
 
 tutors_bp = Blueprint('tutors', __name__)
 
 # ==================== TUTOR DASHBOARD ====================
 
+def _load_dashboard_statistics(cursor, university_id):
+    cursor.execute('EXEC GetTutorDashboardStatistics %s', (university_id,))
+    result = cursor.fetchone()
+    
+    if not result:
+        return {
+            'total_courses': 0,
+            'total_students': 0,
+            'pending_assignments': 0,
+            'pending_quizzes': 0,
+            'completion_rate': 0,
+        }
+    
+    return {
+        'total_courses': int(result[0]) if result[0] else 0,
+        'total_students': int(result[1]) if result[1] else 0,
+        'pending_assignments': int(result[2]) if result[2] else 0,
+        'pending_quizzes': int(result[3]) if result[3] else 0,
+        'completion_rate': float(result[4]) if result[4] else 0,
+    }
+
+def _load_courses(cursor, university_id):
+    cursor.execute('EXEC GetTutorCourses %s', (university_id,))
+    results = cursor.fetchall()
+    
+    # Group by course
+    courses_dict = {}
+    for row in results:
+        course_id = row[0]
+        if course_id not in courses_dict:
+            courses_dict[course_id] = {
+                'Course_ID': row[0],
+                'Name': row[1],  # Use Name instead of Course_Name to match Course interface
+                'Credit': int(row[2]) if row[2] else None,
+                'CCategory': row[3],
+                'SectionCount': 0,
+                'StudentCount': 0,
+                'AssignmentCount': int(row[7]) if len(row) > 7 and row[7] else 0,
+                'PendingAssignments': int(row[8]) if len(row) > 8 and row[8] else 0,
+                'Sections': []
+            }
+        
+        # Add section
+        section_id = row[4]
+        semester = row[5]
+        student_count = int(row[6]) if len(row) > 6 and row[6] else 0
+        
+        courses_dict[course_id]['Sections'].append({
+            'Section_ID': section_id,
+            'Semester': semester,
+            'StudentCount': student_count
+        })
+        courses_dict[course_id]['SectionCount'] += 1
+        courses_dict[course_id]['StudentCount'] += student_count
+    
+    courses = list(courses_dict.values())
+    return courses
+
+def _load_grading_activity(cursor, university_id, months_back):
+    cursor.execute('EXEC GetTutorGradingActivity %s, %s', (university_id, months_back))
+    results = cursor.fetchall()
+    
+    activity = []
+    for row in results:
+        activity.append({
+            'month': row[0],
+            'Graded': int(row[1]) if row[1] else 0,
+            'Pending': int(row[2]) if row[2] else 0,
+        })
+    
+    return activity
+
+def _load_student_grade_components(cursor, university_id):
+    cursor.execute('EXEC GetTutorStudentGradeComponents %s', (university_id,))
+    results = cursor.fetchall()
+    
+    components = []
+    for row in results:
+        components.append({
+            'course_name': row[0],
+            'Course_ID': row[1],
+            'final_grade': float(row[2]) if row[2] else 0,
+            'midterm_grade': float(row[3]) if row[3] else 0,
+            'quiz_grade': float(row[4]) if row[4] else 0,
+            'assignment_grade': float(row[5]) if row[5] else 0,
+        })
+    
+    return components
+
+def _load_average_student_gpa(cursor, university_id):
+    cursor.execute('EXEC GetTutorAverageStudentGPA %s', (university_id,))
+    result = cursor.fetchone()
+    
+    if not result:
+        return {
+            'average_gpa': 0,
+            'total_students': 0,
+            'total_courses': 0,
+            'rank': 0,
+        }
+    
+    return {
+        'average_gpa': float(result[0]) if result[0] else 0,
+        'total_students': int(result[1]) if result[1] else 0,
+        'total_courses': int(result[2]) if result[2] else 0,
+        'rank': int(result[3]) if result[3] else 0,
+    }
+
+def _load_top_tutors(cursor, top_n):
+    cursor.execute('EXEC GetTopTutorsByStudentGPA %s', (top_n,))
+    results = cursor.fetchall()
+    
+    tutors = []
+    for row in results:
+        tutors.append({
+            'rank': int(row[0]),
+            'first_name': row[1],
+            'last_name': row[2],
+            'course': int(row[3]) if row[3] else 0,
+            'hour': int(row[4]) if row[4] else 0,
+            'point': float(row[5]) if row[5] else 0,
+            'trend': row[6],
+        })
+    
+    return tutors
+
 @tutors_bp.route('/dashboard/statistics', methods=['GET'])
 @require_auth
 @require_role(['tutor'])
@@ -16,28 +149,8 @@ def get_tutor_dashboard_statistics():
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('EXEC GetTutorDashboardStatistics %s', (university_id,))
-        result = cursor.fetchone()
-        conn.close()
-        
-        if not result:
-            return jsonify({
-                'total_courses': 0,
-                'total_students': 0,
-                'pending_assignments': 0,
-                'pending_quizzes': 0,
-                'completion_rate': 0,
-            })
-        
-        return jsonify({
-            'total_courses': int(result[0]) if result[0] else 0,
-            'total_students': int(result[1]) if result[1] else 0,
-            'pending_assignments': int(result[2]) if result[2] else 0,
-            'pending_quizzes': int(result[3]) if result[3] else 0,
-            'completion_rate': float(result[4]) if result[4] else 0,
-        })
+        conn = get_db()
+        return jsonify(_load_dashboard_statistics(conn.cursor(), university_id))
     except Exception as e:
         print(f'Get tutor dashboard statistics error: {e}')
         import traceback
@@ -47,6 +160,7 @@ def get_tutor_dashboard_statistics():
 @tutors_bp.route('/courses/with-sections', methods=['GET'])
 @require_auth
 @require_role(['tutor'])
+@conditional_get(topics=('courses', 'sections'))
 def get_tutor_courses_with_sections():
     """Get courses with sections that the tutor teaches"""
     try:
@@ -54,11 +168,10 @@ def get_tutor_courses_with_sections():
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetTutorCoursesWithSections %s', (university_id,))
         results = cursor.fetchall()
-        conn.close()
         
         # Group by course
         courses_dict = {}
@@ -95,11 +208,10 @@ def get_tutor_section_detail(section_id, course_id):
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetTutorSectionDetail %s, %s, %s', (university_id, section_id, course_id))
         result = cursor.fetchone()
-        conn.close()
         
         if not result:
             return jsonify({'success': False, 'error': 'Section not found or tutor does not teach this section'}), 404
@@ -124,11 +236,10 @@ def get_tutor_section_detail(section_id, course_id):
 def get_tutor_section_quizzes(section_id, course_id, semester):
     """Get quizzes for a section that the tutor teaches"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetTutorSectionQuizzes %s, %s, %s', (section_id, course_id, semester))
         results = cursor.fetchall()
-        conn.close()
         
         # Use a set to track seen QuizIDs to prevent duplicates
         seen_quiz_ids = set()
@@ -181,11 +292,10 @@ def get_tutor_section_quizzes(section_id, course_id, semester):
 def get_tutor_section_assignments(section_id, course_id, semester):
     """Get assignments for a section that the tutor teaches"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetTutorSectionAssignments %s, %s, %s', (section_id, course_id, semester))
         results = cursor.fetchall()
-        conn.close()
         
         # Use a set to track seen AssignmentIDs to prevent duplicates
         seen_assignment_ids = set()
@@ -220,14 +330,14 @@ def get_tutor_section_assignments(section_id, course_id, semester):
 @tutors_bp.route('/section/<string:section_id>/<string:course_id>/<string:semester>/students', methods=['GET'])
 @require_auth
 @require_role(['tutor'])
+@conditional_get(topics=('sections',))
 def get_tutor_section_students(section_id, course_id, semester):
     """Get students in a section that the tutor teaches"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetTutorSectionStudents %s, %s, %s', (section_id, course_id, semester))
         results = cursor.fetchall()
-        conn.close()
         
         students = []
         for row in results:
@@ -250,14 +360,14 @@ def get_tutor_section_students(section_id, course_id, semester):
 @tutors_bp.route('/section/<string:section_id>/<string:course_id>/<string:semester>/student-grades', methods=['GET'])
 @require_auth
 @require_role(['tutor'])
+@conditional_get(topics=('sections', 'grades'))
 def get_tutor_section_student_grades(section_id, course_id, semester):
     """Get student grades for all students in a section that the tutor teaches"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC GetTutorSectionStudentGrades %s, %s, %s', (section_id, course_id, semester))
         results = cursor.fetchall()
-        conn.close()
         
         student_grades = []
         for row in results:
@@ -294,44 +404,8 @@ def get_tutor_courses():
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('EXEC GetTutorCourses %s', (university_id,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        # Group by course
-        courses_dict = {}
-        for row in results:
-            course_id = row[0]
-            if course_id not in courses_dict:
-                courses_dict[course_id] = {
-                    'Course_ID': row[0],
-                    'Name': row[1],  # Use Name instead of Course_Name to match Course interface
-                    'Credit': int(row[2]) if row[2] else None,
-                    'CCategory': row[3],
-                    'SectionCount': 0,
-                    'StudentCount': 0,
-                    'AssignmentCount': int(row[7]) if len(row) > 7 and row[7] else 0,
-                    'PendingAssignments': int(row[8]) if len(row) > 8 and row[8] else 0,
-                    'Sections': []
-                }
-            
-            # Add section
-            section_id = row[4]
-            semester = row[5]
-            student_count = int(row[6]) if len(row) > 6 and row[6] else 0
-            
-            courses_dict[course_id]['Sections'].append({
-                'Section_ID': section_id,
-                'Semester': semester,
-                'StudentCount': student_count
-            })
-            courses_dict[course_id]['SectionCount'] += 1
-            courses_dict[course_id]['StudentCount'] += student_count
-        
-        courses = list(courses_dict.values())
-        return jsonify(courses)
+        conn = get_db()
+        return jsonify(_load_courses(conn.cursor(), university_id))
     except Exception as e:
         print(f'Get tutor courses error: {e}')
         import traceback
@@ -350,21 +424,8 @@ def get_tutor_grading_activity():
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('EXEC GetTutorGradingActivity %s, %s', (university_id, months_back))
-        results = cursor.fetchall()
-        conn.close()
-        
-        activity = []
-        for row in results:
-            activity.append({
-                'month': row[0],
-                'Graded': int(row[1]) if row[1] else 0,
-                'Pending': int(row[2]) if row[2] else 0,
-            })
-        
-        return jsonify(activity)
+        conn = get_db()
+        return jsonify(_load_grading_activity(conn.cursor(), university_id, months_back))
     except Exception as e:
         print(f'Get tutor grading activity error: {e}')
         import traceback
@@ -381,24 +442,8 @@ def get_tutor_student_grade_components():
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('EXEC GetTutorStudentGradeComponents %s', (university_id,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        components = []
-        for row in results:
-            components.append({
-                'course_name': row[0],
-                'Course_ID': row[1],
-                'final_grade': float(row[2]) if row[2] else 0,
-                'midterm_grade': float(row[3]) if row[3] else 0,
-                'quiz_grade': float(row[4]) if row[4] else 0,
-                'assignment_grade': float(row[5]) if row[5] else 0,
-            })
-        
-        return jsonify(components)
+        conn = get_db()
+        return jsonify(_load_student_grade_components(conn.cursor(), university_id))
     except Exception as e:
         print(f'Get tutor student grade components error: {e}')
         import traceback
@@ -415,26 +460,8 @@ def get_tutor_average_student_gpa():
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('EXEC GetTutorAverageStudentGPA %s', (university_id,))
-        result = cursor.fetchone()
-        conn.close()
-        
-        if not result:
-            return jsonify({
-                'average_gpa': 0,
-                'total_students': 0,
-                'total_courses': 0,
-                'rank': 0,
-            })
-        
-        return jsonify({
-            'average_gpa': float(result[0]) if result[0] else 0,
-            'total_students': int(result[1]) if result[1] else 0,
-            'total_courses': int(result[2]) if result[2] else 0,
-            'rank': int(result[3]) if result[3] else 0,
-        })
+        conn = get_db()
+        return jsonify(_load_average_student_gpa(conn.cursor(), university_id))
     except Exception as e:
         print(f'Get tutor average student GPA error: {e}')
         import traceback
@@ -449,31 +476,57 @@ def get_top_tutors_by_student_gpa():
     try:
         top_n = request.args.get('top_n', type=int, default=5)
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('EXEC GetTopTutorsByStudentGPA %s', (top_n,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        tutors = []
-        for row in results:
-            tutors.append({
-                'rank': int(row[0]),
-                'first_name': row[1],
-                'last_name': row[2],
-                'course': int(row[3]) if row[3] else 0,
-                'hour': int(row[4]) if row[4] else 0,
-                'point': float(row[5]) if row[5] else 0,
-                'trend': row[6],
-            })
-        
-        return jsonify(tutors)
+        # Same for every tutor, so it is served from the shared ranking cache
+        return jsonify(get_ranked_cache().top('top-tutors-by-student-gpa', top_n, _load_top_tutors))
     except Exception as e:
         print(f'Get top tutors by student GPA error: {e}')
         import traceback
         traceback.print_exc()
         return jsonify({'success': False, 'error': f'Failed to get top tutors: {str(e)}'}), 500
 
+@tutors_bp.route('/dashboard', methods=['GET'])
+@require_auth
+@require_role(['tutor'])
+def get_tutor_dashboard():
+    """
+    Get every tutor dashboard widget in one request
+    
+    Query params: university_id, months_back, top_n (as for the individual
+    endpoints) and optional sections=statistics,courses,... to load only some
+    widgets. A failing or timed out widget is returned as null and listed in
+    errors; the rest of the page still loads. Widgets run on this request's
+    own threads and share the process-wide cap on dashboard connections
+    (utils.dashboard), so a slow student dashboard cannot stall this one.
+    """
+    try:
+        university_id = request.args.get('university_id', type=int)
+        if not university_id:
+            return jsonify({'success': False, 'error': 'university_id is required'}), 400
+        months_back = request.args.get('months_back', type=int, default=5)
+        top_n = request.args.get('top_n', type=int, default=5)
+        
+        loaders = {
+            'statistics': lambda cursor: _load_dashboard_statistics(cursor, university_id),
+            'courses': lambda cursor: _load_courses(cursor, university_id),
+            'grading_activity': lambda cursor: _load_grading_activity(cursor, university_id, months_back),
+            'student_grade_components': lambda cursor: _load_student_grade_components(cursor, university_id),
+            'average_student_gpa': lambda cursor: _load_average_student_gpa(cursor, university_id),
+            'top_tutors': lambda cursor: get_ranked_cache().top('top-tutors-by-student-gpa', top_n, _load_top_tutors, cursor),
+        }
+        
+        try:
+            loaders = select_sections(loaders, request.args.get('sections'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        sections, errors = gather_sections(loaders)
+        return jsonify({'sections': sections, 'errors': errors})
+    except Exception as e:
+        print(f'Get tutor dashboard error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to get dashboard: {str(e)}'}), 500
+
 # ==================== TUTOR QUIZ CRUD ====================
 
 @tutors_bp.route('/quizzes', methods=['POST'])
@@ -487,7 +540,7 @@ def create_tutor_quiz():
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Convert Questions array to JSON string if provided
@@ -547,7 +600,6 @@ def create_tutor_quiz():
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -588,7 +640,7 @@ def update_tutor_quiz(quiz_id):
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Convert Questions to JSON string if provided
@@ -657,7 +709,6 @@ def update_tutor_quiz(quiz_id):
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -697,11 +748,10 @@ def delete_tutor_quiz(quiz_id):
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC DeleteTutorQuiz %s, %s', (university_id, quiz_id))
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -726,7 +776,7 @@ def create_tutor_assignment():
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Parse submission_deadline if provided
@@ -757,7 +807,6 @@ def create_tutor_assignment():
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -792,7 +841,7 @@ def update_tutor_assignment(assignment_id):
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Parse submission_deadline if provided
@@ -824,7 +873,6 @@ def update_tutor_assignment(assignment_id):
 
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -858,11 +906,10 @@ def delete_tutor_assignment(assignment_id):
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('EXEC DeleteTutorAssignment %s, %s', (university_id, assignment_id))
         conn.commit()
-        conn.close()
 
         return jsonify({
             'success': True,
@@ -884,7 +931,7 @@ def get_tutor_quiz_answers(quiz_id):
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         # Verify tutor teaches the section of this quiz
@@ -898,12 +945,10 @@ def get_tutor_quiz_answers(quiz_id):
         """, (quiz_id, university_id))
         
         if not cursor.fetchone():
-            conn.close()
             return jsonify({'success': False, 'error': 'Tutor does not teach this section or quiz not found'}), 403
         
         cursor.execute('EXEC GetQuizAnswersByQuizID %s', (quiz_id,))
         answers = cursor.fetchall()
-        conn.close()
         
         result = []
         for answer in answers:
@@ -939,7 +984,7 @@ def get_tutor_assignment_submissions(assignment_id):
         if not university_id:
             return jsonify({'success': False, 'error': 'university_id is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         # Verify tutor teaches the course/semester of this assignment
@@ -952,12 +997,10 @@ def get_tutor_assignment_submissions(assignment_id):
         """, (assignment_id, university_id))
         
         if not cursor.fetchone():
-            conn.close()
             return jsonify({'success': False, 'error': 'Tutor does not teach this course/semester or assignment not found'}), 403
         
         cursor.execute('EXEC GetAssignmentSubmissionsByAssignmentID %s', (assignment_id,))
         submissions = cursor.fetchall()
-        conn.close()
 
         result = []
         for submission in submissions:
@@ -991,6 +1034,118 @@ def get_tutor_assignment_submissions(assignment_id):
         traceback.print_exc()
         return jsonify({'success': False, 'error': f'Failed to fetch assignment submissions: {str(e)}'}), 500
 
+def _apply_bulk_updates(conn, sql, results, pending, to_dict, result_key, not_found, atomic):
+    """
+    Run validated rows of a bulk update through execute_batched and commit
+    
+    results holds one entry per request row (validation failures already
+    filled in); pending is a list of (index, entry, params) for the rest.
+    
+    Returns:
+        (payload, status_code)
+    """
+    if pending:
+        try:
+            batch = execute_batched(conn, sql, [params for _, _, params in pending])
+        except BatchAborted as e:
+            index = pending[e.index][0]
+            return {
+                'success': False,
+                'error': f'Update near index {index} aborted the transaction; nothing was saved: {e.error}',
+                'index': index,
+            }, 409
+        for (index, entry, _), outcome in zip(pending, batch):
+            if not outcome.ok:
+                entry.update({'success': False, 'error': outcome.error})
+            elif not outcome.row:
+                entry.update({'success': False, 'error': not_found})
+            else:
+                entry.update({'success': True, result_key: to_dict(outcome.row)})
+            results[index] = entry
+    
+    failed = sum(1 for entry in results if not entry['success'])
+    if atomic and failed:
+        conn.rollback()
+        return {
+            'success': False,
+            'error': f'{failed} of {len(results)} updates failed; nothing was saved',
+            'results': results,
+        }, 409
+    
+    conn.commit()
+    if failed < len(results):
+        invalidate_rankings()
+    
+    return {
+        'success': failed == 0,
+        'updated': len(results) - failed,
+        'failed': failed,
+        'results': results,
+    }, 200
+
+def _parse_score(value, max_score=None):
+    """Validate a score from a request body; raises ValueError with a client-facing message"""
+    if value is None or isinstance(value, bool):
+        raise ValueError('score is required')
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        raise ValueError('score must be a number')
+    if score != score or score < 0:
+        raise ValueError('score must be a non-negative number')
+    if max_score is not None and score > float(max_score):
+        raise ValueError(f'score must not exceed {float(max_score):g}')
+    return score
+
+def _score_summary(results, result_key):
+    """Count and score statistics over the successfully scored rows"""
+    scores = [entry[result_key]['score'] for entry in results
+              if entry['success'] and entry[result_key].get('score') is not None]
+    return {
+        'scored': len(scores),
+        'average_score': round(sum(scores) / len(scores), 2) if scores else None,
+        'min_score': min(scores) if scores else None,
+        'max_score': max(scores) if scores else None,
+    }
+
+def _quiz_answer_to_dict(result):
+    return {
+        'University_ID': result[0],
+        'First_Name': result[1],
+        'Last_Name': result[2],
+        'QuizID': result[3],
+        'Assessment_ID': result[4],
+        'Responses': result[5],
+        'completion_status': result[6],
+        'score': float(result[7]) if result[7] is not None else None,
+        'Quiz_Content': result[8],
+        'pass_score': float(result[9]) if result[9] is not None else None,
+        'Start_Date': str(result[10]) if result[10] else None,
+        'End_Date': str(result[11]) if result[11] else None,
+    }
+
+def _assignment_submission_to_dict(result):
+    return {
+        'University_ID': result[0],
+        'First_Name': result[1],
+        'Last_Name': result[2],
+        'AssignmentID': result[3],
+        'Assessment_ID': result[4],
+        'score': float(result[5]) if result[5] is not None else None,
+        'accepted_specification': result[6],
+        'late_flag_indicator': bool(result[7]) if result[7] is not None else None,
+        'SubmitDate': str(result[8]) if result[8] else None,
+        'attached_files': result[9],
+        'status': result[10],
+        'Comments': result[11],
+        'Assignment_Instructions': result[12],
+        'MaxScore': float(result[13]) if result[13] is not None else None,
+        'submission_deadline': str(result[14]) if result[14] else None,
+    }
+
+UPDATE_QUIZ_ANSWER_SCORE_SQL = 'EXEC UpdateTutorQuizAnswerScore %s, %s, %s, %s'
+UPDATE_SUBMISSION_SCORE_SQL = 'EXEC UpdateTutorAssignmentSubmissionScore %s, %s, %s, %s, %s'
+
 @tutors_bp.route('/quizzes/<int:quiz_id>/answers/<int:student_id>', methods=['PUT'])
 @require_auth
 @require_role(['tutor'])
@@ -1007,13 +1162,13 @@ def update_tutor_quiz_answer_score(quiz_id, student_id):
         if score is None:
             return jsonify({'success': False, 'error': 'score is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
-        cursor.execute('EXEC UpdateTutorQuizAnswerScore %s, %s, %s, %s', 
+        cursor.execute(UPDATE_QUIZ_ANSWER_SCORE_SQL, 
                       (university_id, quiz_id, student_id, score))
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
+        invalidate_rankings()
         
         if not result:
             return jsonify({'success': False, 'error': 'Quiz answer not found'}), 404
@@ -1021,20 +1176,7 @@ def update_tutor_quiz_answer_score(quiz_id, student_id):
         return jsonify({
             'success': True,
             'message': 'Quiz score updated successfully',
-            'quiz_answer': {
-                'University_ID': result[0],
-                'First_Name': result[1],
-                'Last_Name': result[2],
-                'QuizID': result[3],
-                'Assessment_ID': result[4],
-                'Responses': result[5],
-                'completion_status': result[6],
-                'score': float(result[7]) if result[7] else None,
-                'Quiz_Content': result[8],
-                'pass_score': float(result[9]) if result[9] else None,
-                'Start_Date': str(result[10]) if result[10] else None,
-                'End_Date': str(result[11]) if result[11] else None,
-            }
+            'quiz_answer': _quiz_answer_to_dict(result)
         }), 200
     except Exception as e:
         print(f'Update tutor quiz answer score error: {e}')
@@ -1059,13 +1201,13 @@ def update_tutor_assignment_submission_score(assignment_id, student_id):
         if score is None:
             return jsonify({'success': False, 'error': 'score is required'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
-        cursor.execute('EXEC UpdateTutorAssignmentSubmissionScore %s, %s, %s, %s, %s', 
+        cursor.execute(UPDATE_SUBMISSION_SCORE_SQL, 
                       (university_id, assignment_id, student_id, score, comments))
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
+        invalidate_rankings()
         
         if not result:
             return jsonify({'success': False, 'error': 'Assignment submission not found'}), 404
@@ -1073,23 +1215,7 @@ def update_tutor_assignment_submission_score(assignment_id, student_id):
         return jsonify({
             'success': True,
             'message': 'Assignment score updated successfully',
-            'assignment_submission': {
-                'University_ID': result[0],
-                'First_Name': result[1],
-                'Last_Name': result[2],
-                'AssignmentID': result[3],
-                'Assessment_ID': result[4],
-                'score': float(result[5]) if result[5] else None,
-                'accepted_specification': result[6],
-                'late_flag_indicator': bool(result[7]) if result[7] is not None else None,
-                'SubmitDate': str(result[8]) if result[8] else None,
-                'attached_files': result[9],
-                'status': result[10],
-                'Comments': result[11],
-                'Assignment_Instructions': result[12],
-                'MaxScore': float(result[13]) if result[13] else None,
-                'submission_deadline': str(result[14]) if result[14] else None,
-            }
+            'assignment_submission': _assignment_submission_to_dict(result)
         }), 200
     except Exception as e:
         print(f'Update tutor assignment submission score error: {e}')
@@ -1097,6 +1223,262 @@ def update_tutor_assignment_submission_score(assignment_id, student_id):
         traceback.print_exc()
         return jsonify({'success': False, 'error': f'Failed to update assignment score: {str(e)}'}), 500
 
+@tutors_bp.route('/quizzes/<int:quiz_id>/answers', methods=['PUT'])
+@require_auth
+@require_role(['tutor'])
+def bulk_update_tutor_quiz_answer_scores(quiz_id):
+    """
+    Score many students' answers to one quiz in one transaction
+    
+    Body: {"scores": [{"University_ID": 2001, "score": 8}, ...], "atomic": false}
+    """
+    try:
+        university_id = request.args.get('university_id', type=int)
+        if not university_id:
+            return jsonify({'success': False, 'error': 'university_id is required'}), 400
+        
+        data = request.get_json() or {}
+        scores = data.get('scores')
+        try:
+            atomic = parse_flag(data.get('atomic'), 'atomic')
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if not isinstance(scores, list) or not scores:
+            return jsonify({'success': False, 'error': 'scores must be a non-empty array'}), 400
+        if len(scores) > BATCH_MAX_ROWS:
+            return jsonify({'success': False, 'error': f'At most {BATCH_MAX_ROWS} scores per request'}), 400
+        
+        conn = get_db()
+        cursor = conn.cursor()
+        
+        # Verify tutor teaches the section of this quiz once instead of per row
+        cursor.execute("""
+            SELECT 1 FROM [Quiz_Questions] qq
+            INNER JOIN [Teaches] t ON qq.Section_ID = t.Section_ID
+                AND qq.Course_ID = t.Course_ID
+                AND qq.Semester = t.Semester
+            WHERE qq.QuizID = %s
+              AND t.University_ID = %s
+        """, (quiz_id, university_id))
+        
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'error': 'Tutor does not teach this section or quiz not found'}), 403
+        
+        results, pending, seen = [None] * len(scores), [], set()
+        for index, item in enumerate(scores):
+            student_id = item.get('University_ID') if isinstance(item, dict) else None
+            entry = {'index': index, 'University_ID': student_id}
+            try:
+                if not isinstance(student_id, int) or isinstance(student_id, bool):
+                    raise ValueError('University_ID must be an integer')
+                if student_id in seen:
+                    raise ValueError('Duplicate University_ID in request')
+                seen.add(student_id)
+                score = _parse_score(item.get('score'))
+            except ValueError as e:
+                entry.update({'success': False, 'error': str(e)})
+                results[index] = entry
+                continue
+            pending.append((index, entry, (university_id, quiz_id, student_id, score)))
+        
+        payload, status = _apply_bulk_updates(conn, UPDATE_QUIZ_ANSWER_SCORE_SQL, results, pending,
+                                              _quiz_answer_to_dict, 'quiz_answer', 'Quiz answer not found', atomic)
+        if status == 200:
+            summary = _score_summary(results, 'quiz_answer')
+            summary['passed'] = sum(1 for entry in results if entry['success']
+                                    and entry['quiz_answer']['score'] is not None
+                                    and entry['quiz_answer']['pass_score'] is not None
+                                    and entry['quiz_answer']['score'] >= entry['quiz_answer']['pass_score'])
+            payload['summary'] = summary
+        return jsonify(payload), status
+    except Exception as e:
+        print(f'Bulk update tutor quiz answer scores error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to update quiz scores: {str(e)}'}), 500
+
+@tutors_bp.route('/quizzes/<int:quiz_id>/auto-grade', methods=['POST'])
+@require_auth
+@require_role(['tutor'])
+def auto_grade_tutor_quiz(quiz_id):
+    """
+    Grade every submitted answer of a quiz against its answer key
+    
+    Body (optional): {"dry_run": false, "only_ungraded": false, "atomic": false}
+    Scores are on a 0-QUIZ_SCORE_SCALE scale with partial credit for
+    multiple-answer questions; with dry_run the scores are returned but not saved.
+    """
+    try:
+        university_id = request.args.get('university_id', type=int)
+        if not university_id:
+            return jsonify({'success': False, 'error': 'university_id is required'}), 400
+        
+        data = request.get_json(silent=True) or {}
+        try:
+            dry_run = parse_flag(data.get('dry_run'), 'dry_run')
+            only_ungraded = parse_flag(data.get('only_ungraded'), 'only_ungraded')
+            atomic = parse_flag(data.get('atomic'), 'atomic')
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        conn = get_db()
+        cursor = conn.cursor()
+        
+        # Verify tutor teaches the section of this quiz and load its answer key
+        cursor.execute("""
+            SELECT TOP 1 qq.Questions, qq.Correct_answer FROM [Quiz_Questions] qq
+            INNER JOIN [Teaches] t ON qq.Section_ID = t.Section_ID
+                AND qq.Course_ID = t.Course_ID
+                AND qq.Semester = t.Semester
+            WHERE qq.QuizID = %s
+              AND t.University_ID = %s
+        """, (quiz_id, university_id))
+        
+        definition = cursor.fetchone()
+        if not definition:
+            return jsonify({'success': False, 'error': 'Tutor does not teach this section or quiz not found'}), 403
+        
+        try:
+            key = parse_answer_key(definition[0], definition[1])
+        except AnswerKeyError as e:
+            return jsonify({'success': False, 'error': f'Cannot auto-grade quiz: {str(e)}'}), 422
+        
+        cursor.execute('EXEC GetQuizAnswersByQuizID %s', (quiz_id,))
+        answers = [answer for answer in cursor.fetchall()
+                   if answer[5] and not (only_ungraded and answer[7] is not None)]
+        
+        start_time = time.process_time()
+        grades = grade_all(key, [answer[5] for answer in answers])
+        cpu_ms = round((time.process_time() - start_time) * 1000, 2)
+        
+        results, pending = [None] * len(answers), []
+        for index, (answer, grade) in enumerate(zip(answers, grades)):
+            entry = {
+                'index': index,
+                'University_ID': int(answer[0]),
+                'score': grade.score,
+                'correct': grade.correct_count,
+                'answered': grade.answered,
+                'questions': len(key.correct),
+            }
+            if dry_run:
+                entry['success'] = True
+                results[index] = entry
+            else:
+                pending.append((index, entry, (university_id, quiz_id, int(answer[0]), grade.score)))
+        
+        if dry_run:
+            payload, status = {'success': True, 'updated': 0, 'failed': 0, 'results': results}, 200
+        else:
+            payload, status = _apply_bulk_updates(conn, UPDATE_QUIZ_ANSWER_SCORE_SQL, results, pending,
+                                                  _quiz_answer_to_dict, 'quiz_answer', 'Quiz answer not found', atomic)
+        if status == 200:
+            scores = [grade.score for grade in grades]
+            payload['summary'] = {
+                'graded': len(grades),
+                'questions': len(key.correct),
+                'average_score': round(sum(scores) / len(scores), 2) if scores else None,
+                'min_score': min(scores) if scores else None,
+                'max_score': max(scores) if scores else None,
+                'cpu_ms': cpu_ms,
+                'dry_run': dry_run,
+            }
+        return jsonify(payload), status
+    except Exception as e:
+        print(f'Auto-grade tutor quiz error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to auto-grade quiz: {str(e)}'}), 500
+
+@tutors_bp.route('/assignments/<int:assignment_id>/submissions', methods=['PUT'])
+@require_auth
+@require_role(['tutor'])
+def bulk_update_tutor_assignment_submission_scores(assignment_id):
+    """
+    Score many submissions of one assignment in one transaction
+    
+    Body: {"scores": [{"University_ID": 2001, "score": 8, "comments": "..."}, ...], "atomic": false}
+    Scores above the assignment's MaxScore are rejected before anything is written.
+    """
+    try:
+        university_id = request.args.get('university_id', type=int)
+        if not university_id:
+            return jsonify({'success': False, 'error': 'university_id is required'}), 400
+        
+        data = request.get_json() or {}
+        scores = data.get('scores')
+        try:
+            atomic = parse_flag(data.get('atomic'), 'atomic')
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if not isinstance(scores, list) or not scores:
+            return jsonify({'success': False, 'error': 'scores must be a non-empty array'}), 400
+        if len(scores) > BATCH_MAX_ROWS:
+            return jsonify({'success': False, 'error': f'At most {BATCH_MAX_ROWS} scores per request'}), 400
+        
+        conn = get_db()
+        cursor = conn.cursor()
+        
+        # Verify tutor teaches the course/semester once and read the score limit
+        cursor.execute("""
+            SELECT TOP 1 ad.MaxScore FROM [Assignment_Definition] ad
+            INNER JOIN [Teaches] t ON ad.Course_ID = t.Course_ID
+                AND ad.Semester = t.Semester
+            WHERE ad.AssignmentID = %s
+              AND t.University_ID = %s
+        """, (assignment_id, university_id))
+        
+        assignment = cursor.fetchone()
+        if not assignment:
+            return jsonify({'success': False, 'error': 'Tutor does not teach this course/semester or assignment not found'}), 403
+        max_score = assignment[0]
+        
+        results, pending, seen = [None] * len(scores), [], set()
+        for index, item in enumerate(scores):
+            student_id = item.get('University_ID') if isinstance(item, dict) else None
+            entry = {'index': index, 'University_ID': student_id}
+            try:
+                if not isinstance(student_id, int) or isinstance(student_id, bool):
+                    raise ValueError('University_ID must be an integer')
+                if student_id in seen:
+                    raise ValueError('Duplicate University_ID in request')
+                seen.add(student_id)
+                score = _parse_score(item.get('score'), max_score)
+            except ValueError as e:
+                entry.update({'success': False, 'error': str(e)})
+                results[index] = entry
+                continue
+            pending.append((index, entry, (university_id, assignment_id, student_id, score, item.get('comments'))))
+        
+        payload, status = _apply_bulk_updates(conn, UPDATE_SUBMISSION_SCORE_SQL, results, pending,
+                                              _assignment_submission_to_dict, 'assignment_submission',
+                                              'Assignment submission not found', atomic)
+        if status == 200:
+            payload['summary'] = _score_summary(results, 'assignment_submission')
+        return jsonify(payload), status
+    except Exception as e:
+        print(f'Bulk update tutor assignment submission scores error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to update assignment scores: {str(e)}'}), 500
+
+UPDATE_ASSESSMENT_GRADES_SQL = 'EXEC UpdateTutorAssessmentGrades %s, %s, %s, %s, %s, %s'
+GRADE_FIELDS = ('Quiz_Grade', 'Assignment_Grade', 'Midterm_Grade', 'Final_Grade')
+
+def _assessment_grades_to_dict(result):
+    return {
+        'Assessment_ID': result[0],
+        'University_ID': result[1],
+        'Section_ID': result[2],
+        'Course_ID': result[3],
+        'Semester': result[4],
+        'Quiz_Grade': float(result[5]) if result[5] is not None else None,
+        'Assignment_Grade': float(result[6]) if result[6] is not None else None,
+        'Midterm_Grade': float(result[7]) if result[7] is not None else None,
+        'Final_Grade': float(result[8]) if result[8] is not None else None,
+        'Status': result[9],
+    }
+
 @tutors_bp.route('/assessments/<int:assessment_id>', methods=['PUT'])
 @require_auth
 @require_role(['tutor'])
@@ -1109,9 +1491,9 @@ def update_tutor_assessment_grades(assessment_id):
         
         data = request.get_json()
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
-        cursor.execute('EXEC UpdateTutorAssessmentGrades %s, %s, %s, %s, %s, %s', 
+        cursor.execute(UPDATE_ASSESSMENT_GRADES_SQL, 
                       (university_id, assessment_id,
                        data.get('Quiz_Grade'),
                        data.get('Assignment_Grade'),
@@ -1119,7 +1501,7 @@ def update_tutor_assessment_grades(assessment_id):
                        data.get('Final_Grade')))
         result = cursor.fetchone()
         conn.commit()
-        conn.close()
+        invalidate_rankings()
         
         if not result:
             return jsonify({'success': False, 'error': 'Assessment not found'}), 404
@@ -1127,18 +1509,7 @@ def update_tutor_assessment_grades(assessment_id):
         return jsonify({
             'success': True,
             'message': 'Assessment grades updated successfully',
-            'assessment': {
-                'Assessment_ID': result[0],
-                'University_ID': result[1],
-                'Section_ID': result[2],
-                'Course_ID': result[3],
-                'Semester': result[4],
-                'Quiz_Grade': float(result[5]) if result[5] else None,
-                'Assignment_Grade': float(result[6]) if result[6] else None,
-                'Midterm_Grade': float(result[7]) if result[7] else None,
-                'Final_Grade': float(result[8]) if result[8] else None,
-                'Status': result[9],
-            }
+            'assessment': _assessment_grades_to_dict(result)
         }), 200
     except Exception as e:
         print(f'Update tutor assessment grades error: {e}')
@@ -1146,3 +1517,50 @@ def update_tutor_assessment_grades(assessment_id):
         traceback.print_exc()
         return jsonify({'success': False, 'error': f'Failed to update assessment grades: {str(e)}'}), 500
 
+@tutors_bp.route('/assessments/bulk', methods=['PUT'])
+@require_auth
+@require_role(['tutor'])
+def bulk_update_tutor_assessment_grades():
+    """
+    Update grades for many assessments in one transaction
+    
+    Body: {"grades": [{"Assessment_ID": 1, "Quiz_Grade": 8.5, ...}, ...], "atomic": false}
+    Every row gets its own result. With atomic=true any failed row rolls back
+    the whole request (409); otherwise the rows that succeeded are committed.
+    """
+    try:
+        university_id = request.args.get('university_id', type=int)
+        if not university_id:
+            return jsonify({'success': False, 'error': 'university_id is required'}), 400
+        
+        data = request.get_json() or {}
+        grades = data.get('grades')
+        try:
+            atomic = parse_flag(data.get('atomic'), 'atomic')
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if not isinstance(grades, list) or not grades:
+            return jsonify({'success': False, 'error': 'grades must be a non-empty array'}), 400
+        if len(grades) > BATCH_MAX_ROWS:
+            return jsonify({'success': False, 'error': f'At most {BATCH_MAX_ROWS} grades per request'}), 400
+        
+        results, pending = [None] * len(grades), []
+        for index, item in enumerate(grades):
+            assessment_id = item.get('Assessment_ID') if isinstance(item, dict) else None
+            entry = {'index': index, 'Assessment_ID': assessment_id}
+            if not isinstance(assessment_id, int) or isinstance(assessment_id, bool):
+                entry.update({'success': False, 'error': 'Assessment_ID must be an integer'})
+                results[index] = entry
+                continue
+            params = (university_id, assessment_id) + tuple(item.get(field) for field in GRADE_FIELDS)
+            pending.append((index, entry, params))
+        
+        payload, status = _apply_bulk_updates(get_db(), UPDATE_ASSESSMENT_GRADES_SQL, results, pending,
+                                              _assessment_grades_to_dict, 'assessment', 'Assessment not found', atomic)
+        return jsonify(payload), status
+    except Exception as e:
+        print(f'Bulk update tutor assessment grades error: {e}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to update assessment grades: {str(e)}'}), 500
+
@@ -1,45 +1,102 @@
 from flask import Blueprint, request, jsonify
-from config.database import get_db_connection
+from config.database import get_db
 
 users_bp = Blueprint('users', __name__)
 
-def get_user_role(cursor, university_id):
-    """Helper function to determine user role"""
-    cursor.execute('SELECT * FROM [Admin] WHERE University_ID = ?', university_id)
-    if cursor.fetchone():
-        return 'admin'
-
-    cursor.execute('SELECT * FROM [Tutor] WHERE University_ID = ?', university_id)
-    if cursor.fetchone():
-        return 'tutor'
-
-    return 'student'
+# Role for a user row aliased as u; admin takes precedence over tutor
+USER_ROLE_SQL = """
+    CASE
+        WHEN ad.University_ID IS NOT NULL THEN 'admin'
+        WHEN t.University_ID IS NOT NULL THEN 'tutor'
+        ELSE 'student'
+    END
+"""
+
+USER_SELECT_SQL = f"""
+    SELECT u.University_ID, u.First_Name, u.Last_Name, u.Email,
+           u.Phone_Number, u.[Address], u.National_ID,
+           {USER_ROLE_SQL} as Role
+    FROM [Users] u
+    LEFT JOIN [Admin] ad ON ad.University_ID = u.University_ID
+    LEFT JOIN [Tutor] t ON t.University_ID = u.University_ID
+"""
+
+MAX_PAGE_SIZE = 1000
+
+def get_page_params():
+    """
+    Read after_id and limit from the query string; absent values are None
+
+    Raises:
+        ValueError: a value is present but not an integer, or limit is out of range
+    """
+    values = {}
+    for name in ('after_id', 'limit'):
+        text = request.args.get(name)
+        try:
+            values[name] = int(text) if text is not None else None
+        except ValueError:
+            raise ValueError(f'{name} must be an integer')
+    limit = values['limit']
+    if limit is not None and (limit < 1 or limit > MAX_PAGE_SIZE):
+        raise ValueError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+    return values['after_id'], limit
+
+def user_to_dict(user, role=None):
+    """Convert a (University_ID, First_Name, ..., National_ID[, Role]) row to a dict"""
+    return {
+        'University_ID': user[0],
+        'First_Name': user[1],
+        'Last_Name': user[2],
+        'Email': user[3],
+        'Phone_Number': user[4],
+        'Address': user[5],
+        'National_ID': user[6],
+        'role': role if role is not None else user[7],
+    }
+
+def get_user_row(cursor, university_id):
+    """Fetch a single user together with its role"""
+    cursor.execute(USER_SELECT_SQL + ' WHERE u.University_ID = %s', (university_id,))
+    return cursor.fetchone()
 
 @users_bp.route('/', methods=['GET'])
 def get_users():
+    """List users with their roles; supports keyset pagination via after_id and limit"""
     try:
-        conn = get_db_connection()
+        try:
+            after_id, limit = get_page_params()
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        conn = get_db()
         cursor = conn.cursor()
 
-        cursor.execute('SELECT * FROM [Users] ORDER BY University_ID')
+        query = USER_SELECT_SQL
+        params = []
+        if after_id is not None:
+            query += ' WHERE u.University_ID > %s'
+            params.append(after_id)
+        query += ' ORDER BY u.University_ID'
+        if limit is not None:
+            # Fetch one extra row to know whether another page exists
+            query += ' OFFSET 0 ROWS FETCH NEXT %s ROWS ONLY'
+            params.append(limit + 1)
+
+        cursor.execute(query, tuple(params))
         users = cursor.fetchall()
 
-        result = []
-        for user in users:
-            role = get_user_role(cursor, user.University_ID)
-            result.append({
-                'University_ID': user.University_ID,
-                'First_Name': user.First_Name,
-                'Last_Name': user.Last_Name,
-                'Email': user.Email,
-                'Phone_Number': user.Phone_Number,
-                'Address': user.Address,
-                'National_ID': user.National_ID,
-                'role': role,
-            })
-
-        conn.close()
-        return jsonify(result)
+        has_more = limit is not None and len(users) > limit
+        if has_more:
+            users = users[:limit]
+
+        response = jsonify([user_to_dict(user) for user in users])
+        if has_more:
+            response.headers['X-Next-After-Id'] = str(users[-1][0])
+        return response
 
     except Exception as e:
         print(f'Get users error: {e}')
@@ -51,32 +108,18 @@ def get_users():
 @users_bp.route('/<int:id>', methods=['GET'])
 def get_user(id):
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
-        cursor.execute('SELECT * FROM [Users] WHERE University_ID = ?', id)
-        user = cursor.fetchone()
+        user = get_user_row(cursor, id)
 
         if not user:
-            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'User not found'
             }), 404
 
-        role = get_user_role(cursor, id)
-        conn.close()
-
-        return jsonify({
-            'University_ID': user.University_ID,
-            'First_Name': user.First_Name,
-            'Last_Name': user.Last_Name,
-            'Email': user.Email,
-            'Phone_Number': user.Phone_Number,
-            'Address': user.Address,
-            'National_ID': user.National_ID,
-            'role': role,
-        })
+        return jsonify(user_to_dict(user))
 
     except Exception as e:
         print(f'Get user error: {e}')
@@ -87,50 +130,66 @@ def get_user(id):
 
 @users_bp.route('/role/<string:role>', methods=['GET'])
 def get_users_by_role(role):
+    """List users of one role; supports keyset pagination via after_id and limit"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
         if role == 'admin':
             query = """
-                SELECT u.* FROM [Users] u
+                SELECT u.University_ID, u.First_Name, u.Last_Name, u.Email,
+                       u.Phone_Number, u.[Address], u.National_ID
+                FROM [Users] u
                 INNER JOIN [Admin] a ON u.University_ID = a.University_ID
             """
         elif role == 'tutor':
             query = """
-                SELECT u.* FROM [Users] u
+                SELECT u.University_ID, u.First_Name, u.Last_Name, u.Email,
+                       u.Phone_Number, u.[Address], u.National_ID
+                FROM [Users] u
                 INNER JOIN [Tutor] t ON u.University_ID = t.University_ID
             """
         elif role == 'student':
             query = """
-                SELECT u.* FROM [Users] u
+                SELECT u.University_ID, u.First_Name, u.Last_Name, u.Email,
+                       u.Phone_Number, u.[Address], u.National_ID
+                FROM [Users] u
                 INNER JOIN [Student] s ON u.University_ID = s.University_ID
             """
         else:
-            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'Invalid role'
             }), 400
 
-        cursor.execute(query)
+        try:
+            after_id, limit = get_page_params()
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        conn = get_db()
+        cursor = conn.cursor()
+
+        params = []
+        if after_id is not None:
+            query += ' WHERE u.University_ID > %s'
+            params.append(after_id)
+        query += ' ORDER BY u.University_ID'
+        if limit is not None:
+            query += ' OFFSET 0 ROWS FETCH NEXT %s ROWS ONLY'
+            params.append(limit + 1)
+
+        cursor.execute(query, tuple(params))
         users = cursor.fetchall()
 
-        result = []
-        for user in users:
-            result.append({
-                'University_ID': user.University_ID,
-                'First_Name': user.First_Name,
-                'Last_Name': user.Last_Name,
-                'Email': user.Email,
-                'Phone_Number': user.Phone_Number,
-                'Address': user.Address,
-                'National_ID': user.National_ID,
-                'role': role,
-            })
-
-        conn.close()
-        return jsonify(result)
+        has_more = limit is not None and len(users) > limit
+        if has_more:
+            users = users[:limit]
+
+        response = jsonify([user_to_dict(user, role) for user in users])
+        if has_more:
+            response.headers['X-Next-After-Id'] = str(users[-1][0])
+        return response
 
     except Exception as e:
         print(f'Get users by role error: {e}')
@@ -143,13 +202,13 @@ def get_users_by_role(role):
 def create_user():
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute("""
             INSERT INTO [Users] (University_ID, First_Name, Last_Name, Email, Phone_Number, [Address], National_ID)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (
             data['University_ID'],
             data['First_Name'],
             data['Last_Name'],
@@ -157,15 +216,14 @@ def create_user():
             data['Phone_Number'],
             data['Address'],
             data['National_ID']
-        )
+        ))
 
         conn.commit()
-        role = get_user_role(cursor, data['University_ID'])
-        conn.close()
+        user = get_user_row(cursor, data['University_ID'])
 
         return jsonify({
             **data,
-            'role': role,
+            'role': user[7] if user else 'student',
         }), 201
 
     except Exception as e:
@@ -179,19 +237,19 @@ def create_user():
 def update_user(id):
     try:
         data = request.get_json()
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute("""
             UPDATE [Users]
-            SET First_Name = ?,
-                Last_Name = ?,
-                Email = ?,
-                Phone_Number = ?,
-                [Address] = ?,
-                National_ID = ?
-            WHERE University_ID = ?
-        """,
+            SET First_Name = %s,
+                Last_Name = %s,
+                Email = %s,
+                Phone_Number = %s,
+                [Address] = %s,
+                National_ID = %s
+            WHERE University_ID = %s
+        """, (
             data['First_Name'],
             data['Last_Name'],
             data['Email'],
@@ -199,26 +257,19 @@ def update_user(id):
             data['Address'],
             data['National_ID'],
             id
-        )
+        ))
 
         conn.commit()
 
-        cursor.execute('SELECT * FROM [Users] WHERE University_ID = ?', id)
-        user = cursor.fetchone()
+        user = get_user_row(cursor, id)
 
-        role = get_user_role(cursor, id)
-        conn.close()
+        if not user:
+            return jsonify({
+                'success': False,
+                'error': 'User not found'
+            }), 404
 
-        return jsonify({
-            'University_ID': user.University_ID,
-            'First_Name': user.First_Name,
-            'Last_Name': user.Last_Name,
-            'Email': user.Email,
-            'Phone_Number': user.Phone_Number,
-            'Address': user.Address,
-            'National_ID': user.National_ID,
-            'role': role,
-        })
+        return jsonify(user_to_dict(user))
 
     except Exception as e:
         print(f'Update user error: {e}')
@@ -230,12 +281,11 @@ def update_user(id):
 @users_bp.route('/<int:id>', methods=['DELETE'])
 def delete_user(id):
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
-        cursor.execute('DELETE FROM [Users] WHERE University_ID = ?', id)
+        cursor.execute('DELETE FROM [Users] WHERE University_ID = %s', (id,))
         conn.commit()
-        conn.close()
 
         return jsonify({'success': True, 'message': 'User deleted successfully'})
 
@@ -0,0 +1,151 @@
+"""
+Batched Statement Execution
+Runs one stored procedure for many parameter sets inside the caller's
+transaction, sending several EXECs per round trip and reporting results per row.
+
+pymssql has no table-valued parameter support, so rows are sent as
+multi-statement batches. pymssql substitutes parameters on the client, so
+batches are not limited by SQL Server's 2100-parameter cap.
+
+values_chunks() covers the set-based case: plain inserts that can be
+written as one INSERT ... SELECT over a VALUES list per chunk.
+"""
+import os
+from typing import Any, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', '50'))
+BATCH_MAX_ROWS = int(os.getenv('BATCH_MAX_ROWS', '2000'))
+# SQL Server accepts at most 1000 rows in one VALUES list
+VALUES_CHUNK_SIZE = min(int(os.getenv('VALUES_CHUNK_SIZE', '900')), 1000)
+BULK_INSERT_MAX_ROWS = int(os.getenv('BULK_INSERT_MAX_ROWS', '50000'))
+
+
+class BatchAborted(Exception):
+    """Raised when a failing row took the whole transaction down; nothing was applied"""
+
+    def __init__(self, index: int, error: str):
+        super().__init__(f'Row {index} aborted the transaction: {error}')
+        self.index = index
+        self.error = error
+
+
+class BatchResult(NamedTuple):
+    ok: bool
+    row: Optional[tuple]
+    error: Optional[str]
+
+
+class _Misaligned(Exception):
+    pass
+
+
+def _run_chunk(cursor, sql: str, chunk: Sequence[Sequence[Any]], returns_rows: bool = True) -> List[Optional[tuple]]:
+    """Execute a chunk as one batch and take the first row of each statement's result set"""
+    params = tuple(value for row_params in chunk for value in row_params)
+    cursor.execute(';\n'.join([sql] * len(chunk)), params)
+    if not returns_rows:
+        # Only the first statement's error is raised by execute; the driver
+        # reports later ones while stepping through the results, so read them all
+        while cursor.nextset():
+            pass
+        return [None] * len(chunk)
+    rows = [cursor.fetchone()]
+    for _ in range(len(chunk) - 1):
+        if not cursor.nextset():
+            raise _Misaligned()
+        rows.append(cursor.fetchone())
+    if cursor.nextset():
+        raise _Misaligned()
+    return rows
+
+
+def _rollback_to(conn, cursor, savepoint: str, index: int, error: Exception):
+    """Undo a failed statement, or the whole transaction if it can no longer be committed"""
+    try:
+        cursor.execute('SELECT @@TRANCOUNT, XACT_STATE()')
+        trancount, xact_state = cursor.fetchone()
+        if trancount > 0 and xact_state == 1:
+            cursor.execute(f'ROLLBACK TRANSACTION {savepoint}')
+            return
+    except Exception as e:
+        print(f'Batch savepoint rollback error: {e}')
+    conn.rollback()
+    raise BatchAborted(index, str(error))
+
+
+def execute_batched(conn, sql: str, params_list: Sequence[Sequence[Any]],
+                    chunk_size: Optional[int] = None, returns_rows: bool = True) -> List[BatchResult]:
+    """
+    Execute sql once per parameter tuple without committing
+
+    Each chunk runs as one batch. If a statement in it fails, or the result
+    sets cannot be matched to rows, the chunk is undone and retried row by
+    row so the failure is pinned to its row and the other rows still apply.
+    The caller commits or rolls back. Pass returns_rows=False for procedures
+    that produce no result set; their rows are then always None.
+
+    Usage:
+        results = execute_batched(conn, 'EXEC UpdateTutorAssessmentGrades %s, %s, %s, %s, %s, %s', params)
+        conn.commit()
+
+    Returns:
+        One BatchResult per parameter tuple, in order; row is the first row
+        the statement returned (None when it returned no rows)
+
+    Raises:
+        BatchAborted: a failure rolled back the whole transaction
+    """
+    chunk_size = chunk_size or BATCH_CHUNK_SIZE
+    cursor = conn.cursor()
+    results = []
+
+    for start in range(0, len(params_list), chunk_size):
+        chunk = params_list[start:start + chunk_size]
+        savepoint = f'batch_{start}'
+
+        if len(chunk) > 1:
+            cursor.execute(f'SAVE TRANSACTION {savepoint}')
+            try:
+                rows = _run_chunk(cursor, sql, chunk, returns_rows)
+                results.extend(BatchResult(True, row, None) for row in rows)
+                continue
+            except Exception as e:
+                _rollback_to(conn, cursor, savepoint, start, e)
+
+        for offset, params in enumerate(chunk):
+            cursor.execute(f'SAVE TRANSACTION {savepoint}')
+            try:
+                cursor.execute(sql, tuple(params))
+                row = cursor.fetchone() if returns_rows else None
+                while cursor.nextset():
+                    pass
+                results.append(BatchResult(True, row, None))
+            except Exception as e:
+                _rollback_to(conn, cursor, savepoint, start + offset, e)
+                results.append(BatchResult(False, None, str(e)))
+
+    return results
+
+
+def values_chunks(sql: str, rows: Sequence[Sequence[Any]],
+                  chunk_size: Optional[int] = None) -> Iterator[Tuple[str, tuple]]:
+    """
+    Split rows into set-based statements
+
+    sql contains a {values} marker that is replaced by one "(%s, ...)" group
+    per row of the chunk, so each chunk is a single INSERT ... VALUES instead
+    of one statement per row.
+
+    Usage:
+        for statement, params in values_chunks('INSERT INTO @v VALUES {values}; ...', rows):
+            cursor.execute(statement, params)
+
+    Yields:
+        (statement, flattened params) per chunk of at most chunk_size rows
+    """
+    chunk_size = min(chunk_size or VALUES_CHUNK_SIZE, 1000)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        group = '(' + ', '.join(['%s'] * len(chunk[0])) + ')'
+        params = tuple(value for row in chunk for value in row)
+        yield sql.replace('{values}', ',\n'.join([group] * len(chunk))), params
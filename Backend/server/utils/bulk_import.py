@@ -0,0 +1,214 @@
+"""
+Bulk Import Utilities
+Reads an uploaded CSV (or .xlsx when openpyxl is installed) row by row,
+validates each row against an ImportSpec, and inserts valid rows in batched
+transactions so memory stays bounded regardless of file size
+"""
+import os
+import io
+import csv
+import re
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from config.database import db_connection
+from utils.batch import execute_batched, BatchAborted
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Rows per transaction; each transaction is sent in BATCH_CHUNK_SIZE statements per round trip
+IMPORT_BATCH_ROWS = int(os.getenv('IMPORT_BATCH_ROWS', '500'))
+IMPORT_MAX_ERRORS = int(os.getenv('IMPORT_MAX_ERRORS', '1000'))
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+class ImportFormatError(ValueError):
+    """Raised when the upload cannot be read as a table at all"""
+    pass
+
+
+class Field(NamedTuple):
+    name: str
+    required: bool = False
+    parser: Optional[Callable[[str], Any]] = None
+    default: Any = None
+
+
+def parse_int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError('must be an integer')
+
+def parse_email(value: str) -> str:
+    if not EMAIL_PATTERN.match(value):
+        raise ValueError('is not a valid email address')
+    return value
+
+
+class ImportSpec:
+    """
+    Describes one importable entity
+
+    Args:
+        sql: statement executed once per row, with one %s per field
+        fields: columns in parameter order
+        key: field that must be unique within the file
+        prepare: optional hook turning the validated values into final params
+    """
+
+    def __init__(self, name: str, sql: str, fields: Sequence[Field], key: str,
+                 prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+        self.name = name
+        self.sql = sql
+        self.fields = list(fields)
+        self.key = key
+        self.prepare = prepare
+
+    def validate(self, raw: Dict[str, str]) -> Dict[str, Any]:
+        """Validate one row (header -> text); raises ValueError listing every problem"""
+        values, problems = {}, []
+        for field in self.fields:
+            text = (raw.get(field.name.lower()) or '').strip()
+            if not text:
+                if field.required:
+                    problems.append(f'{field.name} is required')
+                values[field.name] = field.default
+                continue
+            try:
+                values[field.name] = field.parser(text) if field.parser else text
+            except ValueError as e:
+                problems.append(f'{field.name} {e}')
+        if problems:
+            raise ValueError('; '.join(problems))
+        return values
+
+    def params(self, values: Dict[str, Any]) -> Tuple:
+        if self.prepare is not None:
+            values = self.prepare(values)
+        return tuple(values[field.name] for field in self.fields)
+
+
+def _normalize_header(header) -> List[str]:
+    return [str(name or '').strip().lower() for name in header]
+
+def iter_csv_rows(stream) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Yield (line_number, {header: value}) from a binary CSV stream"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if not header:
+            raise ImportFormatError('File is empty')
+        header = _normalize_header(header)
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            yield reader.line_num, dict(zip(header, row))
+    except UnicodeDecodeError:
+        raise ImportFormatError('CSV must be UTF-8 encoded')
+    finally:
+        text.detach()
+
+def iter_xlsx_rows(stream) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Yield (row_number, {header: value}) from the first sheet of an .xlsx stream"""
+    if openpyxl is None:
+        raise ImportFormatError('Excel import requires openpyxl; upload a CSV file instead')
+    try:
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise ImportFormatError(f'Cannot read Excel file: {e}')
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            raise ImportFormatError('File is empty')
+        header = _normalize_header(header)
+        for number, row in enumerate(rows, start=2):
+            cells = ['' if cell is None else str(cell) for cell in row]
+            if not any(cell.strip() for cell in cells):
+                continue
+            yield number, dict(zip(header, cells))
+    finally:
+        workbook.close()
+
+def iter_upload_rows(stream, filename: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    if filename.lower().endswith(('.xlsx', '.xlsm')):
+        return iter_xlsx_rows(stream)
+    return iter_csv_rows(stream)
+
+
+def run_import(spec: ImportSpec, rows: Iterator[Tuple[int, Dict[str, str]]],
+               progress: Optional[Callable[..., None]] = None,
+               batch_rows: int = IMPORT_BATCH_ROWS) -> Dict[str, Any]:
+    """
+    Validate and insert rows, committing every batch_rows valid rows
+
+    A failing row is reported and skipped; rows already committed stay
+    committed. Only the current batch and the error list (capped at
+    IMPORT_MAX_ERRORS) are held in memory.
+
+    Raises:
+        ImportFormatError: the file could not be read before any row
+
+    Returns:
+        Summary with processed/inserted/failed counts and per-row errors
+    """
+    summary = {'processed': 0, 'inserted': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+    seen_keys = set()
+    batch = []
+
+    def record_error(line, key, error):
+        summary['failed'] += 1
+        if len(summary['errors']) < IMPORT_MAX_ERRORS:
+            summary['errors'].append({'row': line, spec.key: key, 'error': error})
+        else:
+            summary['errors_truncated'] = True
+
+    def flush():
+        if not batch:
+            return
+        with db_connection() as conn:
+            try:
+                outcomes = execute_batched(conn, spec.sql, [params for _, _, params in batch])
+            except BatchAborted as e:
+                # The whole batch was rolled back; report every row in it
+                for line, key, _ in batch:
+                    record_error(line, key, f'Batch rolled back: {e.error}')
+                outcomes = None
+            if outcomes is not None:
+                conn.commit()
+                for (line, key, _), outcome in zip(batch, outcomes):
+                    if outcome.ok:
+                        summary['inserted'] += 1
+                    else:
+                        record_error(line, key, outcome.error)
+        batch.clear()
+        if progress is not None:
+            progress(processed=summary['processed'], inserted=summary['inserted'], failed=summary['failed'])
+
+    try:
+        for line, raw in rows:
+            summary['processed'] += 1
+            key = (raw.get(spec.key.lower()) or '').strip() or None
+            try:
+                values = spec.validate(raw)
+                key = values[spec.key]
+                if key in seen_keys:
+                    raise ValueError(f'Duplicate {spec.key} in file')
+                seen_keys.add(key)
+                batch.append((line, key, spec.params(values)))
+            except ValueError as e:
+                record_error(line, key, str(e))
+            if len(batch) >= batch_rows:
+                flush()
+    except ImportFormatError as e:
+        if not summary['processed']:
+            raise
+        # The file broke part-way through; keep what was read before that
+        summary['aborted'] = str(e)
+    flush()
+    return summary
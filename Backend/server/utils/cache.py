@@ -0,0 +1,272 @@
+"""
+Aggregate Caching Utilities
+Serves expensive statistics from memory with stale-while-revalidate semantics.
+Writes bump per-topic generation counters, which mark dependent entries stale.
+
+Generations of SHARED_TOPICS live in shared memory created at import; with
+gunicorn's preload_app every worker is forked after that, so a bump in one
+worker is seen by all of them. Other topics are counted per process.
+"""
+import os
+import time
+import threading
+import multiprocessing
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from flask import request, jsonify, current_app
+
+from config.database import db_connection
+
+STATS_CACHE_TTL = float(os.getenv('STATS_CACHE_TTL', '60'))
+STATS_CACHE_MAX_STALE = float(os.getenv('STATS_CACHE_MAX_STALE', '600'))
+STATS_CACHE_REFRESH_SECONDS = float(os.getenv('STATS_CACHE_REFRESH_SECONDS', '60'))
+STATS_CACHE_MAX_ENTRIES = int(os.getenv('STATS_CACHE_MAX_ENTRIES', '256'))
+
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+# Generations a successful write bumps, by blueprint; views can narrow this with @write_topics.
+# Read views name what they depend on: 'courses' (Course rows), 'sections' (sections
+# and who teaches or attends them), 'grades' (scores, quizzes, assignments), 'stats'
+# (the aggregates, which depend on all of it)
+DEFAULT_WRITE_TOPICS = ('stats',)
+WRITE_TOPICS = {
+    # Login, logout, token refresh and password changes do not touch cached data
+    'auth': (),
+    'admin': ('stats', 'courses', 'sections', 'grades'),
+    'tutors': ('stats', 'grades'),
+    'assignments': ('stats', 'grades'),
+    # Names and emails appear in section rosters and grade lists
+    'users': ('stats', 'sections', 'grades'),
+}
+
+# ==================== WRITE GENERATIONS ====================
+
+SHARED_TOPICS = ('stats', 'rankings', 'schedule', 'courses', 'sections', 'grades')
+_shared_index = {topic: index for index, topic in enumerate(SHARED_TOPICS)}
+_shared_generations = multiprocessing.Array('q', len(SHARED_TOPICS))
+
+_generations = {}
+_generations_lock = threading.Lock()
+
+def get_generation(topic: str) -> int:
+    index = _shared_index.get(topic)
+    if index is not None:
+        return _shared_generations[index]
+    return _generations.get(topic, 0)
+
+def bump_generation(*topics: str):
+    """Record that data behind the given topics changed"""
+    with _shared_generations.get_lock():
+        for topic in topics:
+            index = _shared_index.get(topic)
+            if index is not None:
+                _shared_generations[index] += 1
+    with _generations_lock:
+        for topic in topics:
+            if topic not in _shared_index:
+                _generations[topic] = _generations.get(topic, 0) + 1
+
+def _generation_snapshot(topics: Iterable[str]) -> Tuple[int, ...]:
+    return tuple(get_generation(topic) for topic in topics)
+
+# ==================== STATISTICS CACHE ====================
+
+class _Entry:
+    __slots__ = ('value', 'loaded_at', 'generations', 'last_read', 'loader', 'topics', 'refreshing')
+
+    def __init__(self, loader, topics):
+        self.value = None
+        self.loaded_at = None
+        self.generations = None
+        self.last_read = time.monotonic()
+        self.loader = loader
+        self.topics = topics
+        self.refreshing = False
+
+
+class StatsCache:
+    """
+    Stale-while-revalidate cache for aggregate queries
+
+    Loaders receive a cursor on a pooled connection, so they can also run on
+    the background refresh thread outside of a request.
+    """
+
+    def __init__(self, ttl: float = STATS_CACHE_TTL, max_stale: float = STATS_CACHE_MAX_STALE,
+                 refresh_seconds: float = STATS_CACHE_REFRESH_SECONDS, max_entries: int = STATS_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.refresh_seconds = refresh_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._thread = None
+        self._thread_pid = None
+        self._counters = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_errors': 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _load(self, key, entry: _Entry):
+        """Run the loader once for key; concurrent callers wait for the same load"""
+        seen = entry.loaded_at
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            # Another thread finished the same load while we waited
+            if entry.loaded_at != seen:
+                return
+            generations = _generation_snapshot(entry.topics)
+            with db_connection() as conn:
+                value = entry.loader(conn.cursor())
+            entry.value = value
+            entry.generations = generations
+            entry.loaded_at = time.monotonic()
+
+    def _refresh_async(self, key, entry: _Entry):
+        with self._lock:
+            if entry.refreshing:
+                return
+            entry.refreshing = True
+
+        def run():
+            try:
+                self._load(key, entry)
+                self._count('refreshes')
+            except Exception as e:
+                self._count('refresh_errors')
+                print(f'[Cache] Refresh of {key} failed: {e}')
+            finally:
+                entry.refreshing = False
+
+        threading.Thread(target=run, name='stats-refresh', daemon=True).start()
+
+    def _is_fresh(self, entry: _Entry, now: float) -> bool:
+        return now - entry.loaded_at < self.ttl and entry.generations == _generation_snapshot(entry.topics)
+
+    def get(self, key, loader: Callable[[Any], Any], topics: Tuple[str, ...] = ('stats',)) -> Tuple[Any, float, str]:
+        """
+        Get a cached value, loading it on first use
+
+        Returns:
+            (value, age_seconds, status) - status is HIT, STALE or MISS
+        """
+        self._ensure_refresher()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry(loader, tuple(topics))
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    old_key, _ = self._entries.popitem(last=False)
+                    self._load_locks.pop(old_key, None)
+            else:
+                self._entries.move_to_end(key)
+            entry.last_read = now
+
+        if entry.loaded_at is not None:
+            age = now - entry.loaded_at
+            if self._is_fresh(entry, now):
+                self._count('hits')
+                return entry.value, age, 'HIT'
+            if age < self.max_stale:
+                self._count('stale_hits')
+                self._refresh_async(key, entry)
+                return entry.value, age, 'STALE'
+
+        self._count('misses')
+        self._load(key, entry)
+        return entry.value, time.monotonic() - entry.loaded_at, 'MISS'
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _ensure_refresher(self):
+        if self.refresh_seconds <= 0:
+            return
+        pid = os.getpid()
+        if self._thread is not None and self._thread_pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread_pid == pid and self._thread.is_alive():
+                return
+            self._thread_pid = pid
+            self._thread = threading.Thread(target=self._refresh_loop, name='stats-refresher', daemon=True)
+            self._thread.start()
+
+    def _refresh_loop(self):
+        """Periodically reload entries that dashboards are still reading"""
+        while True:
+            time.sleep(self.refresh_seconds)
+            now = time.monotonic()
+            with self._lock:
+                due = [(key, entry) for key, entry in self._entries.items()
+                       if entry.loaded_at is not None
+                       and now - entry.last_read < self.max_stale
+                       and now - entry.loaded_at >= self.refresh_seconds]
+            for key, entry in due:
+                try:
+                    self._load(key, entry)
+                    self._count('refreshes')
+                except Exception as e:
+                    self._count('refresh_errors')
+                    print(f'[Cache] Refresh of {key} failed: {e}')
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'ttl': self.ttl,
+                'max_stale': self.max_stale,
+                'refresh_seconds': self.refresh_seconds,
+                **self._counters,
+            }
+
+
+# Singleton instance
+_stats_cache = None
+
+def get_stats_cache() -> StatsCache:
+    """Get or create the statistics cache singleton"""
+    global _stats_cache
+    if _stats_cache is None:
+        _stats_cache = StatsCache()
+    return _stats_cache
+
+def cached_json(key, loader: Callable[[Any], Any], topics: Tuple[str, ...] = ('stats',)):
+    """Serve a loader's result from the statistics cache as JSON with Age and X-Cache headers"""
+    value, age, status = get_stats_cache().get(key, loader, topics)
+    response = jsonify(value)
+    response.headers['Age'] = str(int(age))
+    response.headers['X-Cache'] = status
+    return response
+
+def write_topics(*topics: str):
+    """Declare the generations a write view changes instead of its blueprint's default"""
+    def decorator(f):
+        f.write_topics = topics
+        return f
+    return decorator
+
+def _request_write_topics() -> Tuple[str, ...]:
+    view = current_app.view_functions.get(request.endpoint)
+    topics = getattr(view, 'write_topics', None)
+    if topics is None:
+        topics = WRITE_TOPICS.get(request.blueprint, DEFAULT_WRITE_TOPICS)
+    return topics
+
+def init_app(app):
+    """Mark cached data stale after successful write requests"""
+    @app.after_request
+    def bump_generations_on_write(response):
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            topics = _request_write_topics()
+            if topics:
+                bump_generation(*topics)
+        return response
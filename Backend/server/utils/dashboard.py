@@ -0,0 +1,151 @@
+"""
+Dashboard Aggregation Utilities
+Runs the independent queries behind a dashboard page in one request and
+reports failures per section instead of failing the whole page
+
+Each request runs its sections on threads of its own, each section on its own
+pooled connection. DASHBOARD_WORKERS caps how many such connections all
+dashboards of a process hold at once, so slow dashboards cannot drain the
+pool. A section's time budget starts once it has a connection, and the
+connection gets a matching SET LOCK_TIMEOUT, so a section abandoned after
+its budget stops waiting on locks instead of holding its connection.
+"""
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.database import get_db, db_connection
+
+# Section connections held at once by all dashboards of a process (default: half
+# the pool); 0 runs every section sequentially on the request's own connection
+DASHBOARD_WORKERS = int(os.getenv('DASHBOARD_WORKERS') or max(1, int(os.getenv('DB_POOL_MAX_SIZE', '10')) // 2))
+DASHBOARD_SECTION_TIMEOUT = float(os.getenv('DASHBOARD_SECTION_TIMEOUT', '10'))
+
+
+def parse_section_timeouts(value: Optional[str]) -> Dict[str, float]:
+    """Parse 'courses=5,top_tutors=2' into per-section timeouts; malformed items are skipped"""
+    timeouts = {}
+    for item in (value or '').split(','):
+        if not item.strip():
+            continue
+        name, sep, seconds = item.partition('=')
+        try:
+            if not sep or not name.strip():
+                raise ValueError('expected name=seconds')
+            timeout = float(seconds)
+            if not timeout > 0:
+                raise ValueError('timeout must be positive')
+        except ValueError as e:
+            print(f'[Dashboard] Ignoring DASHBOARD_SECTION_TIMEOUTS item {item.strip()!r}: {e}')
+            continue
+        timeouts[name.strip()] = timeout
+    return timeouts
+
+# Overrides DASHBOARD_SECTION_TIMEOUT for individual sections
+DASHBOARD_SECTION_TIMEOUTS = parse_section_timeouts(os.getenv('DASHBOARD_SECTION_TIMEOUTS'))
+
+
+# Connection slots shared by every dashboard request of the process
+_connection_slots = threading.BoundedSemaphore(max(1, DASHBOARD_WORKERS))
+
+
+def select_sections(loaders: Dict[str, Callable[[Any], Any]], requested: Optional[str]) -> Dict[str, Callable[[Any], Any]]:
+    """Restrict loaders to a comma-separated ?sections= list (all when empty)"""
+    if not requested:
+        return loaders
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in names if name not in loaders]
+    if unknown:
+        raise ValueError(f'Unknown sections: {", ".join(unknown)}')
+    return {name: loaders[name] for name in names}
+
+
+class _SectionRun:
+    """One section on its own thread and pooled connection; records when it began"""
+
+    def __init__(self, loader: Callable[[Any], Any], limit: float, slots: threading.Semaphore):
+        self.loader = loader
+        self.limit = limit
+        self.slots = slots
+        self.started = threading.Event()
+        self.started_at = None
+
+    def __call__(self):
+        # Runs on a worker thread: pymssql connections must not be shared across threads
+        if not self.slots.acquire(timeout=self.limit):
+            raise TimeoutError(f'No database connection free within {self.limit}s')
+        try:
+            with db_connection(self.limit) as conn:
+                cursor = conn.cursor()
+                # Released connections are reset to the default (no lock timeout)
+                cursor.execute(f'SET LOCK_TIMEOUT {max(1, int(self.limit * 1000))}')
+                self.started_at = time.monotonic()
+                self.started.set()
+                return self.loader(cursor)
+        finally:
+            self.slots.release()
+
+
+def gather_sections(loaders: Dict[str, Callable[[Any], Any]],
+                    workers: Optional[int] = None,
+                    timeout: Optional[float] = None,
+                    timeouts: Optional[Dict[str, float]] = None) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Run dashboard section loaders and collect their results
+
+    Each loader receives a cursor and returns the section's JSON-ready value.
+    With workers > 0 the sections run concurrently, each on its own pooled
+    connection (at most workers of them across the process), and a section
+    that does not finish within its timeout (timeouts[name], else timeout)
+    after getting its connection is reported as failed. With workers == 0
+    they run one after another on the request connection.
+
+    Returns:
+        (sections, errors) - errors maps a section name to its error message
+    """
+    workers = DASHBOARD_WORKERS if workers is None else workers
+    timeout = DASHBOARD_SECTION_TIMEOUT if timeout is None else timeout
+    timeouts = {**DASHBOARD_SECTION_TIMEOUTS, **(timeouts or {})}
+    sections = {}
+    errors = {}
+
+    if workers <= 0 or len(loaders) <= 1:
+        conn = get_db()
+        for name, loader in loaders.items():
+            try:
+                sections[name] = loader(conn.cursor())
+            except Exception as e:
+                print(f'Dashboard section {name} error: {e}')
+                conn.rollback()
+                sections[name] = None
+                errors[name] = str(e)
+        return sections, errors
+
+    slots = _connection_slots if workers == DASHBOARD_WORKERS else threading.BoundedSemaphore(workers)
+    runs = {name: _SectionRun(loader, timeouts.get(name, timeout), slots) for name, loader in loaders.items()}
+    # Threads of this request only, so other requests' slow sections cannot queue ahead of ours
+    executor = ThreadPoolExecutor(max_workers=len(runs), thread_name_prefix='dashboard')
+    try:
+        futures = {name: executor.submit(run) for name, run in runs.items()}
+        for name, future in futures.items():
+            run = runs[name]
+            try:
+                # The budget starts once the section holds a connection
+                if not run.started.wait(timeout=run.limit) and not future.done():
+                    raise FutureTimeoutError()
+                deadline = (run.started_at or time.monotonic()) + run.limit
+                sections[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                print(f'Dashboard section {name} timed out after {run.limit}s')
+                sections[name] = None
+                errors[name] = f'Timed out after {run.limit}s'
+            except Exception as e:
+                print(f'Dashboard section {name} error: {e}')
+                sections[name] = None
+                errors[name] = str(e)
+    finally:
+        # Do not wait for abandoned sections; their lock timeout ends them
+        executor.shutdown(wait=False)
+    return sections, errors
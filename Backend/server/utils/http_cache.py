@@ -0,0 +1,133 @@
+"""
+HTTP Conditional Request Utilities
+Adds strong ETags to JSON read endpoints and answers If-None-Match with
+304 Not Modified
+
+The ETag is a hash of the response body, so every worker computes the same
+validator for the same data. Each worker also remembers the last ETag it
+sent per (path, user) together with the write generation it was read under.
+While that generation has not moved and the entry is younger than
+HTTP_ETAG_TTL seconds, a request presenting the remembered ETag is answered
+304 before the view runs: no query and no serialization. The TTL bounds how
+long a write made through another gunicorn worker can go unnoticed; once it
+passes, the view runs again and only the body hash decides between 200 and 304.
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+from flask import request, current_app, make_response
+
+from utils.cache import get_generation
+
+HTTP_ETAG_TTL = float(os.getenv('HTTP_ETAG_TTL', '60'))
+HTTP_ETAG_MAX_ENTRIES = int(os.getenv('HTTP_ETAG_MAX_ENTRIES', '50000'))
+
+
+class KnownETag(NamedTuple):
+    etag: str
+    generations: Tuple[int, ...]
+    stored_at: float  # monotonic
+
+
+class ETagRegistry:
+    """LRU of the last ETag sent per request key"""
+
+    def __init__(self, ttl: float = HTTP_ETAG_TTL, max_entries: int = HTTP_ETAG_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'short_circuits': 0, 'not_modified': 0, 'full': 0}
+
+    def current(self, key, generations: Tuple[int, ...]) -> Optional[str]:
+        """The remembered ETag, if nothing it depends on can have changed"""
+        with self._lock:
+            known = self._entries.get(key)
+            if known is None:
+                return None
+            if known.generations != generations or time.monotonic() - known.stored_at >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return known.etag
+
+    def remember(self, key, etag: str, generations: Tuple[int, ...]):
+        with self._lock:
+            self._entries[key] = KnownETag(etag, generations, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'ttl': self.ttl, **self._counters}
+
+
+# Singleton instance
+_etag_registry = None
+
+def get_etag_registry() -> ETagRegistry:
+    """Get or create the ETag registry singleton"""
+    global _etag_registry
+    if _etag_registry is None:
+        _etag_registry = ETagRegistry()
+    return _etag_registry
+
+
+def _request_key():
+    # Same URL, different caller: the body may differ, so the validator must too
+    return (request.full_path, getattr(request, 'current_user_id', None), getattr(request, 'current_user_role', None))
+
+def _revalidate_headers(response):
+    # Cached by the client, but revalidated on every view
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Authorization')
+    return response
+
+
+def conditional_get(topics: Tuple[str, ...] = ('stats',)):
+    """
+    Decorator for GET views returning JSON: strong ETag plus 304 handling
+
+    Args:
+        topics: write generations the response depends on, e.g. ('courses',);
+                writes bump them per blueprint (see utils.cache.WRITE_TOPICS)
+
+    Place it below require_auth / require_role so the caller is known.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            registry = get_etag_registry()
+            key = _request_key()
+            # Snapshot first: a write landing while the view runs leaves the entry stale
+            generations = tuple(get_generation(topic) for topic in topics)
+
+            etag = registry.current(key, generations)
+            if etag is not None and request.if_none_match.contains(etag):
+                registry.count('short_circuits')
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                response.headers['X-Cache'] = 'HIT'
+                return _revalidate_headers(response)
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200 or response.direct_passthrough:
+                return response
+            response.add_etag()
+            registry.remember(key, response.get_etag()[0], generations)
+            response.headers['X-Cache'] = 'MISS'
+            response = _revalidate_headers(response).make_conditional(request)
+            registry.count('not_modified' if response.status_code == 304 else 'full')
+            return response
+
+        return decorated_function
+    return decorator
@@ -0,0 +1,205 @@
+"""
+iCalendar Feed Utilities
+Renders a user's weekly timetable as an .ics calendar (one recurring event per
+weekly slot) and signs the per-user feed tokens that calendar clients put in
+the subscription URL instead of a bearer header
+
+A slot becomes a VEVENT starting on its first weekday on or after the
+semester's start date and repeating weekly for SCHEDULE_SEMESTER_WEEKS weeks.
+Semesters without a configured start date are left out of the feed.
+"""
+import os
+import hmac
+import hashlib
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:
+    ZoneInfo = None
+
+from utils.jwt_utils import JWT_SECRET
+
+
+def parse_semester_starts(value: Optional[str]) -> Dict[str, date]:
+    """
+    Parse '241=2024-09-02,242=2025-01-13' into per-semester start dates
+
+    Malformed items are logged and skipped, so a typo drops one semester
+    from the feed instead of failing the import of this module.
+    """
+    starts = {}
+    for item in (value or '').split(','):
+        if not item.strip():
+            continue
+        semester, sep, day = item.partition('=')
+        try:
+            if not sep or not semester.strip():
+                raise ValueError('expected semester=YYYY-MM-DD')
+            starts[semester.strip()] = date.fromisoformat(day.strip())
+        except ValueError as e:
+            print(f'[ICS] Ignoring SCHEDULE_SEMESTER_STARTS item {item.strip()!r}: {e}')
+    return starts
+
+# First teaching day of each semester; slots of other semesters are not in the feed
+SCHEDULE_SEMESTER_STARTS = parse_semester_starts(os.getenv('SCHEDULE_SEMESTER_STARTS'))
+SCHEDULE_SEMESTER_WEEKS = int(os.getenv('SCHEDULE_SEMESTER_WEEKS', '15'))
+SCHEDULE_TIMEZONE = os.getenv('SCHEDULE_TIMEZONE', 'Asia/Ho_Chi_Minh')
+# Signs feed URLs; rotating it revokes every subscription
+ICS_FEED_SECRET = os.getenv('ICS_FEED_SECRET') or JWT_SECRET
+ICS_TOKEN_LENGTH = 32
+
+PRODUCT_ID = '-//LMS//Schedule Feed//EN'
+# Longest content line in octets, excluding the CRLF (RFC 5545 3.1)
+MAX_LINE_OCTETS = 75
+
+
+def feed_token(user_id: int, role: str, version: Optional[str]) -> str:
+    """
+    Token that lets a calendar client read one user's feed
+
+    version is the account's stored password hash, so changing the password,
+    resetting the feed (a fresh salt) or a login rehash issues a new token
+    and the old URL stops working.
+    """
+    message = f'schedule-feed:{role}:{user_id}:{version or ""}'.encode('utf-8')
+    return hmac.new(ICS_FEED_SECRET.encode('utf-8'), message, hashlib.sha256).hexdigest()[:ICS_TOKEN_LENGTH]
+
+def verify_feed_token(user_id: int, role: str, version: Optional[str], token: Optional[str]) -> bool:
+    if not token or not ICS_FEED_SECRET:
+        return False
+    return hmac.compare_digest(feed_token(user_id, role, version), token)
+
+
+def escape_text(value: Any) -> str:
+    """Escape a TEXT property value"""
+    text = '' if value is None else str(value)
+    return (text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+def fold_line(line: str) -> str:
+    """Split a content line into CRLF + space continuations of at most 75 octets"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= MAX_LINE_OCTETS:
+        return line
+    parts, current, size = [], [], 0
+    limit = MAX_LINE_OCTETS
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > limit:
+            parts.append(''.join(current))
+            # Continuation lines start with a space, which counts toward the limit
+            current, size, limit = [], 0, MAX_LINE_OCTETS - 1
+        current.append(char)
+        size += width
+    parts.append(''.join(current))
+    return '\r\n '.join(parts)
+
+
+def period_start(period: int) -> timedelta:
+    """Offset from midnight at which a period begins (period 1 = 06:00)"""
+    return timedelta(hours=5 + period)
+
+def period_end(period: int) -> timedelta:
+    """Offset from midnight at which a period ends; each period lasts an hour"""
+    return period_start(period) + timedelta(hours=1)
+
+
+def first_meeting(semester_start: date, day_of_week: int) -> date:
+    """First date on or after semester_start that falls on day_of_week (1=Monday)"""
+    return semester_start + timedelta(days=(day_of_week - 1 - semester_start.weekday()) % 7)
+
+
+def _timezone_block(tzid: str, on: date) -> List[str]:
+    """VTIMEZONE with the zone's offset on the given date; empty when the zone is unknown"""
+    if ZoneInfo is None:
+        return []
+    try:
+        zone = ZoneInfo(tzid)
+    except (ZoneInfoNotFoundError, ValueError):
+        return []
+    offset = datetime(on.year, on.month, on.day, 12, tzinfo=zone).utcoffset()
+    minutes = int(offset.total_seconds() // 60)
+    sign = '+' if minutes >= 0 else '-'
+    text = f'{sign}{abs(minutes) // 60:02d}{abs(minutes) % 60:02d}'
+    # One STANDARD rule is exact for zones without daylight saving, which covers Vietnam
+    return [
+        'BEGIN:VTIMEZONE',
+        f'TZID:{tzid}',
+        'BEGIN:STANDARD',
+        'DTSTART:19700101T000000',
+        f'TZOFFSETFROM:{text}',
+        f'TZOFFSETTO:{text}',
+        'END:STANDARD',
+        'END:VTIMEZONE',
+    ]
+
+
+def render_calendar(rows: Iterable[Sequence], name: str,
+                    semester_starts: Optional[Dict[str, date]] = None,
+                    weeks: int = SCHEDULE_SEMESTER_WEEKS,
+                    tzid: str = SCHEDULE_TIMEZONE) -> bytes:
+    """
+    Build the .ics body from schedule procedure rows
+
+    Args:
+        rows: Section_ID, Course_ID, Semester, Course_Name, Day_of_Week,
+              Start_Period, End_Period, Building, Room (GetStudentSchedule / GetTutorSchedule)
+        name: calendar display name
+
+    The output depends only on the rows and settings (DTSTAMP is derived from
+    the semester start), so an unchanged timetable keeps its ETag.
+    """
+    if semester_starts is None:
+        semester_starts = SCHEDULE_SEMESTER_STARTS
+    events, seen, first_day = [], set(), None
+    for row in rows:
+        section_id, course_id, semester, course_name = row[0], row[1], row[2], row[3]
+        start = semester_starts.get(str(semester))
+        day_of_week = int(row[4]) if row[4] else None
+        start_period = int(row[5]) if row[5] else None
+        end_period = int(row[6]) if row[6] else None
+        if start is None or not day_of_week or not start_period or not end_period:
+            continue
+        uid = f'{semester}-{course_id}-{section_id}-{day_of_week}-{start_period}@lms'
+        if uid in seen:
+            continue
+        seen.add(uid)
+
+        meeting = datetime.combine(first_meeting(start, day_of_week), datetime.min.time())
+        summary = f'{course_id} {course_name}' if course_name else str(course_id)
+        location = ' '.join(str(part) for part in (row[7], row[8]) if part)
+        first_day = min(first_day or start, start)
+        events.append([
+            'BEGIN:VEVENT',
+            f'UID:{uid}',
+            f'DTSTAMP:{start:%Y%m%d}T000000Z',
+            f'DTSTART;TZID={tzid}:{meeting + period_start(start_period):%Y%m%dT%H%M%S}',
+            f'DTEND;TZID={tzid}:{meeting + period_end(end_period):%Y%m%dT%H%M%S}',
+            f'RRULE:FREQ=WEEKLY;COUNT={weeks}',
+            f'SUMMARY:{escape_text(summary)}',
+            f'DESCRIPTION:Section {escape_text(section_id)}\\, semester {escape_text(semester)}',
+            *([f'LOCATION:{escape_text(location)}'] if location else []),
+            'END:VEVENT',
+        ])
+
+    timezone = _timezone_block(tzid, first_day) if first_day else []
+    if not timezone:
+        # Unknown zone: drop TZID so clients read the times as floating local time
+        events = [[line.replace(f';TZID={tzid}', '') for line in event] for event in events]
+
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODUCT_ID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(name)}',
+        f'X-WR-TIMEZONE:{tzid}',
+        *timezone,
+    ]
+    for event in events:
+        lines.extend(event)
+    lines.append('END:VCALENDAR')
+    return ('\r\n'.join(fold_line(line) for line in lines) + '\r\n').encode('utf-8')
@@ -0,0 +1,319 @@
+"""
+Background Job Utilities
+Runs long admin operations (bulk imports, timetable solving) off the request
+thread and keeps their progress for polling
+
+A job runs in the worker that accepted it, but its state is written to a
+store every worker reads, so a poll can land on any of them: Redis when
+REDIS_URL is set and the redis package is installed (shared across hosts),
+otherwise one JSON file per job under JOB_STATE_DIR (shared by the workers
+of one host).
+
+Jobs do not survive their worker. When gunicorn recycles it (max_requests)
+a running job gets graceful_timeout to finish and queued jobs are failed
+right away; a job still running when the worker is killed, or when it
+crashes, stops saving its heartbeat, and the first poll after
+JOB_STALE_SECONDS marks it failed. Either way the caller starts it again.
+"""
+import os
+import re
+import json
+import time
+import uuid
+import socket
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '1'))
+JOB_RETENTION_SECONDS = float(os.getenv('JOB_RETENTION_SECONDS', '3600'))
+JOB_HEARTBEAT_SECONDS = float(os.getenv('JOB_HEARTBEAT_SECONDS', '15'))
+JOB_STALE_SECONDS = float(os.getenv('JOB_STALE_SECONDS', '60'))
+JOB_STATE_DIR = os.getenv('JOB_STATE_DIR') or os.path.join(tempfile.gettempdir(), 'lms-jobs')
+REDIS_URL = os.getenv('REDIS_URL')
+REDIS_KEY_PREFIX = 'lms:job:'
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class _FileStore:
+    name = 'file'
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f'{job_id}.json')
+
+    def save(self, state: Dict[str, Any], retention: float):
+        path = self._path(state['job_id'])
+        # Write then rename, so readers never see a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(state, f, default=str)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(job_id), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def prune(self, retention: float):
+        cutoff = time.time() - retention
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+class _RedisStore:
+    name = 'redis'
+
+    def __init__(self, url: str):
+        self._client = redis.Redis.from_url(url)
+
+    def save(self, state: Dict[str, Any], retention: float):
+        self._client.set(REDIS_KEY_PREFIX + state['job_id'], json.dumps(state, default=str),
+                         ex=max(1, int(retention)))
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self._client.get(REDIS_KEY_PREFIX + job_id)
+        return json.loads(raw) if raw is not None else None
+
+    def prune(self, retention: float):
+        # Keys expire on their own
+        pass
+
+
+class Job:
+    """State of one background job; progress is updated by the job itself"""
+
+    def __init__(self, kind: str, owner_id: Optional[int] = None, on_change: Optional[Callable] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.owner_id = owner_id
+        self.status = 'queued'
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._on_change = on_change
+
+    def _changed(self):
+        if self._on_change is not None:
+            self._on_change(self)
+
+    def update(self, **progress):
+        with self._lock:
+            self.progress.update(progress)
+        self._changed()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'job_id': self.id,
+                'kind': self.kind,
+                'owner_id': self.owner_id,
+                'worker': f'{socket.gethostname()}:{os.getpid()}',
+                'status': self.status,
+                'progress': dict(self.progress),
+                'result': self.result,
+                'error': self.error,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                # Every save doubles as a heartbeat of the worker running the job
+                'heartbeat_at': time.time(),
+            }
+
+
+class JobRegistry:
+    """Small thread pool whose jobs publish their state to a shared store"""
+
+    def __init__(self, workers: int = JOB_WORKERS, retention: float = JOB_RETENTION_SECONDS,
+                 redis_url: Optional[str] = REDIS_URL, state_dir: str = JOB_STATE_DIR):
+        self.workers = workers
+        self.retention = retention
+        self._store = None
+        if redis_url:
+            if redis is None:
+                print('[Jobs] REDIS_URL is set but redis is not installed; keeping job state in files')
+            else:
+                self._store = _RedisStore(redis_url)
+        if self._store is None:
+            self._store = _FileStore(state_dir)
+        self._jobs = {}   # jobs running or queued in this worker
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self._counters = {'submitted': 0, 'store_errors': 0, 'orphaned': 0}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        pid = os.getpid()
+        with self._lock:
+            if self._executor is None or self._executor_pid != pid:
+                if self._executor_pid != pid:
+                    threading.Thread(target=self._heartbeat, name='job-heartbeat', daemon=True).start()
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+                self._executor_pid = pid
+            return self._executor
+
+    def _heartbeat(self):
+        """Re-save this worker's jobs so polls can tell them from orphans"""
+        while True:
+            time.sleep(JOB_HEARTBEAT_SECONDS)
+            with self._lock:
+                jobs = list(self._jobs.values())
+            for job in jobs:
+                self._save(job)
+
+    def _save(self, job: Job):
+        try:
+            self._store.save(job.to_dict(), self.retention)
+        except Exception as e:
+            # A store outage must not fail the job itself; the next change retries
+            with self._lock:
+                self._counters['store_errors'] += 1
+            print(f'[Jobs] Saving state of job {job.id} failed: {e}')
+
+    def submit(self, kind: str, fn: Callable[[Job], Any], owner_id: Optional[int] = None) -> Job:
+        """Queue fn(job); its return value becomes job.result"""
+        try:
+            self._store.prune(self.retention)
+        except Exception as e:
+            print(f'[Jobs] Pruning old jobs failed: {e}')
+        job = Job(kind, owner_id, on_change=self._save)
+        # Stored before it is queued, so a poll right after the 202 finds it
+        self._store.save(job.to_dict(), self.retention)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._counters['submitted'] += 1
+
+        def run():
+            with job._lock:
+                if job.status != 'queued':
+                    return   # abandoned while queued
+                job.status = 'running'
+                job.started_at = time.time()
+            self._save(job)
+            try:
+                job.result = fn(job)
+                job.status = 'completed'
+            except Exception as e:
+                print(f'Job {job.id} ({kind}) error: {e}')
+                import traceback
+                traceback.print_exc()
+                job.error = str(e)
+                job.status = 'failed'
+            finally:
+                job.finished_at = time.time()
+                self._save(job)
+                with self._lock:
+                    self._jobs.pop(job.id, None)
+
+        try:
+            self._get_executor().submit(run)
+        except Exception:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            raise
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """State of a job started by any worker, or None when unknown or expired"""
+        if not JOB_ID_PATTERN.match(job_id or ''):
+            return None
+        state = self._store.load(job_id)
+        if state is None or state['status'] not in ACTIVE_STATUSES:
+            return state
+        with self._lock:
+            if job_id in self._jobs:
+                return state
+        heartbeat_at = state.get('heartbeat_at') or state['created_at']
+        if time.time() - heartbeat_at <= JOB_STALE_SECONDS:
+            return state
+        # The worker stopped without finishing or failing the job
+        state.update(status='failed', finished_at=heartbeat_at,
+                     error='The server restarted before the job finished; start it again')
+        with self._lock:
+            self._counters['orphaned'] += 1
+        try:
+            self._store.save(state, self.retention)
+        except Exception as e:
+            print(f'[Jobs] Saving state of job {job_id} failed: {e}')
+        return state
+
+    def abandon(self):
+        """
+        Fail the jobs still queued in this worker; call when the worker exits
+
+        Running jobs keep going for gunicorn's graceful_timeout and keep their
+        heartbeat; if the worker is killed first, polls find them stale.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            jobs = list(self._jobs.values())
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        abandoned = 0
+        for job in jobs:
+            with job._lock:
+                if job.status != 'queued':
+                    continue
+                job.status = 'failed'
+                job.error = 'The server restarted before the job started; start it again'
+                job.finished_at = time.time()
+            abandoned += 1
+            self._save(job)
+            with self._lock:
+                self._jobs.pop(job.id, None)
+        if abandoned:
+            print(f'[Jobs] Worker exiting, marked {abandoned} queued job(s) failed')
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            counters = dict(self._counters)
+        return {
+            'workers': self.workers,
+            'store': self._store.name,
+            'running': statuses.count('running'),
+            'queued': statuses.count('queued'),
+            **counters,
+        }
+
+
+# Singleton instance
+_job_registry = None
+
+def get_job_registry() -> JobRegistry:
+    """Get or create the job registry singleton"""
+    global _job_registry
+    if _job_registry is None:
+        _job_registry = JobRegistry()
+    return _job_registry
+
+def abandon_jobs():
+    """Fail the unfinished jobs of this worker on shutdown"""
+    if _job_registry is not None:
+        _job_registry.abandon()
@@ -1,155 +1,282 @@
-"""
-JWT Token Utilities
-Handles JWT token generation, verification, and refresh
-"""
-import jwt
-import os
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from functools import wraps
-from flask import request, jsonify
-
-JWT_SECRET = os.getenv('JWT_SECRET', '')
-JWT_ALGORITHM = 'HS256'
-JWT_EXPIRES_IN = os.getenv('JWT_EXPIRES_IN', '24h')  # Default 24 hours
-JWT_REMEMBER_ME_EXPIRES_IN = '30d'  # 30 days for remember me
-
-def parse_expires_in(expires_str: str) -> timedelta:
-    """Parse expires_in string to timedelta"""
-    if expires_str.endswith('h'):
-        hours = int(expires_str[:-1])
-        return timedelta(hours=hours)
-    elif expires_str.endswith('d'):
-        days = int(expires_str[:-1])
-        return timedelta(days=days)
-    elif expires_str.endswith('m'):
-        minutes = int(expires_str[:-1])
-        return timedelta(minutes=minutes)
-    else:
-        # Default to 24 hours
-        return timedelta(hours=24)
-
-def generate_token(user_id: int, role: str, remember_me: bool = False) -> str:
-    """
-    Generate JWT token for user
-    
-    Args:
-        user_id: University_ID of the user
-        role: User role (student, tutor, admin)
-        remember_me: If True, use longer expiration (30 days), else use default
-    
-    Returns:
-        JWT token string
-    """
-    expires_in = parse_expires_in(JWT_REMEMBER_ME_EXPIRES_IN if remember_me else JWT_EXPIRES_IN)
-    expiration = datetime.utcnow() + expires_in
-    
-    payload = {
-        'user_id': user_id,
-        'role': role,
-        'exp': expiration,
-        'iat': datetime.utcnow(),
-        'remember_me': remember_me
-    }
-    
-    token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
-    return token
-
-def verify_token(token: str) -> Optional[Dict[str, Any]]:
-    """
-    Verify JWT token and return payload
-    
-    Args:
-        token: JWT token string
-    
-    Returns:
-        Decoded payload if valid, None otherwise
-    """
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
-    except jwt.ExpiredSignatureError:
-        return None
-    except jwt.InvalidTokenError:
-        return None
-
-def get_token_from_request() -> Optional[str]:
-    """
-    Extract JWT token from request headers
-    
-    Returns:
-        Token string if found, None otherwise
-    """
-    auth_header = request.headers.get('Authorization')
-    if auth_header and auth_header.startswith('Bearer '):
-        return auth_header.split(' ')[1]
-    return None
-
-def require_auth(f):
-    """
-    Decorator to require JWT authentication for a route
-    
-    Usage:
-        @auth_bp.route('/protected')
-        @require_auth
-        def protected_route():
-            user_id = request.current_user_id
-            role = request.current_user_role
-            ...
-    """
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        token = get_token_from_request()
-        
-        if not token:
-            return jsonify({
-                'success': False,
-                'error': 'Authentication required'
-            }), 401
-        
-        payload = verify_token(token)
-        if not payload:
-            return jsonify({
-                'success': False,
-                'error': 'Invalid or expired token'
-            }), 401
-        
-        # Attach user info to request
-        request.current_user_id = payload.get('user_id')
-        request.current_user_role = payload.get('role')
-        request.current_user_remember_me = payload.get('remember_me', False)
-        
-        return f(*args, **kwargs)
-    
-    return decorated_function
-
-def require_role(allowed_roles: list):
-    """
-    Decorator to require specific role(s) for a route
-    
-    Usage:
-        @auth_bp.route('/admin-only')
-        @require_auth
-        @require_role(['admin'])
-        def admin_route():
-            ...
-    """
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            if not hasattr(request, 'current_user_role'):
-                return jsonify({
-                    'success': False,
-                    'error': 'Authentication required'
-                }), 401
-            
-            if request.current_user_role not in allowed_roles:
-                return jsonify({
-                    'success': False,
-                    'error': 'Insufficient permissions'
-                }), 403
-            
-            return f(*args, **kwargs)
-        return decorated_function
-    return decorator
-
+"""
+JWT Token Utilities
+Handles JWT token generation, verification, and refresh
+"""
+import jwt
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+from functools import wraps
+from flask import request, jsonify
+
+from utils.token_revocation import get_revocation_store
+
+JWT_SECRET = os.getenv('JWT_SECRET', '')
+JWT_ALGORITHM = 'HS256'
+JWT_EXPIRES_IN = os.getenv('JWT_EXPIRES_IN', '24h')  # Default 24 hours
+JWT_REMEMBER_ME_EXPIRES_IN = '30d'  # 30 days for remember me
+JWT_CACHE_MAX_SIZE = int(os.getenv('JWT_CACHE_MAX_SIZE', '10000'))
+
+def parse_expires_in(expires_str: str) -> timedelta:
+    """Parse expires_in string to timedelta"""
+    if expires_str.endswith('h'):
+        hours = int(expires_str[:-1])
+        return timedelta(hours=hours)
+    elif expires_str.endswith('d'):
+        days = int(expires_str[:-1])
+        return timedelta(days=days)
+    elif expires_str.endswith('m'):
+        minutes = int(expires_str[:-1])
+        return timedelta(minutes=minutes)
+    else:
+        # Default to 24 hours
+        return timedelta(hours=24)
+
+def generate_token(user_id: int, role: str, remember_me: bool = False) -> str:
+    """
+    Generate JWT token for user
+    
+    Args:
+        user_id: University_ID of the user
+        role: User role (student, tutor, admin)
+        remember_me: If True, use longer expiration (30 days), else use default
+    
+    Returns:
+        JWT token string
+    """
+    expires_in = parse_expires_in(JWT_REMEMBER_ME_EXPIRES_IN if remember_me else JWT_EXPIRES_IN)
+    expiration = datetime.utcnow() + expires_in
+    
+    payload = {
+        'user_id': user_id,
+        'role': role,
+        'exp': expiration,
+        # Sub-second, so a revocation cutoff separates tokens issued in the same second
+        'iat': time.time(),
+        'remember_me': remember_me
+    }
+    
+    token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return token
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified token payloads keyed by token digest.
+    Entries live until the token's exp. Revocations are kept in the shared
+    revocation store (utils.token_revocation) and checked on every hit, so a
+    logout handled by one worker is enforced by all of them.
+    """
+
+    def __init__(self, max_size: int = JWT_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # digest -> payload
+        self._revocations = get_revocation_store()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        digest = self.digest(token)
+        now = time.time()
+        with self._lock:
+            payload = self._entries.get(digest)
+            if payload is None:
+                self._misses += 1
+                return None
+            if payload.get('exp', 0) <= now:
+                del self._entries[digest]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self._hits += 1
+        if self._revocations.is_revoked(digest, payload):
+            with self._lock:
+                self._entries.pop(digest, None)
+            return None
+        return payload
+
+    def is_revoked(self, token: str, payload: Dict[str, Any]) -> bool:
+        return self._revocations.is_revoked(self.digest(token), payload)
+
+    def put(self, token: str, payload: Dict[str, Any]) -> bool:
+        """Cache a freshly decoded payload; returns False if the token is revoked"""
+        digest = self.digest(token)
+        if self._revocations.is_revoked(digest, payload):
+            return False
+        with self._lock:
+            if self.max_size <= 0:
+                return True
+            self._entries[digest] = payload
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            return True
+
+    def revoke(self, token: str, payload: Dict[str, Any]):
+        """Evict a token and deny it in every worker until it would have expired anyway"""
+        digest = self.digest(token)
+        exp = payload.get('exp') or (time.time() + parse_expires_in(JWT_REMEMBER_ME_EXPIRES_IN).total_seconds())
+        self._revocations.revoke_token(digest, payload, exp)
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def revoke_user(self, user_id, keep_token: Optional[str] = None):
+        """Invalidate every token issued to a user so far, except keep_token"""
+        kept_digest = self.digest(keep_token) if keep_token else None
+        # Any token issued before now expires at the latest one remember-me period from now
+        horizon = time.time() + parse_expires_in(JWT_REMEMBER_ME_EXPIRES_IN).total_seconds()
+        self._revocations.revoke_user(user_id, horizon, kept_digest)
+        with self._lock:
+            for digest in [d for d, p in self._entries.items() if p.get('user_id') == user_id and d != kept_digest]:
+                del self._entries[digest]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / total, 4) if total else 0.0,
+                'evictions': self._evictions,
+                'revocations': self._revocations.stats(),
+            }
+
+
+# Singleton instance
+_token_cache = TokenCache()
+
+def get_token_cache() -> TokenCache:
+    return _token_cache
+
+def verify_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verify JWT token and return payload
+    
+    Args:
+        token: JWT token string
+    
+    Returns:
+        Decoded payload if valid, None otherwise
+    """
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        return None
+    except jwt.InvalidTokenError:
+        return None
+
+    if not _token_cache.put(token, payload):
+        return None
+    return payload
+
+def revoke_token(token: str):
+    """Revoke a single token (e.g. on logout)"""
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM], options={'verify_exp': False})
+    except jwt.InvalidTokenError:
+        return
+    _token_cache.revoke(token, payload)
+
+def revoke_user_tokens(user_id, keep_token: Optional[str] = None):
+    """Revoke all tokens issued to a user so far (e.g. on password change)"""
+    _token_cache.revoke_user(user_id, keep_token)
+
+def get_token_cache_stats() -> Dict[str, Any]:
+    return _token_cache.stats()
+
+def get_token_from_request() -> Optional[str]:
+    """
+    Extract JWT token from request headers
+    
+    Returns:
+        Token string if found, None otherwise
+    """
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        return auth_header.split(' ')[1]
+    return None
+
+def require_auth(f):
+    """
+    Decorator to require JWT authentication for a route
+    
+    Usage:
+        @auth_bp.route('/protected')
+        @require_auth
+        def protected_route():
+            user_id = request.current_user_id
+            role = request.current_user_role
+            ...
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        token = get_token_from_request()
+        
+        if not token:
+            return jsonify({
+                'success': False,
+                'error': 'Authentication required'
+            }), 401
+        
+        payload = verify_token(token)
+        if not payload:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid or expired token'
+            }), 401
+        
+        # Attach user info to request
+        request.current_user_id = payload.get('user_id')
+        request.current_user_role = payload.get('role')
+        request.current_user_remember_me = payload.get('remember_me', False)
+        
+        return f(*args, **kwargs)
+    
+    return decorated_function
+
+def require_role(allowed_roles: list):
+    """
+    Decorator to require specific role(s) for a route
+    
+    Usage:
+        @auth_bp.route('/admin-only')
+        @require_auth
+        @require_role(['admin'])
+        def admin_route():
+            ...
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not hasattr(request, 'current_user_role'):
+                return jsonify({
+                    'success': False,
+                    'error': 'Authentication required'
+                }), 401
+            
+            if request.current_user_role not in allowed_roles:
+                return jsonify({
+                    'success': False,
+                    'error': 'Insufficient permissions'
+                }), 403
+            
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
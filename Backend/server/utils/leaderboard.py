@@ -0,0 +1,213 @@
+"""
+Ranked Leaderboard Cache
+Loads each global ranking once, up to LEADERBOARD_MAX_N rows, and serves any
+top-N request as a slice. Rankings only change when grades are written, so the
+grade-writing endpoints call invalidate_rankings() after they commit.
+
+Every cached ranking is tagged with the rankings generation it was loaded
+under and is only served while that generation is current. Rankings live in
+process memory by default, with the generation in memory shared by all
+gunicorn workers (see utils.cache). When REDIS_URL is set and the redis
+package is installed (the "redis" extra), rankings and the generation live
+in Redis, which also covers workers on other hosts.
+"""
+import os
+import json
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from config.database import db_connection
+from utils.cache import get_generation, bump_generation
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+LEADERBOARD_MAX_N = int(os.getenv('LEADERBOARD_MAX_N', '100'))
+# Upper bound on staleness for writes that do not go through invalidate_rankings()
+LEADERBOARD_TTL = float(os.getenv('LEADERBOARD_TTL', '600'))
+REDIS_URL = os.getenv('REDIS_URL')
+REDIS_KEY_PREFIX = 'lms:leaderboard:'
+REDIS_GENERATION_KEY = REDIS_KEY_PREFIX + 'generation'
+RANKINGS_TOPIC = 'rankings'
+
+
+class _MemoryBackend:
+    name = 'memory'
+
+    def __init__(self):
+        self._rankings = {}
+        self._lock = threading.Lock()
+
+    def generation(self) -> int:
+        return get_generation(RANKINGS_TOPIC)
+
+    def get(self, board: str, ttl: float) -> Optional[List[Dict[str, Any]]]:
+        item = self._rankings.get(board)
+        if item is None or item[2] != self.generation() or time.monotonic() - item[1] >= ttl:
+            return None
+        return item[0]
+
+    def set(self, board: str, rows: List[Dict[str, Any]], generation: int, ttl: float):
+        with self._lock:
+            self._rankings[board] = (rows, time.monotonic(), generation)
+
+    def invalidate(self, boards):
+        bump_generation(RANKINGS_TOPIC)
+        with self._lock:
+            for board in boards:
+                self._rankings.pop(board, None)
+
+
+class _RedisBackend:
+    name = 'redis'
+
+    def __init__(self, url: str):
+        self._client = redis.Redis.from_url(url)
+
+    def generation(self) -> int:
+        return int(self._client.get(REDIS_GENERATION_KEY) or 0)
+
+    def get(self, board: str, ttl: float) -> Optional[List[Dict[str, Any]]]:
+        generation, raw = self._client.mget(REDIS_GENERATION_KEY, REDIS_KEY_PREFIX + board)
+        if raw is None:
+            return None
+        item = json.loads(raw)
+        if item['generation'] != int(generation or 0):
+            return None
+        return item['rows']
+
+    def set(self, board: str, rows: List[Dict[str, Any]], generation: int, ttl: float):
+        item = {'generation': generation, 'rows': rows}
+        self._client.set(REDIS_KEY_PREFIX + board, json.dumps(item), ex=max(1, int(ttl)))
+
+    def invalidate(self, boards):
+        self._client.incr(REDIS_GENERATION_KEY)
+        if boards:
+            self._client.delete(*[REDIS_KEY_PREFIX + board for board in boards])
+
+
+class RankedCache:
+    """
+    Top-N cache for rankings returned by stored procedures
+
+    Usage:
+        rows = get_ranked_cache().top('student-leaderboard', top_n, _load_leaderboard)
+
+    The loader receives (cursor, n) and must return rows already sorted by
+    rank. Requests for more than max_n rows bypass the cache.
+    """
+
+    def __init__(self, max_n: int = LEADERBOARD_MAX_N, ttl: float = LEADERBOARD_TTL,
+                 redis_url: Optional[str] = REDIS_URL):
+        self.max_n = max_n
+        self.ttl = ttl
+        self._backend = _MemoryBackend()
+        if redis_url:
+            if redis is None:
+                print('[Leaderboard] REDIS_URL is set but redis is not installed; using in-process cache')
+            else:
+                self._backend = _RedisBackend(redis_url)
+        self._boards = set()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._counters = {'hits': 0, 'misses': 0, 'bypassed': 0, 'invalidations': 0, 'backend_errors': 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _cached(self, board: str) -> Optional[List[Dict[str, Any]]]:
+        try:
+            return self._backend.get(board, self.ttl)
+        except Exception as e:
+            # A cache outage must not take the leaderboard down with it
+            self._count('backend_errors')
+            print(f'[Leaderboard] Cache read for {board} failed: {e}')
+            return None
+
+    def top(self, board: str, top_n: int, loader: Callable[[Any, int], List[Dict[str, Any]]],
+            cursor=None) -> List[Dict[str, Any]]:
+        """Get the first top_n rows of a ranking"""
+        top_n = max(0, top_n or 0)
+        if top_n > self.max_n:
+            self._count('bypassed')
+            return self._run(loader, top_n, cursor)
+
+        with self._lock:
+            self._boards.add(board)
+            load_lock = self._load_locks.setdefault(board, threading.Lock())
+
+        rows = self._cached(board)
+        if rows is None:
+            # Single flight: concurrent misses wait for one load
+            with load_lock:
+                rows = self._cached(board)
+                if rows is None:
+                    self._count('misses')
+                    try:
+                        generation = self._backend.generation()
+                    except Exception as e:
+                        self._count('backend_errors')
+                        print(f'[Leaderboard] Cache read for {board} failed: {e}')
+                        generation = None
+                    rows = self._run(loader, self.max_n, cursor)
+                    # Tagged with the generation read before loading, so rows
+                    # loaded across a grade change are never served
+                    if generation is not None:
+                        try:
+                            self._backend.set(board, rows, generation, self.ttl)
+                        except Exception as e:
+                            self._count('backend_errors')
+                            print(f'[Leaderboard] Cache write for {board} failed: {e}')
+                    return rows[:top_n]
+        self._count('hits')
+        return rows[:top_n]
+
+    @staticmethod
+    def _run(loader, n, cursor):
+        if cursor is not None:
+            return loader(cursor, n)
+        with db_connection() as conn:
+            return loader(conn.cursor(), n)
+
+    def invalidate(self, *boards: str):
+        """Mark every cached ranking stale in all workers and drop the given ones"""
+        with self._lock:
+            targets = list(boards or self._boards)
+            self._counters['invalidations'] += 1
+        try:
+            self._backend.invalidate(targets)
+        except Exception as e:
+            self._count('backend_errors')
+            print(f'[Leaderboard] Cache invalidation failed: {e}')
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'backend': self._backend.name,
+                'boards': sorted(self._boards),
+                'max_n': self.max_n,
+                'ttl': self.ttl,
+                **self._counters,
+            }
+
+
+# Singleton instance
+_ranked_cache = None
+
+def get_ranked_cache() -> RankedCache:
+    """Get or create the ranked cache singleton"""
+    global _ranked_cache
+    if _ranked_cache is None:
+        _ranked_cache = RankedCache()
+    return _ranked_cache
+
+# Every ranking is derived from grades
+RANKING_BOARDS = ('student-leaderboard', 'top-students', 'top-tutors', 'top-tutors-by-student-gpa')
+
+def invalidate_rankings():
+    """Call after committing a grade change"""
+    get_ranked_cache().invalidate(*RANKING_BOARDS)
@@ -0,0 +1,123 @@
+"""
+Keyset Pagination Utilities
+Opaque cursors and keyset predicates for paging large listings in constant time per page
+"""
+import base64
+import json
+from datetime import datetime, date
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple
+from flask import request
+
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursorError(ValueError):
+    """Raised for malformed or tampered cursors and bad page arguments"""
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'n': str(value)}
+    return value
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+        if 'n' in value:
+            return Decimal(value['n'])
+        raise InvalidCursorError('Invalid cursor value')
+    return value
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort-key values of the last row of a page as an opaque cursor"""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor produced by encode_cursor for a key of the given size"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        if not isinstance(values, list) or len(values) != size:
+            raise InvalidCursorError('Invalid cursor')
+        return [_decode_value(v) for v in values]
+    except InvalidCursorError:
+        raise
+    except Exception:
+        raise InvalidCursorError('Invalid cursor')
+
+def get_page_args(default_limit: Optional[int] = None) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Read limit and cursor from the query string
+
+    Returns:
+        (limit, cursor) - limit is None when the client did not ask for paging
+    """
+    limit = request.args.get('limit', default_limit)
+    cursor = request.args.get('cursor') or None
+    if limit is None:
+        if cursor:
+            raise InvalidCursorError('cursor requires limit')
+        return None, None
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise InvalidCursorError('limit must be an integer')
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise InvalidCursorError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+    return limit, cursor
+
+def keyset_predicate(columns: Sequence[Tuple[str, bool]], values: Sequence[Any]) -> Tuple[str, List[Any]]:
+    """
+    Build a WHERE fragment selecting rows strictly after values in a DESC ordering
+
+    Args:
+        columns: (sql_expression, nullable) in ORDER BY order, all sorted DESC;
+                 SQL Server sorts NULLs last in descending order
+        values: sort-key values of the last row of the previous page
+
+    Returns:
+        (sql, params)
+    """
+    (column, nullable), rest = columns[0], columns[1:]
+    value, rest_values = values[0], values[1:]
+
+    if not rest:
+        if value is None:
+            return '1 = 0', []
+        if nullable:
+            return f'({column} < %s OR {column} IS NULL)', [value]
+        return f'{column} < %s', [value]
+
+    rest_sql, rest_params = keyset_predicate(rest, rest_values)
+
+    if value is None:
+        return f'({column} IS NULL AND {rest_sql})', rest_params
+
+    sql = f'({column} < %s OR ({column} = %s AND {rest_sql})'
+    if nullable:
+        sql += f' OR {column} IS NULL'
+    sql += ')'
+    return sql, [value, value] + rest_params
+
+def paginate(rows: List[tuple], limit: int, key_indexes: Sequence[int]) -> Tuple[List[tuple], Optional[str]]:
+    """
+    Trim a limit + 1 fetch to one page and compute the next cursor
+
+    Returns:
+        (page_rows, next_cursor) - next_cursor is None on the last page
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([last[i] for i in key_indexes])
@@ -0,0 +1,173 @@
+"""
+Password hashing utilities
+Runs bcrypt in a bounded worker process pool so a login burst cannot starve request workers
+"""
+import os
+import threading
+import multiprocessing
+import bcrypt
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional, Tuple, Dict
+
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', '16'))
+PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', '10'))
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+# Bulk imports hash every row; login rehashes these up to BCRYPT_ROUNDS
+IMPORT_BCRYPT_ROUNDS = int(os.getenv('IMPORT_BCRYPT_ROUNDS', '10'))
+
+BCRYPT_PREFIXES = ('$2a$', '$2b$', '$2y$')
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503"""
+    pass
+
+
+def is_bcrypt_hash(stored_password: Optional[str]) -> bool:
+    return bool(stored_password) and stored_password.startswith(BCRYPT_PREFIXES)
+
+
+def _bcrypt_rounds(stored_password: str) -> int:
+    """Extract the cost factor from a $2b$12$... hash"""
+    try:
+        return int(stored_password.split('$')[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+def _checkpw(password: str, stored_password: str) -> bool:
+    # Runs in a worker process
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8'))
+    except Exception as e:
+        print(f'Bcrypt check error: {e}')
+        return False
+
+
+def _hashpw(password: str, rounds: int) -> str:
+    # Runs in a worker process
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+class PasswordHasher:
+    """Size-limited process pool for bcrypt with fast rejection when saturated"""
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING,
+                 timeout: float = PASSWORD_HASH_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: forking a multi-threaded server process is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHasherBusy('Password hashing queue is full')
+        with self._lock:
+            self._pending += 1
+
+        def release(_future=None):
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+
+        if self.workers <= 0:
+            try:
+                result = fn(*args)
+            finally:
+                release()
+        else:
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except Exception:
+                release()
+                raise
+            # A running bcrypt call cannot be cancelled; its slot stays taken until it finishes
+            future.add_done_callback(release)
+            try:
+                result = future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                with self._lock:
+                    self._rejected += 1
+                raise PasswordHasherBusy('Password hashing timed out')
+        with self._lock:
+            self._completed += 1
+        return result
+
+    def verify(self, password: str, stored_password: str) -> bool:
+        return self._run(_checkpw, password, stored_password)
+
+    def hash(self, password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+        return self._run(_hashpw, password, rounds)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'pending': self._pending,
+                'completed': self._completed,
+                'rejected': self._rejected,
+            }
+
+
+# Singleton instance
+_password_hasher = None
+
+def get_password_hasher() -> PasswordHasher:
+    """Get or create the password hasher singleton"""
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher()
+    return _password_hasher
+
+
+def verify_password(password: str, stored_password: Optional[str]) -> Tuple[bool, bool]:
+    """
+    Check a password against the stored value
+
+    Returns:
+        (valid, needs_rehash) - needs_rehash is True for legacy plaintext
+        passwords and bcrypt hashes weaker than BCRYPT_ROUNDS
+    """
+    stored_password = stored_password.strip() if stored_password else None
+    if not stored_password:
+        return False, False
+
+    if is_bcrypt_hash(stored_password):
+        valid = get_password_hasher().verify(password, stored_password)
+        return valid, valid and _bcrypt_rounds(stored_password) < BCRYPT_ROUNDS
+
+    # Plain text comparison (legacy accounts, rehashed on successful login)
+    valid = stored_password == password
+    return valid, valid
+
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    """Hash a password with bcrypt in the worker pool"""
+    return get_password_hasher().hash(password, rounds)
@@ -0,0 +1,181 @@
+"""
+Quiz Auto-Grading Utilities
+Parses a quiz's answer key once into per-question choice sets and scores
+every response of the quiz against it in a single pass
+
+Answer key formats (Quiz_Questions):
+    Questions:      JSON array of {"question": ..., "answers": {...}, "correct": "B"}
+                    "correct" may list several keys ("A,C" or ["A", "C"]) for
+                    multiple-answer questions; an optional "points" weights the question
+    Correct_answer: fallback when Questions has no keys - "A,B,D" or a JSON list
+
+Response formats (Quiz_Answer.Responses):
+    JSON object {"0": "B", "1": ["A", "C"]} keyed by question index, or the
+    legacy comma-separated form "A,B,B,D"
+"""
+import os
+import json
+import math
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+QUIZ_SCORE_SCALE = float(os.getenv('QUIZ_SCORE_SCALE', '10'))
+
+
+class AnswerKeyError(ValueError):
+    """Raised when a quiz has no usable answer key"""
+    pass
+
+
+class AnswerKey(NamedTuple):
+    # Per question: the set of correct choices and its weight
+    correct: Tuple[FrozenSet[str], ...]
+    points: Tuple[float, ...]
+    total_points: float
+
+
+class GradeResult(NamedTuple):
+    score: float
+    earned: float
+    correct_count: int
+    answered: int
+
+
+@lru_cache(maxsize=1024)
+def _text_choices(text: str) -> FrozenSet[str]:
+    # Responses repeat the same few strings ('A', 'B', ...), so this is cached
+    return frozenset(item.strip().upper() for item in text.replace(';', ',').split(',') if item.strip())
+
+def _choices(value) -> FrozenSet[str]:
+    """Normalize 'A', 'a, c', ['A', 'C'] to {'A', 'C'}"""
+    if value is None:
+        return frozenset()
+    if isinstance(value, str):
+        return _text_choices(value)
+    if isinstance(value, (list, tuple, set)):
+        return frozenset(str(item).strip().upper() for item in value if str(item).strip())
+    return _text_choices(str(value))
+
+
+def _parse_correct_answer(correct_answer: Optional[str]) -> List[FrozenSet[str]]:
+    if not correct_answer or not correct_answer.strip():
+        return []
+    try:
+        parsed = json.loads(correct_answer)
+    except ValueError:
+        parsed = None
+    if isinstance(parsed, list):
+        return [_choices(item) for item in parsed]
+    if isinstance(parsed, dict):
+        try:
+            order = sorted(parsed, key=lambda k: int(k))
+        except ValueError:
+            raise AnswerKeyError('Correct_answer keys must be question numbers')
+        return [_choices(parsed[k]) for k in order]
+    # Legacy comma-separated form: one choice per question
+    return [_choices(item) for item in correct_answer.split(',')]
+
+
+@lru_cache(maxsize=256)
+def parse_answer_key(questions: Optional[str], correct_answer: Optional[str] = None) -> AnswerKey:
+    """
+    Parse and cache a quiz's answer key
+
+    Cached on the raw column values, so an edited quiz gets a fresh key and
+    grading the same quiz again skips the JSON parsing.
+    """
+    parsed_questions = []
+    if questions and questions.strip():
+        try:
+            parsed_questions = json.loads(questions)
+        except ValueError:
+            raise AnswerKeyError('Questions is not valid JSON')
+        if not isinstance(parsed_questions, list):
+            raise AnswerKeyError('Questions must be a JSON array')
+
+    fallback = _parse_correct_answer(correct_answer)
+    count = max(len(parsed_questions), len(fallback))
+    correct, points = [], []
+    for index in range(count):
+        question = parsed_questions[index] if index < len(parsed_questions) else {}
+        choices = _choices(question.get('correct')) if isinstance(question, dict) else frozenset()
+        if not choices and index < len(fallback):
+            choices = fallback[index]
+        if not choices:
+            raise AnswerKeyError(f'Question {index + 1} has no correct answer')
+        weight = question.get('points', 1) if isinstance(question, dict) else 1
+        try:
+            if isinstance(weight, bool):
+                raise TypeError()
+            weight = float(weight)
+        except (TypeError, ValueError):
+            raise AnswerKeyError(f'Question {index + 1} has invalid points')
+        # NaN and inf parse as floats; zero or negative weights give negative scores or a zero total
+        if not math.isfinite(weight) or weight <= 0:
+            raise AnswerKeyError(f'Question {index + 1} points must be a positive number')
+        correct.append(choices)
+        points.append(weight)
+
+    if not correct:
+        raise AnswerKeyError('Quiz has no questions')
+    return AnswerKey(tuple(correct), tuple(points), sum(points))
+
+
+def parse_responses(responses) -> Dict[int, FrozenSet[str]]:
+    """Parse a stored Responses value into {question_index: chosen keys}"""
+    if responses is None:
+        return {}
+    if isinstance(responses, str):
+        text = responses.strip()
+        if not text:
+            return {}
+        try:
+            responses = json.loads(text)
+        except ValueError:
+            return {index: _choices(item) for index, item in enumerate(text.split(',')) if item.strip()}
+    if isinstance(responses, list):
+        return {index: _choices(item) for index, item in enumerate(responses)}
+    if isinstance(responses, dict):
+        parsed = {}
+        for key, value in responses.items():
+            try:
+                parsed[int(key)] = _choices(value)
+            except (TypeError, ValueError):
+                continue
+        return parsed
+    return {}
+
+
+def _credit(correct: FrozenSet[str], chosen: FrozenSet[str]) -> float:
+    """Fraction of a question's points earned"""
+    if not chosen:
+        return 0.0
+    if len(correct) == 1:
+        return 1.0 if chosen == correct else 0.0
+    # Multiple-answer: right choices minus wrong choices, floored at zero
+    right = len(chosen & correct)
+    wrong = len(chosen - correct)
+    return max(0.0, (right - wrong) / len(correct))
+
+
+def grade_responses(key: AnswerKey, responses, scale: float = QUIZ_SCORE_SCALE) -> GradeResult:
+    """Score one student's responses against a compiled answer key"""
+    chosen_by_question = parse_responses(responses)
+    earned = 0.0
+    correct_count = 0
+    answered = 0
+    for index, chosen in chosen_by_question.items():
+        if index < 0 or index >= len(key.correct) or not chosen:
+            continue
+        answered += 1
+        credit = _credit(key.correct[index], chosen)
+        if credit == 1.0:
+            correct_count += 1
+        earned += credit * key.points[index]
+    score = round(earned / key.total_points * scale, 2) if key.total_points else 0.0
+    return GradeResult(score, round(earned, 4), correct_count, answered)
+
+
+def grade_all(key: AnswerKey, responses_list, scale: float = QUIZ_SCORE_SCALE) -> List[GradeResult]:
+    """Score every response of a quiz in one pass over a single compiled key"""
+    return [grade_responses(key, responses, scale) for responses in responses_list]
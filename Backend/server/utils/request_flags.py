@@ -0,0 +1,29 @@
+"""
+Request Flag Parsing
+Reads on/off options such as atomic, dry_run or force from JSON bodies and
+query strings without treating the string "false" as true
+"""
+from typing import Any
+
+TRUE_VALUES = ('true', '1', 'yes', 'on')
+FALSE_VALUES = ('false', '0', 'no', 'off', '')
+
+
+def parse_flag(value: Any, name: str, default: bool = False) -> bool:
+    """
+    Interpret a JSON boolean or a query-string value
+
+    Raises:
+        ValueError: for anything else, e.g. 2 or "maybe"
+    """
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in TRUE_VALUES:
+            return True
+        if text in FALSE_VALUES:
+            return False
+    raise ValueError(f'{name} must be true or false')
@@ -0,0 +1,145 @@
+"""
+Row Mapping Utilities
+Converts positional pymssql rows into JSON-ready dicts using a column schema
+that is compiled once per result-set shape (taken from cursor.description)
+"""
+from collections import namedtuple
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+DEFAULT_FETCH_SIZE = 500
+
+# key: output key, converter: applied to non-NULL values, default: used for NULL or
+# missing columns, source: column name to map by name instead of by position
+Column = namedtuple('Column', 'key converter default source', defaults=(None, None, None))
+
+
+def to_float(value) -> float:
+    """Decimal/numeric -> float"""
+    return float(value)
+
+def to_int(value) -> int:
+    return int(value)
+
+def to_bool(value) -> bool:
+    return bool(value)
+
+def to_str(value) -> str:
+    return str(value)
+
+def to_iso(value) -> str:
+    """datetime/date/time -> ISO 8601 string"""
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+class RowMapper:
+    """
+    Declarative row -> dict mapper
+
+    Usage:
+        GRADES = RowMapper(
+            ('Assessment_ID', to_int),
+            'Section_ID',
+            ('Quiz_Grade', to_float),
+            computed={'Has_Grade': lambda d: d['Quiz_Grade'] is not None},
+        )
+        cursor.execute('EXEC GetStudentAllGrades %s', (user_id,))
+        grades = GRADES.map_all(cursor)
+
+    Columns are matched by position unless a Column has a source name. A spec
+    of None skips that position. Columns missing from a shorter result set
+    fall back to their default.
+    """
+
+    def __init__(self, *columns, computed: Optional[Dict[str, Callable[[Dict[str, Any]], Any]]] = None):
+        self.columns = [self._normalize(c) for c in columns]
+        self.computed = dict(computed or {})
+        self._compiled = {}
+
+    @staticmethod
+    def _normalize(spec):
+        if spec is None or isinstance(spec, Column):
+            return spec
+        if isinstance(spec, str):
+            return Column(spec)
+        return Column(*spec)
+
+    def _compile(self, names):
+        """Generate a specialized function that builds the dict for one row"""
+        namespace = {}
+        items = []
+        by_name = {name.lower(): i for i, name in enumerate(names) if name}
+        for position, column in enumerate(self.columns):
+            if column is None:
+                continue
+            index = by_name.get(column.source.lower()) if column.source else position
+            if index is None or index >= len(names):
+                namespace[f'd{position}'] = column.default
+                items.append(f'{column.key!r}: d{position}')
+                continue
+
+            value = f'r[{index}]'
+            if column.converter is not None:
+                namespace[f'c{position}'] = column.converter
+                converted = f'c{position}({value})'
+            else:
+                converted = value
+            if column.converter is None and column.default is None:
+                expr = value
+            else:
+                namespace[f'd{position}'] = column.default
+                expr = f'({converted} if {value} is not None else d{position})'
+            items.append(f'{column.key!r}: {expr}')
+
+        body = '{' + ', '.join(items) + '}'
+        if self.computed:
+            lines = [f'    d = {body}']
+            for i, (key, fn) in enumerate(self.computed.items()):
+                namespace[f'x{i}'] = fn
+                lines.append(f'    d[{key!r}] = x{i}(d)')
+            source = 'def map_row(r):\n' + '\n'.join(lines) + '\n    return d\n'
+        else:
+            source = f'def map_row(r):\n    return {body}\n'
+        exec(compile(source, '<row_mapper>', 'exec'), namespace)
+        return namespace['map_row']
+
+    def compile(self, description) -> Callable[[tuple], Dict[str, Any]]:
+        """Get the row function for a cursor.description (or a column count)"""
+        if isinstance(description, int):
+            names = tuple('' for _ in range(description))
+        else:
+            names = tuple(col[0] or '' for col in description)
+        fn = self._compiled.get(names)
+        if fn is None:
+            fn = self._compile(names)
+            self._compiled[names] = fn
+        return fn
+
+    def _row_function(self, cursor, rows=None):
+        if getattr(cursor, 'description', None):
+            return self.compile(cursor.description)
+        width = len(rows[0]) if rows else len(self.columns)
+        return self.compile(width)
+
+    def map_row(self, row, description=None) -> Dict[str, Any]:
+        return self.compile(description if description is not None else len(row))(row)
+
+    def map_all(self, cursor, rows: Optional[List[tuple]] = None) -> List[Dict[str, Any]]:
+        """Map a whole result set in one pass (fetches from cursor unless rows are given)"""
+        if rows is None:
+            rows = cursor.fetchall()
+        if not rows:
+            return []
+        fn = self._row_function(cursor, rows)
+        return [fn(row) for row in rows]
+
+    def iter_rows(self, cursor, size: int = DEFAULT_FETCH_SIZE) -> Iterator[Dict[str, Any]]:
+        """Stream mapped rows using fetchmany so memory stays bounded"""
+        fn = None
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                break
+            if fn is None:
+                fn = self._row_function(cursor, rows)
+            for row in rows:
+                yield fn(row)
@@ -0,0 +1,101 @@
+"""
+Per-User Timetable Cache
+Keeps each user's weekly timetable as a ready-to-send body (JSON, or the
+iCalendar feed) with a strong ETag, so repeat views cost neither a stored
+procedure call nor serialization
+
+Entries are dropped when the 'schedule' write generation moves (schedule,
+room, section, teaching and enrollment writes bump it) or after
+SCHEDULE_CACHE_TTL seconds. The TTL bounds how long another gunicorn
+worker, whose generation counters did not move, can serve an old timetable.
+"""
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from utils.cache import get_generation, bump_generation
+
+SCHEDULE_CACHE_TTL = float(os.getenv('SCHEDULE_CACHE_TTL', '300'))
+SCHEDULE_CACHE_MAX_ENTRIES = int(os.getenv('SCHEDULE_CACHE_MAX_ENTRIES', '20000'))
+
+SCHEDULE_TOPIC = 'schedule'
+
+
+class CachedSchedule(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: float  # epoch seconds when the timetable was built
+    generation: int
+    loaded_at: float      # monotonic
+
+
+class UserScheduleCache:
+    """LRU of rendered timetables keyed by (format, role, user_id)"""
+
+    def __init__(self, ttl: float = SCHEDULE_CACHE_TTL, max_entries: int = SCHEDULE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0}
+
+    def _fresh(self, key) -> Optional[CachedSchedule]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.generation != get_generation(SCHEDULE_TOPIC) or time.monotonic() - entry.loaded_at >= self.ttl:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key: Hashable, render: Callable[[], bytes]) -> Tuple[CachedSchedule, str]:
+        """
+        Get a rendered timetable, building it with render() on a miss
+
+        Returns:
+            (entry, status) - status is HIT or MISS
+        """
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is not None:
+                self._counters['hits'] += 1
+                return entry, 'HIT'
+            self._counters['misses'] += 1
+
+        # Snapshot first: a write landing during the load leaves the entry stale
+        generation = get_generation(SCHEDULE_TOPIC)
+        body = render()
+        entry = CachedSchedule(body, hashlib.sha1(body).hexdigest(), time.time(), generation, time.monotonic())
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry, 'MISS'
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'ttl': self.ttl,
+                'generation': get_generation(SCHEDULE_TOPIC),
+                **self._counters,
+            }
+
+
+# Singleton instance
+_schedule_cache = None
+
+def get_schedule_cache() -> UserScheduleCache:
+    """Get or create the timetable cache singleton"""
+    global _schedule_cache
+    if _schedule_cache is None:
+        _schedule_cache = UserScheduleCache()
+    return _schedule_cache
+
+def invalidate_schedules():
+    """Call after committing anything that can change someone's timetable"""
+    bump_generation(SCHEDULE_TOPIC)
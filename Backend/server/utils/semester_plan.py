@@ -0,0 +1,214 @@
+"""
+Semester Plan Utilities
+Validates a semester plan (courses, sections, room assignments and weekly
+schedule entries) and finds clashes before anything is written
+
+Plan format:
+    {
+        "Semester": "242",
+        "courses": [{"Course_ID": "CO2013", "Name": "Database Systems", "Credit": 4, "CCategory": "..."}],
+        "sections": [{
+            "Course_ID": "CO2013", "Section_ID": "CC01",
+            "rooms": [{"Building_Name": "H6", "Room_Name": "101"}],
+            "schedule": [{"Day_of_Week": 2, "Start_Period": 1, "End_Period": 3}]
+        }]
+    }
+
+Courses that already exist are left alone, so a plan may list every course
+it uses. A section occupies each of its rooms for each of its schedule entries.
+"""
+from typing import Any, Dict, Iterable, List, NamedTuple, Set, Tuple
+
+# Day_of_Week 1=Monday ... 7=Sunday; periods as in routes/schedule.py (1 = 06:00)
+DAYS_PER_WEEK = 7
+PERIODS_PER_DAY = 13
+
+SectionKey = Tuple[str, str, str]  # (Section_ID, Course_ID, Semester)
+
+
+class PlanError(ValueError):
+    """Raised when a plan is malformed; errors lists every problem with its path"""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__(f'{len(errors)} problem(s) in semester plan')
+        self.errors = errors
+
+
+class SemesterPlan(NamedTuple):
+    semester: str
+    courses: List[Tuple]   # (Course_ID, Name, Credit, CCategory)
+    sections: List[Tuple]  # (Section_ID, Course_ID, Semester)
+    rooms: List[Tuple]     # (Section_ID, Course_ID, Semester, Building_Name, Room_Name)
+    schedule: List[Tuple]  # (Section_ID, Course_ID, Semester, Day_of_Week, Start_Period, End_Period)
+
+
+def period_mask(start_period: int, end_period: int) -> int:
+    """Bit i set for every period i in [start_period, end_period]"""
+    return ((1 << (end_period - start_period + 1)) - 1) << start_period
+
+
+def _text(item: Dict[str, Any], field: str) -> str:
+    value = item.get(field)
+    return str(value).strip() if value is not None else ''
+
+
+def _bounded_int(item: Dict[str, Any], field: str, upper: int) -> int:
+    value = item.get(field)
+    if not isinstance(value, int) or isinstance(value, bool) or not 1 <= value <= upper:
+        raise ValueError(f'{field} must be an integer from 1 to {upper}')
+    return value
+
+
+def parse_plan(data: Any) -> SemesterPlan:
+    """
+    Turn a plan document into parameter tuples for the stored procedures
+
+    Raises:
+        PlanError: listing every malformed entry
+    """
+    errors = []
+
+    def error(path, message):
+        errors.append({'path': path, 'error': message})
+
+    if not isinstance(data, dict):
+        raise PlanError([{'path': '', 'error': 'Plan must be an object'}])
+    semester = _text(data, 'Semester')
+    if not semester:
+        error('Semester', 'Semester is required')
+
+    courses, course_ids = [], set()
+    raw_courses = data.get('courses') or []
+    if not isinstance(raw_courses, list):
+        error('courses', 'courses must be an array')
+        raw_courses = []
+    for index, item in enumerate(raw_courses):
+        path = f'courses[{index}]'
+        if not isinstance(item, dict):
+            error(path, 'Course must be an object')
+            continue
+        course_id, name = _text(item, 'Course_ID'), _text(item, 'Name')
+        if not course_id or not name:
+            error(path, 'Course_ID and Name are required')
+            continue
+        if course_id in course_ids:
+            error(path, f'Course {course_id} is listed twice')
+            continue
+        course_ids.add(course_id)
+        courses.append((course_id, name, item.get('Credit'), item.get('CCategory')))
+
+    sections, rooms, schedule = [], [], []
+    section_keys = set()
+    raw_sections = data.get('sections')
+    if not isinstance(raw_sections, list) or not raw_sections:
+        error('sections', 'sections must be a non-empty array')
+        raw_sections = []
+    for index, item in enumerate(raw_sections):
+        path = f'sections[{index}]'
+        if not isinstance(item, dict):
+            error(path, 'Section must be an object')
+            continue
+        section_id, course_id = _text(item, 'Section_ID'), _text(item, 'Course_ID')
+        if not section_id or not course_id:
+            error(path, 'Section_ID and Course_ID are required')
+            continue
+        key = (section_id, course_id, semester)
+        if key in section_keys:
+            error(path, f'Section {section_id} of {course_id} is listed twice')
+            continue
+        section_keys.add(key)
+        sections.append(key)
+
+        seen_rooms = set()
+        for room_index, room in enumerate(item.get('rooms') or []):
+            room_path = f'{path}.rooms[{room_index}]'
+            building, room_name = (_text(room, 'Building_Name'), _text(room, 'Room_Name')) if isinstance(room, dict) else ('', '')
+            if not building or not room_name:
+                error(room_path, 'Building_Name and Room_Name are required')
+            elif (building, room_name) not in seen_rooms:
+                seen_rooms.add((building, room_name))
+                rooms.append(key + (building, room_name))
+
+        seen_slots = set()
+        for slot_index, slot in enumerate(item.get('schedule') or []):
+            slot_path = f'{path}.schedule[{slot_index}]'
+            if not isinstance(slot, dict):
+                error(slot_path, 'Schedule entry must be an object')
+                continue
+            try:
+                day = _bounded_int(slot, 'Day_of_Week', DAYS_PER_WEEK)
+                start = _bounded_int(slot, 'Start_Period', PERIODS_PER_DAY)
+                end = _bounded_int(slot, 'End_Period', PERIODS_PER_DAY)
+            except ValueError as e:
+                error(slot_path, str(e))
+                continue
+            if start > end:
+                error(slot_path, 'Start_Period must not be after End_Period')
+                continue
+            if (day, start, end) not in seen_slots:
+                seen_slots.add((day, start, end))
+                schedule.append(key + (day, start, end))
+
+    if errors:
+        raise PlanError(errors)
+    return SemesterPlan(semester, courses, sections, rooms, schedule)
+
+
+def find_conflicts(plan: SemesterPlan, known_rooms: Set[Tuple[str, str]], known_courses: Set[str],
+                   existing_sections: Set[Tuple[str, str]],
+                   room_slots: Iterable[Tuple[str, str, SectionKey, int, int, int]]) -> List[Dict[str, Any]]:
+    """
+    Check a parsed plan against the database state and against itself
+
+    Args:
+        known_rooms: (Building_Name, Room_Name) of every room
+        known_courses: Course_IDs already in the database
+        existing_sections: (Section_ID, Course_ID) already in the plan's semester
+        room_slots: (Building_Name, Room_Name, section key, day, start, end) already scheduled
+
+    Returns:
+        One dict per conflict; empty when the plan can be applied
+    """
+    conflicts = []
+    plan_courses = {course[0] for course in plan.courses}
+
+    for section_id, course_id, _ in plan.sections:
+        if course_id not in plan_courses and course_id not in known_courses:
+            conflicts.append({'type': 'unknown_course', 'Course_ID': course_id, 'Section_ID': section_id})
+        if (section_id, course_id) in existing_sections:
+            conflicts.append({'type': 'section_exists', 'Course_ID': course_id, 'Section_ID': section_id})
+
+    for section_id, course_id, _, building, room in plan.rooms:
+        if (building, room) not in known_rooms:
+            conflicts.append({'type': 'unknown_room', 'Building_Name': building, 'Room_Name': room,
+                              'Course_ID': course_id, 'Section_ID': section_id})
+
+    # (building, room, day) -> [(mask, section key, start, end)]
+    occupied = {}
+    for building, room, key, day, start, end in room_slots:
+        occupied.setdefault((building, room, day), []).append((period_mask(start, end), key, start, end))
+
+    slots_by_section = {}
+    for entry in plan.schedule:
+        slots_by_section.setdefault(entry[:3], []).append(entry[3:])
+
+    for section_id, course_id, semester, building, room in plan.rooms:
+        key = (section_id, course_id, semester)
+        for day, start, end in slots_by_section.get(key, ()):
+            mask = period_mask(start, end)
+            taken = occupied.setdefault((building, room, day), [])
+            for other_mask, other_key, other_start, other_end in taken:
+                if other_key != key and mask & other_mask:
+                    conflicts.append({
+                        'type': 'room_clash',
+                        'Building_Name': building,
+                        'Room_Name': room,
+                        'Day_of_Week': day,
+                        'section': {'Section_ID': section_id, 'Course_ID': course_id,
+                                    'Start_Period': start, 'End_Period': end},
+                        'clashes_with': {'Section_ID': other_key[0], 'Course_ID': other_key[1],
+                                         'Start_Period': other_start, 'End_Period': other_end},
+                    })
+            taken.append((mask, key, start, end))
+
+    return conflicts
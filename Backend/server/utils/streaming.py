@@ -0,0 +1,47 @@
+"""
+Streaming Response Utilities
+Writes large JSON arrays to the client in chunks instead of building them in memory
+"""
+from typing import Any, Iterable
+from flask import Response, current_app, stream_with_context
+
+DEFAULT_BATCH_SIZE = 200
+
+
+def stream_json_array(items: Iterable[Any], batch_size: int = DEFAULT_BATCH_SIZE) -> Response:
+    """
+    Stream an iterable as a JSON array
+
+    Run the query before calling this so SQL errors still produce a normal
+    error response; once streaming has started the status code is fixed.
+    The request context (and its pooled DB connection) stays alive until the
+    last chunk is sent.
+
+    Usage:
+        cursor.execute('EXEC GetAllQuizzes')
+        return stream_json_array(QUIZ_ROW.iter_rows(cursor))
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield '['
+        first = True
+        batch = []
+        try:
+            for item in items:
+                batch.append(dumps(item))
+                if len(batch) >= batch_size:
+                    yield ('' if first else ',') + ','.join(batch)
+                    first = False
+                    batch = []
+            if batch:
+                yield ('' if first else ',') + ','.join(batch)
+        except Exception as e:
+            # Headers are already sent; the client sees a truncated (invalid) array
+            print(f'Streaming response error: {e}')
+            import traceback
+            traceback.print_exc()
+            return
+        yield ']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
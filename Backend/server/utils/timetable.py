@@ -0,0 +1,373 @@
+"""
+Timetable Conflict Index
+Keeps each semester's weekly timetable in memory, indexed by room, tutor and
+enrolled student, so clash checks and free-room lookups do not hit SQL Server
+
+A semester is loaded on first use (five queries) and then kept current by the
+admin write endpoints, which apply their change after committing. Occupancy
+per (resource, day) is a bitmask of periods, so an overlap test is one AND.
+
+The index lives in process memory. Writes made through another worker are
+picked up when the semester is reloaded after TIMETABLE_TTL seconds, so it
+only answers read-side questions. Endpoints that refuse clashing writes call
+lock_semester() and load_section() inside their write transaction and test
+against what the database holds at that moment.
+"""
+import os
+import time
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from config.database import db_connection
+from utils.semester_plan import period_mask
+
+TIMETABLE_TTL = float(os.getenv('TIMETABLE_TTL', '300'))
+# How long a checked write waits for another one on the same semester
+TIMETABLE_LOCK_TIMEOUT_MS = int(os.getenv('TIMETABLE_LOCK_TIMEOUT_MS', '10000'))
+# Student clashes are grouped per clashing section; this many IDs are listed
+TIMETABLE_MAX_LISTED_STUDENTS = 20
+
+SectionKey = Tuple[str, str]     # (Section_ID, Course_ID)
+Slot = Tuple[int, int, int]      # (Day_of_Week, Start_Period, End_Period)
+Resource = Tuple[str, Any]       # ('room', (Building_Name, Room_Name)) | ('tutor', id) | ('student', id)
+
+
+def _key(section_id, course_id) -> SectionKey:
+    return (str(section_id), str(course_id))
+
+
+class TimetableBusy(Exception):
+    """Another checked write held the semester longer than TIMETABLE_LOCK_TIMEOUT_MS"""
+
+
+class SemesterTimetable:
+    """Interval index of one semester"""
+
+    def __init__(self, semester: str):
+        self.semester = semester
+        self.loaded_at = time.monotonic()
+        self.rooms = {}       # (Building_Name, Room_Name) -> Capacity
+        self._slots = {}      # section -> {slot}
+        self._resources = {}  # section -> {resource}
+        self._busy = {}       # resource -> {day: {section: mask}}
+        self._lock = threading.RLock()
+
+    # ---------- maintenance ----------
+
+    def _unindex(self, section: SectionKey):
+        for resource in self._resources.get(section, ()):
+            days = self._busy.get(resource)
+            if not days:
+                continue
+            for day in list(days):
+                days[day].pop(section, None)
+                if not days[day]:
+                    del days[day]
+            if not days:
+                del self._busy[resource]
+
+    def _index(self, section: SectionKey):
+        masks = {}
+        for day, start, end in self._slots.get(section, ()):
+            masks[day] = masks.get(day, 0) | period_mask(start, end)
+        for resource in self._resources.get(section, ()):
+            days = self._busy.setdefault(resource, {})
+            for day, mask in masks.items():
+                days.setdefault(day, {})[section] = mask
+
+    def _change(self, section: SectionKey, slots=None, resources=None):
+        self._unindex(section)
+        if slots is not None:
+            self._slots[section] = slots
+        if resources is not None:
+            self._resources[section] = resources
+        self._index(section)
+
+    def add_slot(self, section_id, course_id, day: int, start: int, end: int):
+        section = _key(section_id, course_id)
+        with self._lock:
+            self._change(section, slots=self._slots.get(section, set()) | {(int(day), int(start), int(end))})
+
+    def remove_slot(self, section_id, course_id, day: int, start: int, end: int):
+        section = _key(section_id, course_id)
+        with self._lock:
+            self._change(section, slots=self._slots.get(section, set()) - {(int(day), int(start), int(end))})
+
+    def add_resource(self, section_id, course_id, resource: Resource):
+        section = _key(section_id, course_id)
+        with self._lock:
+            self._change(section, resources=self._resources.get(section, set()) | {resource})
+
+    def remove_resource(self, section_id, course_id, resource: Resource):
+        section = _key(section_id, course_id)
+        with self._lock:
+            self._change(section, resources=self._resources.get(section, set()) - {resource})
+
+    def remove_section(self, section_id, course_id):
+        section = _key(section_id, course_id)
+        with self._lock:
+            self._unindex(section)
+            self._slots.pop(section, None)
+            self._resources.pop(section, None)
+
+    # ---------- queries ----------
+
+    def slots(self, section_id, course_id) -> Set[Slot]:
+        with self._lock:
+            return set(self._slots.get(_key(section_id, course_id), ()))
+
+    def resources(self, section_id, course_id) -> Set[Resource]:
+        with self._lock:
+            return set(self._resources.get(_key(section_id, course_id), ()))
+
+    def occupancy(self) -> Dict[Resource, Dict[int, int]]:
+        """Busy periods per resource and day, all sections combined"""
+        with self._lock:
+            result = {}
+            for resource, days in self._busy.items():
+                merged = {}
+                for day, sections in days.items():
+                    mask = 0
+                    for section_mask in sections.values():
+                        mask |= section_mask
+                    merged[day] = mask
+                result[resource] = merged
+            return result
+
+    def clone(self) -> 'SemesterTimetable':
+        """Independent copy for trying out a batch of changes"""
+        copy = SemesterTimetable(self.semester)
+        with self._lock:
+            copy.loaded_at = self.loaded_at
+            copy.rooms = dict(self.rooms)
+            copy._slots = {section: set(slots) for section, slots in self._slots.items()}
+            copy._resources = {section: set(resources) for section, resources in self._resources.items()}
+            copy._busy = {resource: {day: dict(sections) for day, sections in days.items()}
+                          for resource, days in self._busy.items()}
+        return copy
+
+    def conflicts(self, section_id, course_id, slots: Optional[Iterable[Slot]] = None,
+                  extra_resources: Iterable[Resource] = ()) -> List[Dict[str, Any]]:
+        """
+        Clashes the section would have with other sections
+
+        Args:
+            slots: slots to test (default: the section's current slots)
+            extra_resources: resources the section is about to gain, e.g. a new room
+        """
+        section = _key(section_id, course_id)
+        conflicts = []
+        students = {}  # (other section, slot) -> [ids]
+        with self._lock:
+            slots = list(self._slots.get(section, ()) if slots is None else slots)
+            resources = set(self._resources.get(section, ())) | set(extra_resources)
+            for day, start, end in slots:
+                mask = period_mask(start, end)
+                for resource in resources:
+                    for other, other_mask in self._busy.get(resource, {}).get(day, {}).items():
+                        if other == section or not mask & other_mask:
+                            continue
+                        if resource[0] == 'student':
+                            students.setdefault((other, day, start, end), []).append(resource[1])
+                            continue
+                        conflict = {
+                            'type': f'{resource[0]}_clash',
+                            'Day_of_Week': day,
+                            'Start_Period': start,
+                            'End_Period': end,
+                            'clashes_with': {'Section_ID': other[0], 'Course_ID': other[1]},
+                        }
+                        if resource[0] == 'room':
+                            conflict.update({'Building_Name': resource[1][0], 'Room_Name': resource[1][1]})
+                        else:
+                            conflict['University_ID'] = resource[1]
+                        conflicts.append(conflict)
+        for (other, day, start, end), ids in students.items():
+            conflicts.append({
+                'type': 'student_clash',
+                'Day_of_Week': day,
+                'Start_Period': start,
+                'End_Period': end,
+                'clashes_with': {'Section_ID': other[0], 'Course_ID': other[1]},
+                'student_count': len(ids),
+                'University_IDs': sorted(ids)[:TIMETABLE_MAX_LISTED_STUDENTS],
+            })
+        return conflicts
+
+    def free_rooms(self, day: int, start: int, end: int, min_capacity: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Rooms with nothing booked in any of the periods start..end of day"""
+        mask = period_mask(start, end)
+        result = []
+        with self._lock:
+            for room, capacity in self.rooms.items():
+                if min_capacity is not None and (capacity or 0) < min_capacity:
+                    continue
+                booked = self._busy.get(('room', room), {}).get(day, {})
+                if any(mask & other_mask for other_mask in booked.values()):
+                    continue
+                result.append({'Building_Name': room[0], 'Room_Name': room[1], 'Capacity': capacity})
+        result.sort(key=lambda room: (room['Building_Name'], room['Room_Name']))
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'sections': len(self._slots),
+                'resources': len(self._busy),
+                'age': round(time.monotonic() - self.loaded_at, 1),
+            }
+
+
+def _read_slots_and_rooms(cursor, semester: str):
+    slots, resources = {}, {}
+    # Section_ID, Course_ID, Semester, Day_of_Week, Day_Name, Start_Period, End_Period, Course_Name
+    cursor.execute('EXEC GetAllSchedules %s, %s', (None, semester))
+    for row in cursor.fetchall():
+        if row[3] is None or row[5] is None or row[6] is None:
+            continue
+        slots.setdefault(_key(row[0], row[1]), set()).add((int(row[3]), int(row[5]), int(row[6])))
+
+    # Building_Name, Room_Name, Section_ID, Course_ID, ...
+    cursor.execute('EXEC GetSchedulesByRoom %s, %s, %s', (None, None, semester))
+    for row in cursor.fetchall():
+        resources.setdefault(_key(row[2], row[3]), set()).add(('room', (row[0], row[1])))
+    return slots, resources
+
+def _fill(timetable: SemesterTimetable, slots, resources) -> SemesterTimetable:
+    with timetable._lock:
+        for section in set(slots) | set(resources):
+            timetable._change(section, slots=slots.get(section, set()), resources=resources.get(section, set()))
+    return timetable
+
+def load_semester(cursor, semester: str) -> SemesterTimetable:
+    """Build a semester's index from the database"""
+    timetable = SemesterTimetable(semester)
+
+    # Room_ID, Building_Name, Room_Name, Capacity, ...
+    cursor.execute('EXEC GetAllRooms %s, %s', (None, None))
+    for row in cursor.fetchall():
+        timetable.rooms[(row[1], row[2])] = row[3]
+
+    slots, resources = _read_slots_and_rooms(cursor, semester)
+
+    cursor.execute('SELECT University_ID, Section_ID, Course_ID FROM [Teaches] WHERE Semester = %s', (semester,))
+    for row in cursor.fetchall():
+        resources.setdefault(_key(row[1], row[2]), set()).add(('tutor', row[0]))
+
+    cursor.execute('SELECT University_ID, Section_ID, Course_ID FROM [Assessment] WHERE Semester = %s', (semester,))
+    for row in cursor.fetchall():
+        resources.setdefault(_key(row[1], row[2]), set()).add(('student', row[0]))
+
+    return _fill(timetable, slots, resources)
+
+def load_section(cursor, semester: str, section_id, course_id) -> SemesterTimetable:
+    """
+    Read from the database what conflicts() needs for one section
+
+    Every room booking of the semester is read, but tutors and students only
+    for the people of this section, so the result answers conflicts() for
+    this section (with rooms as extra_resources) and nothing else.
+    """
+    semester = str(semester)
+    slots, resources = _read_slots_and_rooms(cursor, semester)
+
+    for table, kind in (('Teaches', 'tutor'), ('Assessment', 'student')):
+        cursor.execute(f"""
+            SELECT other.University_ID, other.Section_ID, other.Course_ID
+            FROM [{table}] mine
+            INNER JOIN [{table}] other
+                ON other.University_ID = mine.University_ID AND other.Semester = mine.Semester
+            WHERE mine.Section_ID = %s AND mine.Course_ID = %s AND mine.Semester = %s
+        """, (section_id, course_id, semester))
+        for row in cursor.fetchall():
+            resources.setdefault(_key(row[1], row[2]), set()).add((kind, row[0]))
+
+    return _fill(SemesterTimetable(semester), slots, resources)
+
+def lock_semester(cursor, semester: str):
+    """
+    Serialize checked writes to a semester until the caller's transaction ends
+
+    Raises:
+        TimetableBusy: the lock was not granted within TIMETABLE_LOCK_TIMEOUT_MS
+    """
+    cursor.execute("""
+        DECLARE @result INT;
+        EXEC @result = sp_getapplock @Resource = %s, @LockMode = 'Exclusive',
+                                     @LockOwner = 'Transaction', @LockTimeout = %s;
+        SELECT @result
+    """, (f'timetable:{semester}', TIMETABLE_LOCK_TIMEOUT_MS))
+    if cursor.fetchone()[0] < 0:
+        raise TimetableBusy(f'Timetable of semester {semester} is being changed, please try again')
+
+
+class TimetableRegistry:
+    """Loaded semesters, reloaded after ttl seconds"""
+
+    def __init__(self, ttl: float = TIMETABLE_TTL):
+        self.ttl = ttl
+        self._semesters = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._counters = {'loads': 0, 'invalidations': 0}
+
+    def _fresh(self, semester: str) -> Optional[SemesterTimetable]:
+        timetable = self._semesters.get(semester)
+        if timetable is not None and time.monotonic() - timetable.loaded_at < self.ttl:
+            return timetable
+        return None
+
+    def get(self, semester: str, cursor=None) -> SemesterTimetable:
+        """Get a semester's index, loading it if needed"""
+        semester = str(semester)
+        timetable = self._fresh(semester)
+        if timetable is not None:
+            return timetable
+        with self._lock:
+            load_lock = self._load_locks.setdefault(semester, threading.Lock())
+        with load_lock:
+            timetable = self._fresh(semester)
+            if timetable is None:
+                start_time = time.time()
+                if cursor is not None:
+                    timetable = load_semester(cursor, semester)
+                else:
+                    with db_connection() as conn:
+                        timetable = load_semester(conn.cursor(), semester)
+                with self._lock:
+                    self._semesters[semester] = timetable
+                    self._counters['loads'] += 1
+                print(f'[Timetable] Loaded semester {semester} in {time.time() - start_time:.2f}s')
+            return timetable
+
+    def peek(self, semester: str) -> Optional[SemesterTimetable]:
+        """The loaded index, or None; writes use this so they never trigger a load"""
+        return self._semesters.get(str(semester))
+
+    def invalidate(self, *semesters: str):
+        """Drop the given semesters (all when none are given); they reload on next use"""
+        with self._lock:
+            for semester in (semesters or list(self._semesters)):
+                self._semesters.pop(str(semester), None)
+            self._counters['invalidations'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            semesters = dict(self._semesters)
+            counters = dict(self._counters)
+        return {
+            'ttl': self.ttl,
+            'semesters': {semester: timetable.stats() for semester, timetable in semesters.items()},
+            **counters,
+        }
+
+
+# Singleton instance
+_timetable_registry = None
+
+def get_timetable_registry() -> TimetableRegistry:
+    """Get or create the timetable registry singleton"""
+    global _timetable_registry
+    if _timetable_registry is None:
+        _timetable_registry = TimetableRegistry()
+    return _timetable_registry
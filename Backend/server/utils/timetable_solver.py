@@ -0,0 +1,242 @@
+"""
+Timetable Solver
+Proposes rooms and weekly slots for a semester's unscheduled sections without
+clashing with existing bookings, tutors or enrolled students
+
+Each run is a randomized greedy search: sections are placed most-constrained
+first (fewest suitable rooms, most periods, largest size), each into the
+best-fitting room that has enough free slots on distinct days. Runs with
+different seeds are independent, so they are spread over a process pool and
+the best proposal (fewest unplaced sections, then lowest cost) wins.
+"""
+import os
+import time
+import random
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from utils.semester_plan import PERIODS_PER_DAY, period_mask
+
+# Every gunicorn worker gets its own pool, so split the cores between them
+# (WEB_CONCURRENCY, as in gunicorn.conf.py) instead of giving each all of them
+_WEB_WORKERS = int(os.getenv('WEB_CONCURRENCY') or os.cpu_count() or 1)
+SOLVER_WORKERS = int(os.getenv('SOLVER_WORKERS', str(max(1, (os.cpu_count() or 1) // max(1, _WEB_WORKERS)))))
+SOLVER_SEEDS = int(os.getenv('SOLVER_SEEDS', '8'))
+SOLVER_TIME_LIMIT = float(os.getenv('SOLVER_TIME_LIMIT', '20'))
+SOLVER_DEFAULT_PERIODS = int(os.getenv('SOLVER_DEFAULT_PERIODS', '3'))
+SOLVER_DEFAULT_SESSIONS = int(os.getenv('SOLVER_DEFAULT_SESSIONS', '1'))
+
+# Teaching days offered by default: Monday to Saturday (see routes/schedule.py DAY_NAMES)
+SOLVER_DAYS = tuple(range(1, 7))
+UNPLACED_COST = 1000.0
+
+
+class SolverSection(NamedTuple):
+    section_id: str
+    course_id: str
+    periods: int                # length of one session
+    sessions: int               # sessions per week, on distinct days where possible
+    size: int                   # seats needed
+    equipment: FrozenSet[str]
+    people: Tuple               # ('tutor', id) / ('student', id) resources that must not clash
+
+
+class SolverRoom(NamedTuple):
+    building_name: str
+    room_name: str
+    capacity: int
+    equipment: FrozenSet[str]
+
+
+class Problem(NamedTuple):
+    sections: Tuple[SolverSection, ...]
+    rooms: Tuple[SolverRoom, ...]
+    busy: Dict[Any, Dict[int, int]]   # resource -> {day: period mask} of existing bookings
+    days: Tuple[int, ...] = SOLVER_DAYS
+    periods_per_day: int = PERIODS_PER_DAY
+
+
+def _candidate_rooms(problem: Problem, section: SolverSection) -> List[int]:
+    """Indexes of rooms that fit the section, best fit first"""
+    fits = [index for index, room in enumerate(problem.rooms)
+            if (room.capacity or 0) >= section.size and section.equipment <= room.equipment]
+    return sorted(fits, key=lambda index: problem.rooms[index].capacity or 0)
+
+
+def _people_masks(problem: Problem, busy, section: SolverSection) -> Dict[int, int]:
+    """Periods per day in which a tutor or student of the section is already busy"""
+    masks = {}
+    for day in problem.days:
+        mask = 0
+        for person in section.people:
+            mask |= busy.get(person, {}).get(day, 0)
+        masks[day] = mask
+    return masks
+
+
+def _free_slots(problem: Problem, busy, section: SolverSection, room_key, people_masks: Dict[int, int],
+                rng: random.Random, noise: float) -> Optional[List[Tuple[int, int, int]]]:
+    """Pick section.sessions free slots in one room, on distinct days when possible"""
+    length = section.periods
+    room_days = busy.get(room_key, {})
+    options = []
+    for day in problem.days:
+        taken = room_days.get(day, 0) | people_masks[day]
+        for start in range(1, problem.periods_per_day - length + 2):
+            mask = period_mask(start, start + length - 1)
+            if not taken & mask:
+                # Prefer earlier periods, with seed-dependent jitter
+                options.append((start + rng.random() * noise, day, start, mask))
+    options.sort()
+
+    chosen, used_days, used_masks = [], set(), {}
+    for distinct in (True, False):
+        for _, day, start, mask in options:
+            if len(chosen) == section.sessions:
+                return chosen
+            if (distinct and day in used_days) or used_masks.get(day, 0) & mask:
+                continue
+            chosen.append((day, start, start + length - 1))
+            used_days.add(day)
+            used_masks[day] = used_masks.get(day, 0) | mask
+    return chosen if len(chosen) == section.sessions else None
+
+
+def solve_seed(problem: Problem, seed: int, deadline: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    One randomized greedy run; runs in a worker process
+
+    Returns:
+        {'seed', 'cost', 'placements', 'unplaced'} or None when the deadline passed
+    """
+    rng = random.Random(seed)
+    # Seed 0 is the plain greedy order; the others perturb it
+    noise = 0.0 if seed == 0 else 3.0
+    busy = {resource: dict(days) for resource, days in problem.busy.items()}
+    candidates = {section: _candidate_rooms(problem, section) for section in problem.sections}
+
+    def difficulty(section):
+        jitter = 1.0 + (rng.random() * 0.5 if seed else 0.0)
+        return (len(candidates[section]) * jitter, -section.periods * section.sessions, -section.size)
+
+    placements, unplaced, cost = [], [], 0.0
+    for section in sorted(problem.sections, key=difficulty):
+        if deadline is not None and time.time() > deadline:
+            return None
+        rooms = candidates[section]
+        if not rooms:
+            unplaced.append((section, 'no_suitable_room'))
+            cost += UNPLACED_COST
+            continue
+        # Try a couple of nearly-best rooms in random order so seeds explore different fits
+        head = rooms[:3]
+        rng.shuffle(head)
+        people_masks = _people_masks(problem, busy, section)
+        for room_index in head + rooms[3:]:
+            room = problem.rooms[room_index]
+            room_key = ('room', (room.building_name, room.room_name))
+            slots = _free_slots(problem, busy, section, room_key, people_masks, rng, noise)
+            if slots is None:
+                continue
+            for day, start, end in slots:
+                mask = period_mask(start, end)
+                for resource in (room_key,) + tuple(section.people):
+                    days = busy.setdefault(resource, {})
+                    days[day] = days.get(day, 0) | mask
+            waste = 1.0 - section.size / room.capacity if room.capacity else 0.0
+            lateness = sum(start for _, start, _ in slots) / (len(slots) * problem.periods_per_day)
+            cost += waste + lateness
+            placements.append((section, room, slots))
+            break
+        else:
+            unplaced.append((section, 'no_free_slot'))
+            cost += UNPLACED_COST
+
+    return {
+        'seed': seed,
+        'cost': round(cost, 4),
+        'placements': [
+            {
+                'Section_ID': section.section_id,
+                'Course_ID': section.course_id,
+                'rooms': [{'Building_Name': room.building_name, 'Room_Name': room.room_name}],
+                'schedule': [{'Day_of_Week': day, 'Start_Period': start, 'End_Period': end}
+                             for day, start, end in sorted(slots)],
+            }
+            for section, room, slots in placements
+        ],
+        'unplaced': [
+            {'Section_ID': section.section_id, 'Course_ID': section.course_id, 'reason': reason}
+            for section, reason in unplaced
+        ],
+    }
+
+
+class TimetableSolver:
+    """Runs seeds of solve_seed on a spawn-context process pool"""
+
+    def __init__(self, workers: int = SOLVER_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._runs = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        pid = os.getpid()
+        with self._lock:
+            if self._executor is None or self._executor_pid != pid:
+                # spawn: forking a multi-threaded server process is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._executor_pid = pid
+            return self._executor
+
+    def solve(self, problem: Problem, seeds: int = SOLVER_SEEDS,
+              time_limit: float = SOLVER_TIME_LIMIT) -> Dict[str, Any]:
+        """
+        Run seeds in parallel and keep the best proposal found within time_limit
+
+        Returns:
+            The best run's result plus 'seeds_run' and 'elapsed'
+        """
+        start_time = time.time()
+        deadline = start_time + time_limit
+        seeds = max(1, seeds)
+        with self._lock:
+            self._runs += 1
+
+        if self.workers <= 0:
+            results = [solve_seed(problem, seed, deadline) for seed in range(seeds)]
+        else:
+            executor = self._get_executor()
+            futures = [executor.submit(solve_seed, problem, seed, deadline) for seed in range(seeds)]
+            done, not_done = wait(futures, timeout=time_limit + 1)
+            for future in not_done:
+                future.cancel()
+            results = [future.result() for future in done if future.exception() is None]
+
+        results = [result for result in results if result is not None]
+        if not results:
+            raise TimeoutError(f'No timetable found within {time_limit:.0f}s')
+        best = min(results, key=lambda result: (len(result['unplaced']), result['cost'], result['seed']))
+        return {**best, 'seeds_run': len(results), 'elapsed': round(time.time() - start_time, 3)}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'workers': self.workers, 'runs': self._runs}
+
+
+# Singleton instance
+_timetable_solver = None
+
+def get_timetable_solver() -> TimetableSolver:
+    """Get or create the timetable solver singleton"""
+    global _timetable_solver
+    if _timetable_solver is None:
+        _timetable_solver = TimetableSolver()
+    return _timetable_solver
@@ -0,0 +1,196 @@
+"""
+Token Revocation Store
+Records revoked tokens (logout) and per-user cutoffs (password change or
+reset) where every worker sees them
+
+The tables live in shared memory created at import; with gunicorn's
+preload_app every worker is forked after that, so a revocation made by one
+worker is enforced by all workers of the host. When REDIS_URL is set and the
+redis package is installed, revocations are also written to Redis and
+checked there, which extends them to other hosts; if Redis is unreachable,
+the host's own table still applies.
+
+Each table has a fixed number of slots. An entry frees its slot once the
+token it concerns would have expired anyway. If no slot is free for a
+logout, the user's cutoff is raised to that token's iat instead, which
+also signs out their older sessions; if no user slot is free, revoking fails
+loudly rather than silently.
+"""
+import os
+import json
+import time
+import multiprocessing
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+JWT_REVOKED_TOKENS_MAX = int(os.getenv('JWT_REVOKED_TOKENS_MAX', '65536'))
+JWT_REVOKED_USERS_MAX = int(os.getenv('JWT_REVOKED_USERS_MAX', '65536'))
+REDIS_URL = os.getenv('REDIS_URL')
+REDIS_KEY_PREFIX = 'lms:jwt:'
+
+# Slots looked at from a key's home slot; bounds the cost of a lookup
+MAX_PROBES = 32
+
+
+class RevocationTableFull(Exception):
+    """No free slot for a user cutoff; the tokens were NOT revoked"""
+
+
+def token_key(digest: str) -> int:
+    """Non-zero 64-bit table key of a token digest (0 marks an empty slot)"""
+    return int(digest[:16], 16) - (1 << 63) or 1
+
+def _user_key(user_id) -> int:
+    return int(user_id) + 1 if int(user_id) >= 0 else int(user_id)
+
+
+class _SharedTable:
+    """Fixed-size open-addressing map in shared memory: key -> (value, tag, expires)"""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._lock = multiprocessing.Lock()
+        self._keys = multiprocessing.RawArray('q', self.capacity)
+        self._tags = multiprocessing.RawArray('q', self.capacity)
+        self._values = multiprocessing.RawArray('d', self.capacity)
+        self._expires = multiprocessing.RawArray('d', self.capacity)
+
+    def _slots(self, key: int):
+        home = key % self.capacity
+        for step in range(min(MAX_PROBES, self.capacity)):
+            yield (home + step) % self.capacity
+
+    def get(self, key: int, now: float) -> Optional[Tuple[float, int, float]]:
+        with self._lock:
+            for slot in self._slots(key):
+                found = self._keys[slot]
+                if found == 0:
+                    return None
+                if found == key:
+                    if self._expires[slot] <= now:
+                        return None
+                    return self._values[slot], self._tags[slot], self._expires[slot]
+        return None
+
+    def put(self, key: int, value: float, tag: int, expires: float, now: float) -> bool:
+        """Insert or overwrite; False when every probed slot holds a live entry"""
+        with self._lock:
+            target = None
+            for slot in self._slots(key):
+                found = self._keys[slot]
+                if found == key:
+                    target = slot
+                    break
+                if target is None and (found == 0 or self._expires[slot] <= now):
+                    target = slot
+                if found == 0:
+                    break
+            if target is None:
+                return False
+            self._values[target] = value
+            self._tags[target] = tag
+            self._expires[target] = expires
+            self._keys[target] = key
+            return True
+
+
+class RevocationStore:
+    """Shared-memory tables, mirrored to Redis when configured"""
+
+    def __init__(self, tokens_max: int = JWT_REVOKED_TOKENS_MAX, users_max: int = JWT_REVOKED_USERS_MAX,
+                 redis_url: Optional[str] = REDIS_URL):
+        self._tokens = _SharedTable(tokens_max)
+        self._users = _SharedTable(users_max)
+        self._redis = None
+        if redis_url:
+            if redis is None:
+                print('[Auth] REDIS_URL is set but redis is not installed; token revocation is per host')
+            else:
+                self._redis = redis.Redis.from_url(redis_url)
+        self._counters = {'tokens_revoked': 0, 'users_revoked': 0, 'token_fallbacks': 0, 'redis_errors': 0}
+
+    def _count(self, name: str):
+        # Approximate per-process counters for /health/stats
+        self._counters[name] += 1
+
+    def is_revoked(self, digest: str, payload: Dict[str, Any]) -> bool:
+        now = time.time()
+        key = token_key(digest)
+        if self._tokens.get(key, now) is not None:
+            return True
+        user_id = payload.get('user_id')
+        iat = payload.get('iat', 0)
+        if user_id is not None:
+            cutoff = self._users.get(_user_key(user_id), now)
+            if cutoff is not None and iat <= cutoff[0] and key != cutoff[1]:
+                return True
+        if self._redis is not None:
+            try:
+                revoked, raw = self._redis.mget(REDIS_KEY_PREFIX + 'token:' + digest,
+                                                REDIS_KEY_PREFIX + f'user:{user_id}')
+            except Exception as e:
+                self._count('redis_errors')
+                print(f'[Auth] Redis revocation check failed: {e}')
+                return False
+            if revoked is not None:
+                return True
+            if raw is not None:
+                cutoff = json.loads(raw)
+                return iat <= cutoff['cutoff'] and digest != cutoff['kept']
+        return False
+
+    def _redis_set(self, name: str, value: str, expires: float):
+        if self._redis is None:
+            return
+        try:
+            self._redis.set(REDIS_KEY_PREFIX + name, value, ex=max(1, int(expires - time.time()) + 1))
+        except Exception as e:
+            self._count('redis_errors')
+            print(f'[Auth] Redis revocation write failed: {e}')
+
+    def revoke_token(self, digest: str, payload: Dict[str, Any], expires: float):
+        """Deny one token until it expires"""
+        now = time.time()
+        self._count('tokens_revoked')
+        self._redis_set('token:' + digest, '1', expires)
+        if self._tokens.put(token_key(digest), 1.0, 0, expires, now):
+            return
+        # No free slot: cut off the user's tokens up to this one instead
+        self._count('token_fallbacks')
+        user_id = payload.get('user_id')
+        if user_id is None:
+            raise RevocationTableFull('Token revocation table is full')
+        current = self._users.get(_user_key(user_id), now)
+        kept = current[1] if current is not None and current[1] != token_key(digest) else 0
+        cutoff = max(float(payload.get('iat', now)), current[0] if current is not None else 0.0)
+        expires = max(expires, current[2] if current is not None else 0.0)
+        if not self._users.put(_user_key(user_id), cutoff, kept, expires, now):
+            raise RevocationTableFull('User revocation table is full')
+
+    def revoke_user(self, user_id, horizon: float, keep_digest: Optional[str] = None):
+        """Deny every token of a user issued up to now, except keep_digest"""
+        now = time.time()
+        self._count('users_revoked')
+        self._redis_set(f'user:{user_id}', json.dumps({'cutoff': now, 'kept': keep_digest}), horizon)
+        kept = token_key(keep_digest) if keep_digest else 0
+        if not self._users.put(_user_key(user_id), now, kept, horizon, now):
+            raise RevocationTableFull('User revocation table is full')
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': 'redis' if self._redis is not None else 'shared-memory',
+            'tokens_max': self._tokens.capacity,
+            'users_max': self._users.capacity,
+            **self._counters,
+        }
+
+
+# Singleton instance, created at import so preloaded workers share its tables
+_revocation_store = RevocationStore()
+
+def get_revocation_store() -> RevocationStore:
+    return _revocation_store